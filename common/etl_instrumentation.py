@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of ETL phases.
+
+PhaseSpan measures one extract, transform or load phase of a processor:
+wall time, CPU time, peak RSS delta and the records and bytes it handled.
+When the phase ends the measurements are observed in the ETL phase
+histograms of common.metrics and written as one structured log line.
+ProcessorInterface wraps every phase in a span, so all processors are
+instrumented without any code of their own.
+
+Phases that run in another process, such as a worker of a parallel static
+ETL run, are observed in that process's registry. collect_phases() gathers
+their measurements so that they can be sent back and observed in the
+registry of the process that exports the metrics.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional
+
+import psutil
+
+from .metrics import get_metrics
+
+# Interval between RSS samples while a phase runs
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+@dataclass
+class PhaseMeasurement:
+    """Measurements of one successful ETL phase."""
+
+    processor: str
+    phase: str
+    duration: float
+    cpu_seconds: float
+    rss_delta_bytes: int
+    records: int
+    nbytes: int
+
+
+# Lists collecting the phases measured in this process (see collect_phases)
+_collectors: List[List[PhaseMeasurement]] = []
+_collectors_lock = threading.Lock()
+
+
+@contextmanager
+def collect_phases() -> Iterator[List[PhaseMeasurement]]:
+    """
+    Collect the successful phases measured in this process, on any thread,
+    while the context is active.
+
+    Yields:
+        List the measurements are appended to
+    """
+    phases: List[PhaseMeasurement] = []
+    with _collectors_lock:
+        _collectors.append(phases)
+    try:
+        yield phases
+    finally:
+        with _collectors_lock:
+            _collectors.remove(phases)
+
+
+def count_records(data: Any) -> int:
+    """
+    Count the records in phase data, where they have a length.
+
+    Dictionaries are counted as the sum of their values, so the tables of a
+    dict-API result are added up. Values without a length, such as parsed
+    feed objects or paths, count as none.
+
+    Args:
+        data: Records of a batch, or a whole phase result
+
+    Returns:
+        Number of records
+    """
+    if isinstance(data, dict):
+        return sum(count_records(value) for value in data.values())
+    if isinstance(data, (str, bytes)) or not hasattr(data, "__len__"):
+        return 0
+    return len(data)
+
+
+def count_bytes(data: Any) -> int:
+    """
+    Estimate the in-memory bytes of phase data.
+
+    DataFrames report their shallow memory usage, which leaves out the
+    contents of object columns but costs nothing to compute; strings and
+    bytes their length. Dictionaries are summed like count_records().
+
+    Args:
+        data: Records of a batch, or a whole phase result
+
+    Returns:
+        Estimated bytes
+    """
+    if isinstance(data, dict):
+        return sum(count_bytes(value) for value in data.values())
+    if isinstance(data, (str, bytes)):
+        return len(data)
+    if hasattr(data, "memory_usage"):
+        return int(data.memory_usage(index=True).sum())
+    return 0
+
+
+class PeakRSSSampler:
+    """Samples the RSS of this process on a thread and keeps the peak."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(
+                self.peak_rss, self.process.memory_info().rss
+            )
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        return False
+
+
+class PhaseSpan:
+    """
+    Measures one ETL phase and exports the result when it ends.
+
+    Usage:
+        with PhaseSpan("GTFS", "extract", logger) as span:
+            data = extract()
+            span.add(records=len(data))
+
+    A phase that raises, or that was marked with fail(), is logged with
+    status "error" but not observed in the histograms, so failures do not
+    skew the phase timings.
+    """
+
+    def __init__(
+        self,
+        processor: str,
+        phase: str,
+        logger: logging.Logger,
+        cpu_clock: Callable[[], float] = time.process_time,
+    ):
+        """
+        Initialize the span.
+
+        Args:
+            processor: Processor name, used as a label
+            phase: Phase name, used as a label
+            logger: Logger for the structured log line
+            cpu_clock: CPU clock; process CPU time by default, thread CPU
+                time for phases that run alongside others
+        """
+        self.processor = processor
+        self.phase = phase
+        self.logger = logger
+        self.cpu_clock = cpu_clock
+        self.records = 0
+        self.bytes = 0
+        self.failed = False
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rss_delta_bytes = 0
+        self._sampler = PeakRSSSampler()
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    def add(self, records: int = 0, nbytes: int = 0):
+        """Add records and bytes handled by the phase."""
+        self.records += records
+        self.bytes += nbytes
+
+    def fail(self):
+        """Mark the phase as failed without raising."""
+        self.failed = True
+
+    def __enter__(self):
+        self._sampler.__enter__()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = self.cpu_clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.cpu_seconds = self.cpu_clock() - self._cpu_start
+        self._sampler.__exit__(exc_type, exc, tb)
+        self.rss_delta_bytes = (
+            self._sampler.peak_rss - self._sampler.start_rss
+        )
+        failed = self.failed or exc_type is not None
+        self._export("error" if failed else "success")
+        return False
+
+    def _export(self, status: str):
+        if status == "success":
+            get_metrics().record_etl_phase(
+                self.processor,
+                self.phase,
+                self.wall_seconds,
+                self.cpu_seconds,
+                self.rss_delta_bytes,
+                self.records,
+                self.bytes,
+            )
+            with _collectors_lock:
+                for phases in _collectors:
+                    phases.append(
+                        PhaseMeasurement(
+                            self.processor,
+                            self.phase,
+                            self.wall_seconds,
+                            self.cpu_seconds,
+                            self.rss_delta_bytes,
+                            self.records,
+                            self.bytes,
+                        )
+                    )
+        self.logger.info(
+            f"{self.processor} {self.phase} phase took "
+            f"{self.wall_seconds:.2f}s for {self.records} records",
+            extra={
+                "processor": self.processor,
+                "etl_phase": self.phase,
+                "status": status,
+                "duration_seconds": round(self.wall_seconds, 3),
+                "cpu_seconds": round(self.cpu_seconds, 3),
+                "peak_rss_delta_bytes": self.rss_delta_bytes,
+                "record_count": self.records,
+                "byte_count": self.bytes,
+            },
+        )
@@ -0,0 +1,63 @@
+"""
+GTFS helpers shared by the static ETL processor and the GTFS daemon.
+
+GTFS times are "HH:MM:SS" measured from noon minus 12h of the service day,
+so trips running past midnight carry hours of 24 and above. They are
+handled here as integer seconds on that same origin, which keeps overnight
+times ordered and comparable without any date arithmetic.
+"""
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+
+# Mean Earth radius (IUGG), in metres
+EARTH_RADIUS_M = 6371008.8
+
+_GTFS_TIME = r"^\s*(\d{1,3}):([0-5]\d):([0-5]\d)\s*$"
+
+
+def gtfs_time_to_seconds(values: pd.Series) -> pd.Series:
+    """Parse GTFS times into seconds since noon minus 12h, vectorized.
+
+    Args:
+        values: GTFS "H:MM:SS" or "HH:MM:SS" strings; hours may exceed 23
+
+    Returns:
+        Nullable Int64 series of seconds; missing or malformed times are NA
+    """
+    # A feed repeats the same few thousand times across millions of rows,
+    # so only the distinct values go through the regex
+    codes, uniques = pd.factorize(values.astype("string"))
+    parts = pd.Series(uniques).str.extract(_GTFS_TIME).astype("Int64")
+    parsed = (parts[0] * 3600 + parts[1] * 60 + parts[2]).array
+    seconds = pd.Series(
+        parsed.take(codes, allow_fill=True),
+        index=values.index,
+        name=values.name,
+    )
+    return seconds
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distances in metres between coordinate arrays.
+
+    Args:
+        lat1: Latitudes of the start points, in degrees
+        lon1: Longitudes of the start points, in degrees
+        lat2: Latitudes of the end points, in degrees
+        lon2: Longitudes of the end points, in degrees
+
+    Returns:
+        Float array of distances; NaN where any coordinate is missing
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(values, dtype="float64"))
+        for values in (lat1, lon1, lat2, lon2)
+    )
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
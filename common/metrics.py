@@ -20,6 +20,14 @@ from prometheus_client import (
 
 logger = logging.getLogger(__name__)
 
+# Buckets of the ETL phase histograms, which span seconds to an hour,
+# megabytes to gigabytes and a handful to millions of records
+ETL_PHASE_SECONDS_BUCKETS = (
+    0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600
+)
+ETL_PHASE_BYTES_BUCKETS = tuple(2**20 * 4**i for i in range(8))
+ETL_PHASE_RECORDS_BUCKETS = tuple(10**i for i in range(1, 9))
+
 
 class OpenJourneyMetrics:
     """Centralized metrics collection for Open Journey Server."""
@@ -61,6 +69,46 @@ class OpenJourneyMetrics:
             registry=self.registry,
         )
 
+        self.etl_phase_duration = Histogram(
+            "openjourney_etl_phase_duration_seconds",
+            "Wall time of each ETL phase of a processor",
+            ["processor", "phase"],
+            buckets=ETL_PHASE_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+
+        self.etl_phase_cpu = Histogram(
+            "openjourney_etl_phase_cpu_seconds",
+            "CPU time of each ETL phase of a processor",
+            ["processor", "phase"],
+            buckets=ETL_PHASE_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+
+        self.etl_phase_rss_delta = Histogram(
+            "openjourney_etl_phase_peak_rss_delta_bytes",
+            "Growth of the peak RSS during each ETL phase of a processor",
+            ["processor", "phase"],
+            buckets=ETL_PHASE_BYTES_BUCKETS,
+            registry=self.registry,
+        )
+
+        self.etl_phase_records = Histogram(
+            "openjourney_etl_phase_records",
+            "Records handled by each ETL phase of a processor",
+            ["processor", "phase"],
+            buckets=ETL_PHASE_RECORDS_BUCKETS,
+            registry=self.registry,
+        )
+
+        self.etl_phase_bytes = Histogram(
+            "openjourney_etl_phase_bytes",
+            "Bytes handled by each ETL phase of a processor",
+            ["processor", "phase"],
+            buckets=ETL_PHASE_BYTES_BUCKETS,
+            registry=self.registry,
+        )
+
         self.etl_errors = Counter(
             "openjourney_etl_errors_total",
             "Total number of errors in the ETL pipeline",
@@ -110,6 +158,27 @@ class OpenJourneyMetrics:
             registry=self.registry,
         )
 
+        self.gtfs_table_rows_written = Counter(
+            "openjourney_gtfs_table_rows_written_total",
+            "Total number of rows written to each OpenJourney table",
+            ["table", "method"],
+            registry=self.registry,
+        )
+
+        self.gtfs_table_write_duration = Histogram(
+            "openjourney_gtfs_table_write_duration_seconds",
+            "Time spent writing each OpenJourney table",
+            ["table", "method"],
+            registry=self.registry,
+        )
+
+        self.gtfs_table_write_throughput = Gauge(
+            "openjourney_gtfs_table_write_rows_per_second",
+            "Rows per second of the latest write to each OpenJourney table",
+            ["table", "method"],
+            registry=self.registry,
+        )
+
         # System-wide metrics
         self.system_info = Info(
             "openjourney_system_info",
@@ -155,6 +224,26 @@ class OpenJourneyMetrics:
             processor_type=processor_type
         ).observe(duration)
 
+    def record_etl_phase(
+        self,
+        processor: str,
+        phase: str,
+        duration: float,
+        cpu_seconds: float,
+        rss_delta_bytes: int,
+        records: int,
+        nbytes: int,
+    ):
+        """Record the measurements of one ETL phase of a processor."""
+        labels = {"processor": processor, "phase": phase}
+        self.etl_phase_duration.labels(**labels).observe(duration)
+        self.etl_phase_cpu.labels(**labels).observe(cpu_seconds)
+        self.etl_phase_rss_delta.labels(**labels).observe(
+            max(rss_delta_bytes, 0)
+        )
+        self.etl_phase_records.labels(**labels).observe(records)
+        self.etl_phase_bytes.labels(**labels).observe(nbytes)
+
     def record_etl_error(self, error_type: str, feed_name: str):
         """Record an error in the ETL pipeline."""
         self.etl_errors.labels(
@@ -197,6 +286,21 @@ class OpenJourneyMetrics:
         """Set the number of active GTFS feeds."""
         self.gtfs_active_feeds.set(count)
 
+    def record_gtfs_table_write(
+        self, table: str, method: str, rows: int, duration: float
+    ):
+        """Record rows written to an OpenJourney table and the throughput."""
+        self.gtfs_table_rows_written.labels(table=table, method=method).inc(
+            rows
+        )
+        self.gtfs_table_write_duration.labels(
+            table=table, method=method
+        ).observe(duration)
+        if duration > 0:
+            self.gtfs_table_write_throughput.labels(
+                table=table, method=method
+            ).set(rows / duration)
+
 
 # Global metrics instance
 _metrics_instance: Optional[OpenJourneyMetrics] = None
@@ -6,15 +6,112 @@ This module defines the formal interface that all static data processors must im
 This enables a pluggable architecture where different data sourcescan be processed uniformly.
 """
 
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
+from .etl_instrumentation import PhaseSpan, count_bytes, count_records
 from .logging_config import (
     get_logger,
     setup_service_logging,
 )
 
+# A (table, records) pair passed between the streaming ETL stages; the
+# records are whatever the processor works in, e.g. a DataFrame
+RecordBatch = Tuple[str, Any]
+
+# Table name of the single batch that carries a whole dict-API result
+ALL_TABLES = "*"
+
+# Batches buffered between two streaming stages before the producer waits
+DEFAULT_BATCH_QUEUE_SIZE = 4
+
+# How often a stage blocked on a full queue checks whether to give up
+STAGE_POLL_INTERVAL = 0.1
+
+_END_OF_STAGE = object()
+
+# Phases of a checkpointed run, in order
+EXTRACT_PHASE = "extract"
+TRANSFORM_PHASE = "transform"
+LOAD_PHASE = "load"
+ETL_PHASES = (EXTRACT_PHASE, TRANSFORM_PHASE, LOAD_PHASE)
+
+
+class _StageFailed:
+    """Carries an exception from a stage thread to its consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put_batch(batches: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=STAGE_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def queued_batches(
+    produce: Callable[[], Iterable[RecordBatch]],
+    queue_size: int,
+    stop: threading.Event,
+    name: str,
+) -> Iterator[RecordBatch]:
+    """
+    Run a stage on its own thread, yielding its batches through a queue.
+
+    The queue holds at most queue_size batches, so a producer that gets
+    ahead of its consumer blocks until the consumer catches up. An
+    exception raised by the stage is re-raised in the consumer; setting
+    stop makes a blocked stage give up.
+
+    Args:
+        produce: Called on the stage thread to get the batches
+        queue_size: Maximum number of batches buffered
+        stop: Set by the consumer once it no longer needs batches
+        name: Thread name, for logs and debugging
+
+    Yields:
+        The stage's batches, in order
+    """
+    batches: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+
+    def run():
+        try:
+            for batch in produce():
+                if not _put_batch(batches, batch, stop):
+                    return
+        except BaseException as e:
+            _put_batch(batches, _StageFailed(e), stop)
+            return
+        _put_batch(batches, _END_OF_STAGE, stop)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    while True:
+        item = batches.get()
+        if item is _END_OF_STAGE:
+            return
+        if isinstance(item, _StageFailed):
+            raise item.error
+        yield item
+
 
 class ProcessorInterface(ABC):
     """
@@ -119,8 +216,149 @@ class ProcessorInterface(ABC):
         """
         pass
 
+    def extract_batches(
+        self, source_path: Path, **kwargs
+    ) -> Iterable[RecordBatch]:
+        """
+        Extract data from the source as a stream of record batches.
+
+        Part of the streaming contract used by process_stream(). The default
+        adapts the dict API: the whole result of extract() is one batch for
+        ALL_TABLES. Processors that can read incrementally override this to
+        yield batches per table.
+
+        Args:
+            source_path: Path to the source data file or directory
+            **kwargs: Additional extraction parameters
+
+        Yields:
+            (table, records) batches
+        """
+        yield ALL_TABLES, self.extract(source_path, **kwargs)
+
+    def transform_batch(
+        self, table: str, records: Any, source_info: Dict[str, Any]
+    ) -> Iterable[RecordBatch]:
+        """
+        Transform one extracted batch into canonical batches.
+
+        The default adapts the dict API by passing the records to
+        transform(). A batch may map to any number of output batches,
+        including none.
+
+        Args:
+            table: Table the batch belongs to
+            records: Records of the batch
+            source_info: Information about the data source
+
+        Yields:
+            (table, records) batches ready for loading
+        """
+        yield table, self.transform(records, source_info)
+
+    def load_batches(self, batches: Iterable[RecordBatch]) -> bool:
+        """
+        Load transformed batches as they arrive.
+
+        The default adapts the dict API by calling load() per batch, with
+        an ALL_TABLES batch passed as is and any other batch as a single
+        table dict.
+
+        Args:
+            batches: (table, records) batches from the transform phase
+
+        Returns:
+            True if every batch was loaded, False otherwise
+        """
+        success = True
+        for table, records in batches:
+            data = records if table == ALL_TABLES else {table: records}
+            success = self.load(data) and success
+        return success
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        State set up by extract that the later phases depend on.
+
+        Saved with the extract checkpoint and handed to restore_state() when
+        a checkpointed run resumes after extract, so processors that keep
+        such state on the instance override both. Must be JSON-serialisable.
+
+        Returns:
+            Dictionary of state, empty by default
+        """
+        return {}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the state saved by checkpoint_state().
+
+        Args:
+            state: State saved with the extract checkpoint
+        """
+
+    def count_records(self, data: Any) -> int:
+        """
+        Count the records in a phase result or batch, for instrumentation.
+
+        Override for data whose records the default count_records() of
+        common.etl_instrumentation cannot see, such as parsed feed objects.
+        """
+        return count_records(data)
+
+    def count_bytes(self, data: Any) -> int:
+        """
+        Estimate the bytes of a phase result or batch, for instrumentation.
+
+        Override like count_records().
+        """
+        return count_bytes(data)
+
+    def phase_span(
+        self, phase: str, cpu_clock: Callable[[], float] = time.process_time
+    ) -> PhaseSpan:
+        """
+        Create the span measuring one phase of this processor.
+
+        Args:
+            phase: EXTRACT_PHASE, TRANSFORM_PHASE or LOAD_PHASE
+            cpu_clock: CPU clock for the span
+
+        Returns:
+            PhaseSpan to use as a context manager around the phase
+        """
+        return PhaseSpan(self.processor_name, phase, self.logger, cpu_clock)
+
+    def _count(self, span: PhaseSpan, data: Any):
+        """Add the records and bytes of data to a span."""
+        span.add(self.count_records(data), self.count_bytes(data))
+
+    def _counted_batches(
+        self, span: PhaseSpan, batches: Iterable[RecordBatch]
+    ) -> Iterator[RecordBatch]:
+        """Pass batches through, adding their records and bytes to a span."""
+        for table, records in batches:
+            self._count(span, records)
+            yield table, records
+
+    def _stage_batches(
+        self, phase: str, produce: Callable[[], Iterable[RecordBatch]]
+    ) -> Iterator[RecordBatch]:
+        """
+        Produce the batches of a streaming stage inside a span of its phase.
+
+        Stages overlap, so the span uses the CPU time of the stage thread,
+        and its wall time includes time spent waiting on the next stage.
+        """
+        with self.phase_span(phase, time.thread_time) as span:
+            yield from self._counted_batches(span, produce())
+
     def process(
-        self, source_path: Path, source_info: Dict[str, Any], **kwargs
+        self,
+        source_path: Path,
+        source_info: Dict[str, Any],
+        checkpoints: Optional["PhaseCheckpoints"] = None,
+        **kwargs,
     ) -> bool:
         """
         Execute the complete ETL pipeline.
@@ -128,11 +366,18 @@ class ProcessorInterface(ABC):
         Args:
             source_path: Path to the source data
             source_info: Information about the data source
+            checkpoints: Saves the output of each phase so that a failed
+                run can resume (see process_checkpointed())
             **kwargs: Additional processing parameters
 
         Returns:
             True if processing was successful, False otherwise
         """
+        if checkpoints is not None:
+            return self.process_checkpointed(
+                source_path, source_info, checkpoints, **kwargs
+            )
+
         try:
             self.logger.info(
                 f"Starting {self.processor_name} processing for {source_path}"
@@ -140,15 +385,23 @@ class ProcessorInterface(ABC):
 
             # Extract
             self.logger.info("Extracting data...")
-            raw_data = self.extract(source_path, **kwargs)
+            with self.phase_span(EXTRACT_PHASE) as span:
+                raw_data = self.extract(source_path, **kwargs)
+                self._count(span, raw_data)
 
             # Transform
             self.logger.info("Transforming data...")
-            transformed_data = self.transform(raw_data, source_info)
+            with self.phase_span(TRANSFORM_PHASE) as span:
+                transformed_data = self.transform(raw_data, source_info)
+                self._count(span, transformed_data)
 
             # Load
             self.logger.info("Loading data...")
-            success = self.load(transformed_data)
+            with self.phase_span(LOAD_PHASE) as span:
+                self._count(span, transformed_data)
+                success = self.load(transformed_data)
+                if not success:
+                    span.fail()
 
             if success:
                 self.logger.info(
@@ -167,6 +420,186 @@ class ProcessorInterface(ABC):
             )
             return False
 
+    def process_checkpointed(
+        self,
+        source_path: Path,
+        source_info: Dict[str, Any],
+        checkpoints: "PhaseCheckpoints",
+        **kwargs,
+    ) -> bool:
+        """
+        Execute the ETL pipeline, saving the batches of every phase.
+
+        Phases already completed by an earlier run of the same job are not
+        run again: their saved batches are read back instead. A transform
+        that stopped part way resumes after the last extracted batch it
+        saved. Extract and load always run as a whole, as neither can pick
+        up part way through a source or a load transaction.
+
+        Args:
+            source_path: Path to the source data
+            source_info: Information about the data source
+            checkpoints: Checkpoints of the job this run belongs to
+            **kwargs: Additional extraction parameters
+
+        Returns:
+            True if processing was successful, False otherwise
+        """
+        try:
+            self.logger.info(
+                f"Starting {self.processor_name} checkpointed processing "
+                f"for {source_path}"
+            )
+
+            if checkpoints.is_complete(EXTRACT_PHASE):
+                self.logger.info("Using checkpointed extract")
+                self.restore_state(checkpoints.state(EXTRACT_PHASE))
+            else:
+                self.logger.info("Extracting data...")
+                checkpoints.restart(EXTRACT_PHASE)
+                with self.phase_span(EXTRACT_PHASE) as span:
+                    extracted = self._counted_batches(
+                        span, self.extract_batches(source_path, **kwargs)
+                    )
+                    for index, batch in enumerate(extracted):
+                        checkpoints.save_batches(EXTRACT_PHASE, index, [batch])
+                checkpoints.complete(EXTRACT_PHASE, self.checkpoint_state())
+
+            if checkpoints.is_complete(TRANSFORM_PHASE):
+                self.logger.info("Using checkpointed transform")
+            else:
+                done = checkpoints.saved_batches(TRANSFORM_PHASE)
+                if done:
+                    self.logger.info(
+                        f"Resuming transform after {done} batches"
+                    )
+                else:
+                    self.logger.info("Transforming data...")
+                extracted = checkpoints.read_batches(EXTRACT_PHASE, done)
+                with self.phase_span(TRANSFORM_PHASE) as span:
+                    for index, (table, records) in enumerate(extracted, done):
+                        batches = list(
+                            self._counted_batches(
+                                span,
+                                self.transform_batch(
+                                    table, records, source_info
+                                ),
+                            )
+                        )
+                        checkpoints.save_batches(
+                            TRANSFORM_PHASE, index, batches
+                        )
+                checkpoints.complete(TRANSFORM_PHASE)
+
+            self.logger.info("Loading data...")
+            with self.phase_span(LOAD_PHASE) as span:
+                success = self.load_batches(
+                    self._counted_batches(
+                        span, checkpoints.read_batches(TRANSFORM_PHASE)
+                    )
+                )
+                if not success:
+                    span.fail()
+
+            if success:
+                checkpoints.complete(LOAD_PHASE)
+                self.logger.info(
+                    f"{self.processor_name} processing completed successfully"
+                )
+            else:
+                self.logger.error(
+                    f"{self.processor_name} processing failed during load phase"
+                )
+
+            return success
+
+        except Exception as e:
+            self.logger.error(
+                f"{self.processor_name} processing failed: {str(e)}"
+            )
+            return False
+
+    def process_stream(
+        self,
+        source_path: Path,
+        source_info: Dict[str, Any],
+        queue_size: int = DEFAULT_BATCH_QUEUE_SIZE,
+        **kwargs,
+    ) -> bool:
+        """
+        Execute the ETL pipeline over a stream of record batches.
+
+        Extract and transform each run on their own thread and hand their
+        batches on through bounded queues, while load consumes them on the
+        calling thread. A stage that gets ahead waits for the next one, so
+        at most a few batches per stage are held in memory.
+
+        Args:
+            source_path: Path to the source data
+            source_info: Information about the data source
+            queue_size: Batches buffered between two stages
+            **kwargs: Additional extraction parameters
+
+        Returns:
+            True if processing was successful, False otherwise
+        """
+        stop = threading.Event()
+        try:
+            self.logger.info(
+                f"Starting {self.processor_name} streaming processing "
+                f"for {source_path}"
+            )
+
+            extracted = queued_batches(
+                lambda: self._stage_batches(
+                    EXTRACT_PHASE,
+                    lambda: self.extract_batches(source_path, **kwargs),
+                ),
+                queue_size,
+                stop,
+                f"{self.processor_name}-extract",
+            )
+            transformed = queued_batches(
+                lambda: self._stage_batches(
+                    TRANSFORM_PHASE,
+                    lambda: (
+                        batch
+                        for table, records in extracted
+                        for batch in self.transform_batch(
+                            table, records, source_info
+                        )
+                    ),
+                ),
+                queue_size,
+                stop,
+                f"{self.processor_name}-transform",
+            )
+            with self.phase_span(LOAD_PHASE, time.thread_time) as span:
+                success = self.load_batches(
+                    self._counted_batches(span, transformed)
+                )
+                if not success:
+                    span.fail()
+
+            if success:
+                self.logger.info(
+                    f"{self.processor_name} processing completed successfully"
+                )
+            else:
+                self.logger.error(
+                    f"{self.processor_name} processing failed during load phase"
+                )
+
+            return success
+
+        except Exception as e:
+            self.logger.error(
+                f"{self.processor_name} processing failed: {str(e)}"
+            )
+            return False
+        finally:
+            stop.set()
+
     @abstractmethod
     def validate_source(self, source_path: Path) -> bool:
         """
@@ -223,6 +656,142 @@ class ProcessorInterface(ABC):
                 )
 
 
+class StreamingProcessor(ProcessorInterface):
+    """
+    Base class for processors written against the streaming contract.
+
+    Subclasses implement extract_batches(), transform_batch() and
+    load_batches() instead of the dict API, which is provided on top of
+    them: extract() and transform() return {"batches": iterator} without
+    materialising anything and load() consumes the iterator. process()
+    runs the stream through process_stream(), so a processor whose stages
+    work batch by batch runs in constant memory.
+    """
+
+    @abstractmethod
+    def extract_batches(
+        self, source_path: Path, **kwargs
+    ) -> Iterable[RecordBatch]:
+        """Yield (table, records) batches read incrementally."""
+        pass
+
+    @abstractmethod
+    def transform_batch(
+        self, table: str, records: Any, source_info: Dict[str, Any]
+    ) -> Iterable[RecordBatch]:
+        """Yield the canonical batches for one extracted batch."""
+        pass
+
+    @abstractmethod
+    def load_batches(self, batches: Iterable[RecordBatch]) -> bool:
+        """Load the batches as they arrive, returning True on success."""
+        pass
+
+    def extract(self, source_path: Path, **kwargs) -> Dict[str, Any]:
+        return {"batches": self.extract_batches(source_path, **kwargs)}
+
+    def transform(
+        self, raw_data: Dict[str, Any], source_info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            "batches": (
+                batch
+                for table, records in raw_data["batches"]
+                for batch in self.transform_batch(table, records, source_info)
+            )
+        }
+
+    def load(self, transformed_data: Dict[str, Any]) -> bool:
+        return self.load_batches(transformed_data["batches"])
+
+    def process(
+        self,
+        source_path: Path,
+        source_info: Dict[str, Any],
+        checkpoints: Optional["PhaseCheckpoints"] = None,
+        **kwargs,
+    ) -> bool:
+        if checkpoints is not None:
+            return self.process_checkpointed(
+                source_path, source_info, checkpoints, **kwargs
+            )
+        return self.process_stream(source_path, source_info, **kwargs)
+
+
+class PhaseCheckpoints(ABC):
+    """
+    Storage for the batches and progress of one checkpointed ETL job.
+
+    Passed to ProcessorInterface.process() to make a run resumable. Each
+    phase saves its output as numbered groups of batches; a phase is
+    complete once complete() was called for it. Implementations decide
+    where the batches and progress are kept.
+    """
+
+    @abstractmethod
+    def is_complete(self, phase: str) -> bool:
+        """Return True if an earlier run completed the phase."""
+        pass
+
+    @abstractmethod
+    def state(self, phase: str) -> Dict[str, Any]:
+        """Return the processor state saved when the phase completed."""
+        pass
+
+    @abstractmethod
+    def saved_batches(self, phase: str) -> int:
+        """Return how many groups of batches the phase has saved."""
+        pass
+
+    @abstractmethod
+    def restart(self, phase: str) -> None:
+        """Discard what the phase and the phases after it saved before."""
+        pass
+
+    @abstractmethod
+    def save_batches(
+        self, phase: str, index: int, batches: List[RecordBatch]
+    ) -> None:
+        """
+        Save the batches produced for one input of the phase.
+
+        Args:
+            phase: Phase that produced the batches
+            index: Position of the input, counting from 0
+            batches: (table, records) batches, possibly none
+        """
+        pass
+
+    @abstractmethod
+    def read_batches(
+        self, phase: str, start: int = 0
+    ) -> Iterator[RecordBatch]:
+        """
+        Read back the batches saved by a phase, one group at a time.
+
+        Args:
+            phase: Phase that saved the batches
+            start: Index of the first group to read
+
+        Yields:
+            (table, records) batches, in the order they were saved
+        """
+        pass
+
+    @abstractmethod
+    def complete(
+        self, phase: str, state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Mark a phase as complete.
+
+        Args:
+            phase: Completed phase
+            state: Processor state to restore when resuming after it
+        """
+        pass
+
+
 class ProcessorError(Exception):
     """
     Custom exception class to handle processor-specific errors.
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Job ledger for the static ETL orchestrator.
+
+Records every feed run as a job in processing.processing_jobs, with a
+checkpoint per ETL phase (artifact directory, batches, rows and seconds) in
+the job's metadata, and keeps the batches each phase produced on disk. When
+the last job of a feed failed or was interrupted, the next run of the feed
+with the same source content and options picks that job up again and
+resumes after its last completed phase or batch instead of starting over.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import psycopg2
+from psycopg2.extras import Json, RealDictCursor
+
+from common.etl_instrumentation import count_records
+from common.processor_interface import (
+    ETL_PHASES,
+    PhaseCheckpoints,
+    RecordBatch,
+)
+
+logger = logging.getLogger(__name__)
+
+# job_type of the processing.processing_jobs rows written by the ledger
+JOB_TYPE = "static_etl"
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# Statuses of a job that a later run of the same feed resumes. A job left
+# running was interrupted, as a feed is only run by one orchestrator at once.
+RESUMABLE_STATUSES = (STATUS_RUNNING, STATUS_FAILED)
+
+
+class LedgerJob(PhaseCheckpoints):
+    """
+    Checkpoints of one job in the ledger.
+
+    The batches saved by a phase are pickled under the job's artifact
+    directory, one file per group (<phase>/<index>.pkl). Progress is kept
+    in the job's metadata as {"phases": {phase: checkpoint}} and written
+    to the ledger whenever it changes.
+    """
+
+    def __init__(
+        self,
+        ledger: "JobLedger",
+        job_id: int,
+        feed_name: str,
+        artifact_dir: Path,
+        metadata: Optional[Dict[str, Any]] = None,
+        resumed: bool = False,
+    ):
+        self.ledger = ledger
+        self.job_id = job_id
+        self.feed_name = feed_name
+        self.artifact_dir = artifact_dir
+        self.phases: Dict[str, Dict[str, Any]] = dict(
+            (metadata or {}).get("phases") or {}
+        )
+        self.resumed = resumed
+        # Seconds already spent in each phase by earlier runs
+        self._base_seconds = {
+            phase: checkpoint.get("seconds", 0.0)
+            for phase, checkpoint in self.phases.items()
+        }
+        self._phase_start = time.perf_counter()
+
+    def _checkpoint(self, phase: str) -> Dict[str, Any]:
+        return self.phases.setdefault(
+            phase,
+            {
+                "artifacts": str(self.artifact_dir / phase),
+                "batches": 0,
+                "rows": 0,
+                "seconds": 0.0,
+                "completed": False,
+            },
+        )
+
+    def _update(self, phase: str):
+        """Record the time spent in the phase and save the progress."""
+        self._checkpoint(phase)["seconds"] = round(
+            self._base_seconds.get(phase, 0.0)
+            + time.perf_counter()
+            - self._phase_start,
+            3,
+        )
+        self.ledger.save_checkpoints(self)
+
+    def is_complete(self, phase: str) -> bool:
+        return bool(self.phases.get(phase, {}).get("completed"))
+
+    def state(self, phase: str) -> Dict[str, Any]:
+        return dict(self.phases.get(phase, {}).get("state") or {})
+
+    def saved_batches(self, phase: str) -> int:
+        return self.phases.get(phase, {}).get("batches", 0)
+
+    def restart(self, phase: str) -> None:
+        # Later phases were built from what this phase saved
+        phases = (phase,)
+        if phase in ETL_PHASES:
+            phases = ETL_PHASES[ETL_PHASES.index(phase) :]
+        for name in phases:
+            self.phases.pop(name, None)
+            self._base_seconds.pop(name, None)
+            shutil.rmtree(self.artifact_dir / name, ignore_errors=True)
+        self._phase_start = time.perf_counter()
+        self._checkpoint(phase)
+
+    def save_batches(
+        self, phase: str, index: int, batches: List[RecordBatch]
+    ) -> None:
+        checkpoint = self._checkpoint(phase)
+        path = Path(checkpoint["artifacts"]) / f"{index:06d}.pkl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name so an interrupted write never
+        # leaves a truncated group behind
+        partial = path.with_suffix(".partial")
+        with open(partial, "wb") as f:
+            pickle.dump(batches, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+
+        checkpoint["batches"] = index + 1
+        checkpoint["rows"] += sum(
+            count_records(records) for _, records in batches
+        )
+        self._update(phase)
+
+    def read_batches(
+        self, phase: str, start: int = 0
+    ) -> Iterator[RecordBatch]:
+        checkpoint = self._checkpoint(phase)
+        for index in range(start, checkpoint["batches"]):
+            path = Path(checkpoint["artifacts"]) / f"{index:06d}.pkl"
+            with open(path, "rb") as f:
+                batches = pickle.load(f)
+            yield from batches
+
+    def complete(
+        self, phase: str, state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        checkpoint = self._checkpoint(phase)
+        checkpoint["completed"] = True
+        if state:
+            checkpoint["state"] = state
+        self._update(phase)
+        self.ledger.log(
+            self,
+            "INFO",
+            f"{phase} completed for {self.feed_name}",
+            {
+                key: checkpoint[key]
+                for key in ("batches", "rows", "seconds")
+            },
+        )
+        # The next phase starts now
+        self._phase_start = time.perf_counter()
+
+
+class JobLedger:
+    """
+    Records static ETL jobs in processing.processing_jobs and their log
+    entries in processing.processing_logs.
+
+    Database errors while saving progress are logged and otherwise
+    ignored: they cost the ability to resume, not the run itself.
+    """
+
+    def __init__(self, db_config: Dict[str, Any], artifact_dir: Path):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_config: Database connection configuration dictionary
+            artifact_dir: Directory under which each job keeps the batches
+                of its phases, in a subdirectory named after the job ID
+        """
+        self.db_config = db_config
+        self.artifact_dir = Path(artifact_dir)
+
+    def get_connection(self):
+        """Get database connection."""
+        return psycopg2.connect(
+            host=self.db_config["host"],
+            port=self.db_config["port"],
+            database=self.db_config["database"],
+            user=self.db_config["user"],
+            password=self.db_config.get("password"),
+        )
+
+    def _execute(self, query: str, params: tuple) -> Optional[Dict]:
+        """Run one statement in its own transaction, returning a row."""
+        conn = self.get_connection()
+        try:
+            with conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(query, params)
+                    return cur.fetchone() if cur.description else None
+        finally:
+            conn.close()
+
+    def open_job(
+        self,
+        feed_name: str,
+        input_data: Dict[str, Any],
+        resume: bool = True,
+    ) -> LedgerJob:
+        """
+        Resume the feed's last job or start a new one.
+
+        The last job is resumed when it did not complete, was run with the
+        same input_data and its artifacts are still on disk. input_data must
+        identify the content of the source under "source_hash": without
+        one, nothing shows that the source is unchanged since the last job,
+        whose saved batches could then be of an older version of the feed,
+        so a new job is started.
+
+        Args:
+            feed_name: Name of the feed, stored as the job name
+            input_data: Source, source_hash, type and options of the run
+            resume: If False, always start a new job
+
+        Returns:
+            The job, marked as running
+
+        Raises:
+            psycopg2.Error: If the ledger cannot be read or written
+        """
+        # Compare with the value as it comes back from JSONB
+        input_data = json.loads(json.dumps(input_data, default=str))
+        last = self._execute(
+            """
+            SELECT job_id, status, input_data, metadata
+            FROM processing.processing_jobs
+            WHERE job_name = %s AND job_type = %s
+            ORDER BY job_id DESC
+            LIMIT 1
+            """,
+            (feed_name, JOB_TYPE),
+        )
+        if (
+            resume
+            and last
+            and input_data.get("source_hash")
+            and last["status"] in RESUMABLE_STATUSES
+            and last["input_data"] == input_data
+            and (self.artifact_dir / str(last["job_id"])).exists()
+        ):
+            self._execute(
+                """
+                UPDATE processing.processing_jobs
+                SET status = %s, started_at = CURRENT_TIMESTAMP,
+                    completed_at = NULL, error_message = NULL
+                WHERE job_id = %s
+                """,
+                (STATUS_RUNNING, last["job_id"]),
+            )
+            job = LedgerJob(
+                self,
+                last["job_id"],
+                feed_name,
+                self.artifact_dir / str(last["job_id"]),
+                last["metadata"],
+                resumed=True,
+            )
+            completed = [
+                phase
+                for phase, checkpoint in job.phases.items()
+                if checkpoint.get("completed")
+            ]
+            logger.info(
+                f"Resuming job {job.job_id} for {feed_name} "
+                f"(completed: {', '.join(completed) or 'none'})"
+            )
+            self.log(job, "INFO", "Job resumed", {"completed": completed})
+            return job
+
+        row = self._execute(
+            """
+            INSERT INTO processing.processing_jobs (
+                job_name, job_type, status, started_at, input_data, metadata
+            ) VALUES (%s, %s, %s, CURRENT_TIMESTAMP, %s, %s)
+            RETURNING job_id
+            """,
+            (
+                feed_name,
+                JOB_TYPE,
+                STATUS_RUNNING,
+                Json(input_data),
+                Json({"phases": {}}),
+            ),
+        )
+        job = LedgerJob(
+            self,
+            row["job_id"],
+            feed_name,
+            self.artifact_dir / str(row["job_id"]),
+        )
+        logger.info(f"Started job {job.job_id} for {feed_name}")
+        return job
+
+    def save_checkpoints(self, job: LedgerJob):
+        """Write the job's phase checkpoints to its metadata."""
+        try:
+            self._execute(
+                """
+                UPDATE processing.processing_jobs
+                SET metadata = COALESCE(metadata, '{}'::jsonb) || %s
+                WHERE job_id = %s
+                """,
+                (Json({"phases": job.phases}), job.job_id),
+            )
+        except psycopg2.Error as e:
+            logger.warning(
+                f"Could not save checkpoints of job {job.job_id}: {e}"
+            )
+
+    def finish(
+        self, job: LedgerJob, success: bool, error: Optional[str] = None
+    ):
+        """
+        Mark a job as completed or failed.
+
+        The artifacts of a completed job are removed; those of a failed job
+        are kept for the next run to resume from.
+
+        Args:
+            job: Job to finish
+            success: Whether the run succeeded
+            error: Error message of a failed run
+        """
+        status = STATUS_COMPLETED if success else STATUS_FAILED
+        summary = {
+            phase: {
+                key: checkpoint.get(key)
+                for key in ("batches", "rows", "seconds")
+            }
+            for phase, checkpoint in job.phases.items()
+        }
+        try:
+            self._execute(
+                """
+                UPDATE processing.processing_jobs
+                SET status = %s, completed_at = CURRENT_TIMESTAMP,
+                    error_message = %s, output_data = %s,
+                    metadata = COALESCE(metadata, '{}'::jsonb) || %s
+                WHERE job_id = %s
+                """,
+                (
+                    status,
+                    error,
+                    Json(summary),
+                    Json({"phases": job.phases}),
+                    job.job_id,
+                ),
+            )
+        except psycopg2.Error as e:
+            logger.warning(f"Could not finish job {job.job_id}: {e}")
+        self.log(
+            job,
+            "INFO" if success else "ERROR",
+            f"Job {status}" + (f": {error}" if error else ""),
+            summary,
+        )
+        if success:
+            shutil.rmtree(job.artifact_dir, ignore_errors=True)
+
+    def log(
+        self,
+        job: LedgerJob,
+        level: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+    ):
+        """Add an entry to the job's log in processing.processing_logs."""
+        try:
+            self._execute(
+                """
+                INSERT INTO processing.processing_logs (
+                    job_id, log_level, message, context
+                ) VALUES (%s, %s, %s, %s)
+                """,
+                (job.job_id, level, message, Json(context or {})),
+            )
+        except psycopg2.Error as e:
+            logger.warning(f"Could not log to job {job.job_id}: {e}")
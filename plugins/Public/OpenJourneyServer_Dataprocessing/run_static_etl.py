@@ -9,17 +9,30 @@ This script implements Task 1: Build the Static ETL Orchestrator
 - Orchestrates the ETL process for static data feeds
 
 Usage:
-    python run_static_etl.py [--config CONFIG_FILE] [--feed FEED_NAME] [--dry-run]
+    python run_static_etl.py [--config CONFIG_FILE] [--feed FEED_NAME] [--dry-run] [--force] [--rollback]
+                             [--parallel N] [--db-connections N]
 """
 
 import argparse
+import hashlib
 import logging
+import multiprocessing
 import sys
+import tempfile
+import threading
 import time
 import yaml
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
 import importlib.util
+import inspect
 import os
 
 # Add the project root to the Python path
@@ -31,8 +44,12 @@ from common.processor_interface import (
     ProcessorError,
     ProcessorRegistry,
 )
+from common.etl_instrumentation import PhaseMeasurement, collect_phases
 from common.metrics import get_metrics
 
+if TYPE_CHECKING:
+    from job_ledger import JobLedger, LedgerJob
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +57,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Manifest declaring the processors of a plugin's processors directory
+PROCESSOR_MANIFEST = "processors.yaml"
+
+
+@dataclass
+class FeedResult:
+    """Outcome of running the ETL process for one feed."""
+
+    name: str
+    feed_type: str
+    # "success", "failed", "disabled" or "dry_run"
+    status: str
+    # Seconds spent processing, or None if the feed was not processed
+    duration: Optional[float] = None
+    # Error type recorded in the ETL error metrics when the feed failed
+    error: Optional[str] = None
+    # Phases measured in a worker process, to record in this process
+    phases: List[PhaseMeasurement] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+
+@dataclass
+class ProcessorManifest:
+    """A processor declared in a plugin manifest, imported on first use."""
+
+    name: str
+    # Processor file and the ProcessorInterface subclass it defines
+    module: Path
+    class_name: str
+    # Feed types (lower case) handled by the processor
+    feed_types: List[str]
+    supported_formats: List[str]
+
 
 class StaticETLOrchestrator:
     """
@@ -47,7 +100,7 @@ class StaticETLOrchestrator:
 
     This class is responsible for:
     - Loading configuration from config.yaml
-    - Discovering and loading processor plugins
+    - Discovering processor plugins and loading them on first use
     - Running ETL processes for enabled feeds
     """
 
@@ -61,8 +114,11 @@ class StaticETLOrchestrator:
         self.config_path = Path(config_path)
         self.config = self._load_config()
         self.processor_registry = ProcessorRegistry()
+        self.processor_manifests: Dict[str, ProcessorManifest] = {}
+        self._processor_lock = threading.Lock()
         self.metrics = get_metrics()
-        self._load_processors()
+        self.job_ledger = self._create_job_ledger()
+        self._discover_processors()
 
     def _load_config(self) -> Dict[str, Any]:
         """
@@ -87,12 +143,40 @@ class StaticETLOrchestrator:
             logger.error(f"Invalid YAML in configuration file: {e}")
             raise
 
-    def _load_processors(self):
+    def _create_job_ledger(self) -> Optional["JobLedger"]:
         """
-        Discover and load processor plugins from the plugins directory.
+        Create the job ledger from the static_etl_jobs configuration.
+
+        The ledger is off unless enabled, as checkpointing writes every
+        batch of a feed to disk; it also needs a database. Without it feeds
+        run through the processor's process() without checkpoints.
 
-        This method searches for processor classes in the plugins directory
-        and registers them with the ProcessorRegistry.
+        Returns:
+            JobLedger, or None if it is disabled
+        """
+        settings = self.config.get("static_etl_jobs") or {}
+        db_config = self.config.get("postgres")
+        if not db_config or not settings.get("enabled", False):
+            return None
+
+        # Imported here so that runs without a ledger do not import psycopg2
+        from job_ledger import JobLedger
+
+        artifact_dir = settings.get("artifact_dir") or (
+            Path(tempfile.gettempdir()) / "oj_etl_jobs"
+        )
+        return JobLedger(db_config, Path(artifact_dir))
+
+    def _discover_processors(self):
+        """
+        Read the processor manifests of the plugins directory.
+
+        Plugins declare their processors in a processors.yaml manifest in
+        their processors directory. Those processors are only imported when
+        a feed first needs them (see _load_processor()), so startup does not
+        pay for their dependencies. Plugins without a manifest have their
+        *_processor.py files imported and registered now, as before
+        manifests existed.
         """
         plugins_dir = project_root / "plugins" / "Public"
 
@@ -102,27 +186,107 @@ class StaticETLOrchestrator:
 
         logger.info(f"Searching for processors in: {plugins_dir}")
 
-        # Search for processor files in plugin directories
-        for plugin_dir in plugins_dir.iterdir():
-            if plugin_dir.is_dir():
-                self._load_processors_from_plugin(plugin_dir)
+        for plugin_dir in sorted(plugins_dir.iterdir()):
+            processors_dir = plugin_dir / "processors"
+            if plugin_dir.is_dir() and processors_dir.is_dir():
+                self._read_processor_manifest(processors_dir)
 
-    def _load_processors_from_plugin(self, plugin_dir: Path):
+    def _read_processor_manifest(self, processors_dir: Path):
         """
-        Load processors from a specific plugin directory.
+        Add the processors declared in a plugin's manifest, or load its
+        processor files if it has none.
 
         Args:
-            plugin_dir: Path to the plugin directory
+            processors_dir: Path to the plugin's processors directory
         """
-        # Look for processors in the processors subdirectory
-        processors_dir = plugin_dir / "processors"
-        if processors_dir.exists():
-            for processor_file in processors_dir.glob("*_processor.py"):
+        manifest_path = processors_dir / PROCESSOR_MANIFEST
+        if not manifest_path.exists():
+            processor_files = sorted(processors_dir.glob("*_processor.py"))
+            for processor_file in processor_files:
                 self._load_processor_from_file(processor_file)
+            return
+
+        try:
+            with open(manifest_path, "r") as f:
+                entries = (yaml.safe_load(f) or {}).get("processors") or []
+            for entry in entries:
+                manifest = ProcessorManifest(
+                    name=entry["name"],
+                    module=processors_dir / entry["module"],
+                    class_name=entry["class"],
+                    feed_types=[
+                        feed_type.lower()
+                        for feed_type in entry.get("feed_types", [])
+                    ],
+                    supported_formats=list(
+                        entry.get("supported_formats", [])
+                    ),
+                )
+                self.processor_manifests[manifest.name.lower()] = manifest
+                logger.debug(f"Found processor: {manifest.name}")
+        except Exception as e:
+            logger.error(
+                f"Failed to read processor manifest {manifest_path}: {e}"
+            )
+            self.metrics.record_etl_error(
+                "processor_manifest_error", processors_dir.parent.name
+            )
+
+    def _load_processor(
+        self, manifest: ProcessorManifest
+    ) -> Optional[ProcessorInterface]:
+        """
+        Import and register a processor, unless that was done already.
+
+        Args:
+            manifest: Manifest entry of the processor
+
+        Returns:
+            ProcessorInterface instance or None if it could not be loaded
+        """
+        with self._processor_lock:
+            processor = self.processor_registry.get_processor(manifest.name)
+            if processor:
+                return processor
+
+            start_time = time.time()
+            processor_type = manifest.module.stem
+
+            try:
+                module = self._import_processor_module(manifest.module)
+                processor_class = getattr(module, manifest.class_name)
+                if not issubclass(processor_class, ProcessorInterface):
+                    raise TypeError(
+                        f"{manifest.class_name} is not a ProcessorInterface"
+                    )
+
+                # Create processor instance with database config
+                db_config = self.config.get("postgres", {})
+                processor = processor_class(db_config)
+                self.processor_registry.register(processor)
+
+                duration = time.time() - start_time
+                logger.info(
+                    f"Loaded processor {manifest.name} in {duration:.2f}s"
+                )
+                self.metrics.record_etl_processor_load_time(
+                    processor_type, duration
+                )
+                return processor
+
+            except Exception as e:
+                logger.error(
+                    f"Failed to load processor from {manifest.module}: {e}"
+                )
+                self.metrics.record_etl_error(
+                    "processor_load_error", processor_type
+                )
+                return None
 
     def _load_processor_from_file(self, processor_file: Path):
         """
-        Load a processor class from a Python file.
+        Import a processor file without a manifest and register every
+        processor class it defines.
 
         Args:
             processor_file: Path to the processor Python file
@@ -131,51 +295,57 @@ class StaticETLOrchestrator:
         processor_type = processor_file.stem
 
         try:
-            # Create module spec
-            module_name = f"processors.{processor_file.stem}"
-            spec = importlib.util.spec_from_file_location(
-                module_name, processor_file
-            )
-
-            if spec and spec.loader:
-                # Load the module
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-
-                # Find processor classes that inherit from ProcessorInterface
-                for item_name in dir(module):
-                    item = getattr(module, item_name)
-                    if (
-                        isinstance(item, type)
-                        and issubclass(item, ProcessorInterface)
-                        and item is not ProcessorInterface
-                    ):
-                        # Create processor instance with database config
-                        db_config = self.config.get("postgres", {})
-                        processor_instance = item(db_config)
-
-                        # Register the processor
-                        self.processor_registry.register(processor_instance)
-                        logger.info(
-                            f"Registered processor: {processor_instance.processor_name}"
-                        )
+            module = self._import_processor_module(processor_file)
+            for item in vars(module).values():
+                if (
+                    isinstance(item, type)
+                    and issubclass(item, ProcessorInterface)
+                    and not inspect.isabstract(item)
+                ):
+                    # Create processor instance with database config
+                    db_config = self.config.get("postgres", {})
+                    self.processor_registry.register(item(db_config))
 
-                        # Record successful processor loading time
-                        duration = time.time() - start_time
-                        self.metrics.record_etl_processor_load_time(
-                            processor_type, duration
-                        )
+            duration = time.time() - start_time
+            logger.info(
+                f"Loaded {processor_file} without a {PROCESSOR_MANIFEST} "
+                f"manifest in {duration:.2f}s"
+            )
+            self.metrics.record_etl_processor_load_time(
+                processor_type, duration
+            )
 
         except Exception as e:
             logger.error(
                 f"Failed to load processor from {processor_file}: {e}"
             )
-            # Record processor loading error
             self.metrics.record_etl_error(
                 "processor_load_error", processor_type
             )
 
+    @staticmethod
+    def _import_processor_module(processor_file: Path):
+        """
+        Import a processor file as processors.<file stem>.
+
+        Args:
+            processor_file: Path to the processor Python file
+
+        Returns:
+            The imported module
+        """
+        module_name = f"processors.{processor_file.stem}"
+        spec = importlib.util.spec_from_file_location(
+            module_name, processor_file
+        )
+        if not (spec and spec.loader):
+            raise ImportError(f"Cannot import {processor_file}")
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        return module
+
     def get_static_feeds(self) -> List[Dict[str, Any]]:
         """
         Get the list of static feeds from configuration.
@@ -186,7 +356,10 @@ class StaticETLOrchestrator:
         return self.config.get("static_feeds", []) or []
 
     def run_feed(
-        self, feed_config: Dict[str, Any], dry_run: bool = False
+        self,
+        feed_config: Dict[str, Any],
+        dry_run: bool = False,
+        force: bool = False,
     ) -> bool:
         """
         Run ETL process for a single feed.
@@ -194,10 +367,36 @@ class StaticETLOrchestrator:
         Args:
             feed_config: Configuration for the feed
             dry_run: If True, only validate without processing
+            force: If True, reload files even if they are unchanged
 
         Returns:
             True if successful, False otherwise
         """
+        result = self.execute_feed(feed_config, dry_run, force)
+        self.record_feed_result(result)
+        return result.ok
+
+    def execute_feed(
+        self,
+        feed_config: Dict[str, Any],
+        dry_run: bool = False,
+        force: bool = False,
+    ) -> FeedResult:
+        """
+        Run ETL process for a single feed without recording metrics.
+
+        Parallel runs execute feeds in worker processes, whose metrics are
+        not exported, so the outcome is returned for the parent process to
+        record with record_feed_result().
+
+        Args:
+            feed_config: Configuration for the feed
+            dry_run: If True, only validate without processing
+            force: If True, reload files even if they are unchanged
+
+        Returns:
+            Outcome of the feed
+        """
         feed_name = feed_config.get("name", "Unknown")
         feed_type = feed_config.get("type", "")
         feed_source = feed_config.get("source", "")
@@ -206,32 +405,37 @@ class StaticETLOrchestrator:
 
         if not feed_config.get("enabled", False):
             logger.info(f"Feed {feed_name} is disabled, skipping")
-            return True
+            return FeedResult(feed_name, feed_type, "disabled")
 
         if dry_run:
             logger.info(
                 f"DRY RUN: Would process {feed_name} from {feed_source}"
             )
-            return True
+            return FeedResult(feed_name, feed_type, "dry_run")
 
         # Start timing for metrics
         start_time = time.time()
+        job = None
 
         try:
             # Find appropriate processor for this feed type
             processor = self._get_processor_for_type(feed_type)
             if not processor:
                 logger.error(f"No processor found for feed type: {feed_type}")
-                self.metrics.record_etl_error("no_processor_found", feed_name)
-                self.metrics.record_etl_feed_processed("failed", feed_type)
-                return False
-
-            # Create source path from URL or file path
-            source_path = (
-                Path(feed_source)
-                if not feed_source.startswith("http")
-                else feed_source
-            )
+                return FeedResult(
+                    feed_name, feed_type, "failed", error="no_processor_found"
+                )
+
+            # Per-feed processor options (e.g. load_mode for GTFS)
+            options = dict(feed_config.get("options") or {})
+            job = self._open_job(feed_config, options, force)
+            if force:
+                options["force"] = True
+
+            # Remote sources are downloaded by the processor itself
+            source_path = Path(feed_source)
+            if feed_source.startswith("http"):
+                options["url"] = feed_source
 
             # Run the ETL process
             source_info = {
@@ -241,36 +445,106 @@ class StaticETLOrchestrator:
                 "description": feed_config.get("description", ""),
             }
 
-            processor.process(source_path, source_info)
-
-            # Record successful processing
-            duration = time.time() - start_time
-            self.metrics.record_etl_processing_time(
-                feed_name, feed_type, duration
-            )
-            self.metrics.record_etl_feed_processed("success", feed_type)
-
-            logger.info(f"Successfully processed feed: {feed_name}")
-            return True
+            if processor.process(
+                source_path, source_info, checkpoints=job, **options
+            ):
+                logger.info(f"Successfully processed feed: {feed_name}")
+                result = FeedResult(
+                    feed_name, feed_type, "success", time.time() - start_time
+                )
+            else:
+                logger.error(f"Processing failed for feed: {feed_name}")
+                result = FeedResult(
+                    feed_name,
+                    feed_type,
+                    "failed",
+                    time.time() - start_time,
+                    "processing_failed",
+                )
 
         except ProcessorError as e:
             logger.error(f"Processor error for feed {feed_name}: {e}")
-            duration = time.time() - start_time
-            self.metrics.record_etl_processing_time(
-                feed_name, feed_type, duration
+            result = FeedResult(
+                feed_name,
+                feed_type,
+                "failed",
+                time.time() - start_time,
+                "processor_error",
             )
-            self.metrics.record_etl_error("processor_error", feed_name)
-            self.metrics.record_etl_feed_processed("failed", feed_type)
-            return False
         except Exception as e:
             logger.error(f"Unexpected error processing feed {feed_name}: {e}")
-            duration = time.time() - start_time
+            result = FeedResult(
+                feed_name,
+                feed_type,
+                "failed",
+                time.time() - start_time,
+                "unexpected_error",
+            )
+
+        if job is not None:
+            self.job_ledger.finish(job, result.ok, result.error)
+        return result
+
+    def _open_job(
+        self, feed_config: Dict[str, Any], options: Dict[str, Any], force: bool
+    ) -> Optional["LedgerJob"]:
+        """
+        Open the ledger job of a feed run, resuming its last failed job.
+
+        Forced runs always start a new job. When the ledger is disabled or
+        unavailable the feed runs without checkpoints.
+
+        Returns:
+            The job, or None to run without checkpoints
+        """
+        if self.job_ledger is None:
+            return None
+
+        feed_name = feed_config.get("name", "Unknown")
+        feed_source = feed_config.get("source", "")
+        input_data = {
+            "source": feed_source,
+            # Only a job run on the same content of the source is resumed
+            "source_hash": source_fingerprint(feed_source),
+            "type": feed_config.get("type", ""),
+            "options": dict(options),
+        }
+        try:
+            return self.job_ledger.open_job(
+                feed_name, input_data, resume=not force
+            )
+        except Exception as e:
+            logger.warning(
+                f"Job ledger unavailable, running {feed_name} without "
+                f"checkpoints: {e}"
+            )
+            return None
+
+    def record_feed_result(self, result: FeedResult):
+        """
+        Record the metrics for the outcome of a feed, including the phases
+        it ran in a worker process, whose own metrics are not exported.
+        """
+        for phase in result.phases:
+            self.metrics.record_etl_phase(
+                phase.processor,
+                phase.phase,
+                phase.duration,
+                phase.cpu_seconds,
+                phase.rss_delta_bytes,
+                phase.records,
+                phase.nbytes,
+            )
+        if result.duration is not None:
             self.metrics.record_etl_processing_time(
-                feed_name, feed_type, duration
+                result.name, result.feed_type, result.duration
+            )
+        if result.error:
+            self.metrics.record_etl_error(result.error, result.name)
+        if result.status in ("success", "failed"):
+            self.metrics.record_etl_feed_processed(
+                result.status, result.feed_type
             )
-            self.metrics.record_etl_error("unexpected_error", feed_name)
-            self.metrics.record_etl_feed_processed("failed", feed_type)
-            return False
 
     def _get_processor_for_type(
         self, feed_type: str
@@ -278,27 +552,40 @@ class StaticETLOrchestrator:
         """
         Get the appropriate processor for a given feed type.
 
+        Processors without a manifest handle the feed type matching their
+        name (e.g. 'netex' for NeTEx).
+
         Args:
             feed_type: The type of feed (e.g., 'gtfs', 'netex')
 
         Returns:
             ProcessorInterface instance or None if not found
         """
-        # Map feed types to processor names
-        type_mapping = {"gtfs": "GTFS", "netex": "NeTEx", "siri": "SIRI"}
-
-        processor_name = type_mapping.get(feed_type.lower())
-        if processor_name:
-            return self.processor_registry.get_processor(processor_name)
-
-        return None
-
-    def run_all_feeds(self, dry_run: bool = False) -> bool:
+        for manifest in self.processor_manifests.values():
+            if feed_type.lower() in manifest.feed_types:
+                return self._load_processor(manifest)
+
+        return self.processor_registry.get_processor(feed_type)
+
+    def run_all_feeds(
+        self,
+        dry_run: bool = False,
+        force: bool = False,
+        parallel: int = 1,
+        db_connections: Optional[int] = None,
+    ) -> bool:
         """
         Run ETL process for all enabled feeds.
 
         Args:
             dry_run: If True, only validate without processing
+            force: If True, reload files even if they are unchanged
+            parallel: Number of feeds processed at once, each in its own
+                worker process; 1 processes them one at a time in this
+                process
+            db_connections: Database connections the feeds running at
+                once may use in total (see feed_db_connections);
+                defaults to one per parallel feed
 
         Returns:
             True if all feeds processed successfully, False otherwise
@@ -311,18 +598,186 @@ class StaticETLOrchestrator:
 
         logger.info(f"Found {len(feeds)} static feeds in configuration")
 
-        success_count = 0
-        for feed_config in feeds:
-            if self.run_feed(feed_config, dry_run):
-                success_count += 1
+        results = self.run_feeds(
+            feeds, dry_run, force, parallel, db_connections
+        )
 
+        success_count = sum(result.ok for result in results.values())
         logger.info(
             f"Processed {success_count}/{len(feeds)} feeds successfully"
         )
+        failed = [name for name, result in results.items() if not result.ok]
+        if failed:
+            logger.error(f"Failed feeds: {', '.join(failed)}")
         return success_count == len(feeds)
 
+    def run_feeds(
+        self,
+        feeds: List[Dict[str, Any]],
+        dry_run: bool = False,
+        force: bool = False,
+        parallel: int = 1,
+        db_connections: Optional[int] = None,
+    ) -> Dict[str, FeedResult]:
+        """
+        Run feeds in configuration order, honouring their dependencies.
+
+        A feed's ``depends_on`` names the feeds (one, or a list) that must
+        have finished before it starts; it fails without running if any
+        of them failed or is not configured, or if the feeds depend on
+        each other in a cycle. With ``parallel`` above 1, feeds whose
+        dependencies have finished run in a pool of worker processes, as
+        long as the feeds running together stay within ``db_connections``.
+
+        Returns:
+            Outcome of each feed, by feed name
+        """
+        parallel = max(1, parallel)
+        budget = max(1, db_connections or parallel)
+        names = {feed.get("name", "Unknown") for feed in feeds}
+        results: Dict[str, FeedResult] = {}
+        pending = list(feeds)
+        running: Dict[Future, Tuple[Dict[str, Any], int]] = {}
+        connections_in_use = 0
+
+        def finish(result: FeedResult):
+            self.record_feed_result(result)
+            results[result.name] = result
+
+        executor = None
+        if parallel > 1 and not dry_run:
+            logger.info(
+                f"Running up to {parallel} feeds at once with "
+                f"{budget} database connections"
+            )
+            # Spawned workers each import the processors their feeds need
+            executor = ProcessPoolExecutor(
+                max_workers=parallel,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(str(self.config_path),),
+            )
+
+        try:
+            while pending or running:
+                progressed = False
+                for feed in list(pending):
+                    name = feed.get("name", "Unknown")
+                    dependencies = self.feed_dependencies(feed)
+                    missing = [d for d in dependencies if d not in names]
+                    if not missing and any(
+                        d not in results for d in dependencies
+                    ):
+                        continue
+
+                    blocked = missing or [
+                        d for d in dependencies if not results[d].ok
+                    ]
+                    inline = (
+                        executor is None
+                        or blocked
+                        or not feed.get("enabled", False)
+                    )
+                    cost = min(self.feed_db_connections(feed), budget)
+                    if not inline and (
+                        len(running) >= parallel
+                        or connections_in_use + cost > budget
+                    ):
+                        continue
+
+                    pending.remove(feed)
+                    progressed = True
+                    if blocked:
+                        logger.error(
+                            f"Not processing feed {name}: dependencies "
+                            f"{', '.join(blocked)} failed or are not "
+                            f"configured"
+                        )
+                        finish(
+                            FeedResult(
+                                name,
+                                feed.get("type", ""),
+                                "failed",
+                                error="dependency_failed",
+                            )
+                        )
+                    elif inline:
+                        finish(self.execute_feed(feed, dry_run, force))
+                    else:
+                        future = executor.submit(
+                            _execute_feed_in_worker, feed, dry_run, force
+                        )
+                        running[future] = (feed, cost)
+                        connections_in_use += cost
+
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        feed, cost = running.pop(future)
+                        connections_in_use -= cost
+                        try:
+                            finish(future.result())
+                        except Exception as e:
+                            # The worker died, e.g. killed for memory
+                            name = feed.get("name", "Unknown")
+                            logger.error(
+                                f"Worker failed processing feed {name}: {e}"
+                            )
+                            finish(
+                                FeedResult(
+                                    name,
+                                    feed.get("type", ""),
+                                    "failed",
+                                    error="worker_error",
+                                )
+                            )
+                elif pending and not progressed:
+                    # Everything left waits on another pending feed
+                    cycle = [feed.get("name", "Unknown") for feed in pending]
+                    logger.error(
+                        f"Circular feed dependencies: {', '.join(cycle)}"
+                    )
+                    for feed in pending:
+                        finish(
+                            FeedResult(
+                                feed.get("name", "Unknown"),
+                                feed.get("type", ""),
+                                "failed",
+                                error="dependency_cycle",
+                            )
+                        )
+                    pending.clear()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return results
+
+    @staticmethod
+    def feed_dependencies(feed_config: Dict[str, Any]) -> List[str]:
+        """Names of the feeds a feed's ``depends_on`` waits for."""
+        depends_on = feed_config.get("depends_on") or []
+        if isinstance(depends_on, str):
+            return [depends_on]
+        return list(depends_on)
+
+    @staticmethod
+    def feed_db_connections(feed_config: Dict[str, Any]) -> int:
+        """
+        Database connections a feed holds while it runs.
+
+        Taken from the feed's ``db_connections`` if set; otherwise one, or
+        one plus its pooled load connections when its options set
+        ``load_workers`` above 1 (see the GTFS processor).
+        """
+        if feed_config.get("db_connections"):
+            return int(feed_config["db_connections"])
+        options = feed_config.get("options") or {}
+        load_workers = int(options.get("load_workers", 1))
+        return 1 + load_workers if load_workers > 1 else 1
+
     def run_specific_feed(
-        self, feed_name: str, dry_run: bool = False
+        self, feed_name: str, dry_run: bool = False, force: bool = False
     ) -> bool:
         """
         Run ETL process for a specific feed by name.
@@ -330,6 +785,7 @@ class StaticETLOrchestrator:
         Args:
             feed_name: Name of the feed to process
             dry_run: If True, only validate without processing
+            force: If True, reload files even if they are unchanged
 
         Returns:
             True if successful, False otherwise
@@ -338,11 +794,33 @@ class StaticETLOrchestrator:
 
         for feed_config in feeds:
             if feed_config.get("name") == feed_name:
-                return self.run_feed(feed_config, dry_run)
+                return self.run_feed(feed_config, dry_run, force)
 
         logger.error(f"Feed not found: {feed_name}")
         return False
 
+    def rollback(self) -> bool:
+        """
+        Restore the data replaced by the last load of every processor that
+        keeps a previous version (e.g. GTFS shadow loads).
+
+        Returns:
+            True if every such processor rolled back successfully
+        """
+        for manifest in self.processor_manifests.values():
+            self._load_processor(manifest)
+
+        results = []
+        for name in self.processor_registry.list_processors():
+            processor = self.processor_registry.get_processor(name)
+            if hasattr(processor, "rollback"):
+                logger.info(f"Rolling back {processor.processor_name}")
+                results.append(processor.rollback())
+
+        if not results:
+            logger.warning("No processor supports rollback")
+        return bool(results) and all(results)
+
     def list_feeds(self):
         """List all configured static feeds."""
         feeds = self.get_static_feeds()
@@ -364,23 +842,110 @@ class StaticETLOrchestrator:
             print("-" * 50)
 
     def list_processors(self):
-        """List all registered processors."""
-        processors = self.processor_registry.list_processors()
-
-        if not processors:
+        """
+        List all available processors. Processors with a manifest are
+        listed without importing them.
+        """
+        legacy = [
+            self.processor_registry.get_processor(name)
+            for name in self.processor_registry.list_processors()
+            if name not in self.processor_manifests
+        ]
+        if not (self.processor_manifests or legacy):
             print("No processors registered")
             return
 
         print("Registered processors:")
         print("-" * 50)
 
-        for processor_name in processors:
-            processor = self.processor_registry.get_processor(processor_name)
-            if processor:
-                formats = processor.supported_formats
-                print(f"Name: {processor_name}")
-                print(f"Supported formats: {', '.join(formats)}")
-                print("-" * 50)
+        for manifest in self.processor_manifests.values():
+            print(f"Name: {manifest.name}")
+            print(f"Feed types: {', '.join(manifest.feed_types)}")
+            formats = ", ".join(manifest.supported_formats)
+            print(f"Supported formats: {formats}")
+            print("-" * 50)
+
+        for processor in legacy:
+            print(f"Name: {processor.processor_name}")
+            print(f"Feed types: {processor.processor_name.lower()}")
+            formats = ", ".join(processor.supported_formats)
+            print(f"Supported formats: {formats}")
+            print("-" * 50)
+
+
+def source_fingerprint(feed_source: str) -> Optional[str]:
+    """
+    Identify the content of a feed source, so that a job is only resumed
+    on the same version of the feed.
+
+    Local files and directories are identified by the SHA-256 of their
+    content. Remote sources are only downloaded by the processor, so they
+    are identified by the ETag, or failing that the Last-Modified date,
+    that the server reports for them.
+
+    Args:
+        feed_source: Path or URL of the feed
+
+    Returns:
+        The fingerprint, or None if the source cannot be identified
+    """
+    try:
+        if feed_source.startswith("http"):
+            import requests
+
+            response = requests.head(
+                feed_source, allow_redirects=True, timeout=30
+            )
+            response.raise_for_status()
+            validator = response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+            return f"http:{validator}" if validator else None
+
+        path = Path(feed_source)
+        if path.is_file():
+            root, files = path.parent, [path]
+        elif path.is_dir():
+            root = path
+            files = sorted(p for p in path.rglob("*") if p.is_file())
+        else:
+            return None
+
+        digest = hashlib.sha256()
+        for file_path in files:
+            digest.update(str(file_path.relative_to(root)).encode())
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return f"sha256:{digest.hexdigest()}"
+    except Exception as e:
+        logger.warning(f"Could not identify content of {feed_source}: {e}")
+        return None
+
+
+# Orchestrator of a worker process in parallel runs
+_worker_orchestrator: Optional[StaticETLOrchestrator] = None
+
+
+def _init_worker(config_path: str):
+    """Load the configuration in a worker process."""
+    global _worker_orchestrator
+    _worker_orchestrator = StaticETLOrchestrator(config_path)
+
+
+def _execute_feed_in_worker(
+    feed_config: Dict[str, Any], dry_run: bool, force: bool
+) -> FeedResult:
+    """
+    Run one feed in a worker process, returning the measurements of its
+    phases with the result.
+    """
+    with collect_phases() as phases:
+        result = _worker_orchestrator.execute_feed(
+            feed_config, dry_run, force
+        )
+    result.phases = phases
+    return result
 
 
 def main():
@@ -406,6 +971,35 @@ def main():
         help="Validate configuration without processing feeds",
     )
 
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reload every file even if its content is unchanged, and "
+        "start failed feeds over instead of resuming their last job",
+    )
+
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Process up to N independent feeds at once in worker processes",
+    )
+
+    parser.add_argument(
+        "--db-connections",
+        type=int,
+        metavar="N",
+        help="Database connections shared by the feeds running at once "
+        "(default: one per parallel feed)",
+    )
+
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Restore the tables replaced by the last shadow load",
+    )
+
     parser.add_argument(
         "--list-feeds",
         action="store_true",
@@ -441,11 +1035,18 @@ def main():
             orchestrator.list_processors()
             return 0
 
+        if args.rollback:
+            return 0 if orchestrator.rollback() else 1
+
         # Process feeds
         if args.feed:
-            success = orchestrator.run_specific_feed(args.feed, args.dry_run)
+            success = orchestrator.run_specific_feed(
+                args.feed, args.dry_run, args.force
+            )
         else:
-            success = orchestrator.run_all_feeds(args.dry_run)
+            success = orchestrator.run_all_feeds(
+                args.dry_run, args.force, args.parallel, args.db_connections
+            )
 
         return 0 if success else 1
 
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the static ETL job ledger.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pandas as pd
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from job_ledger import (  # noqa: E402
+    JOB_TYPE,
+    STATUS_FAILED,
+    JobLedger,
+    LedgerJob,
+)
+from run_static_etl import (  # noqa: E402
+    StaticETLOrchestrator,
+    source_fingerprint,
+)
+
+INPUT = {
+    "source": "feed.zip",
+    "source_hash": "sha256:1234",
+    "type": "gtfs",
+    "options": {},
+}
+
+
+def test_ledger_job_keeps_batches_on_disk(tmp_path):
+    """Groups are pickled per phase and restarting drops later phases."""
+    ledger = MagicMock()
+    job = LedgerJob(ledger, 7, "Metro", tmp_path / "7")
+    frame = pd.DataFrame({"stop_id": ["S1", "S2"]})
+
+    job.restart("extract")
+    job.save_batches("extract", 0, [("stops", frame)])
+    job.save_batches("extract", 1, [("stops", frame), ("routes", [1])])
+    job.complete("extract", {"load_keys": ["stops"]})
+    job.save_batches("transform", 0, [])
+
+    tables = [table for table, _ in job.read_batches("extract", 1)]
+    assert tables == ["stops", "routes"]
+    assert job.phases["extract"]["batches"] == 2
+    assert job.phases["extract"]["rows"] == 5
+    assert job.is_complete("extract")
+    assert job.state("extract") == {"load_keys": ["stops"]}
+    ledger.save_checkpoints.assert_called_with(job)
+
+    job.restart("extract")
+    assert not job.is_complete("extract")
+    assert "transform" not in job.phases
+    assert not (tmp_path / "7" / "transform").exists()
+    assert list(job.read_batches("extract")) == []
+
+
+def test_open_job_resumes_the_last_failed_job(tmp_path):
+    """A failed job with the same input and artifacts is picked up again."""
+    (tmp_path / "3").mkdir()
+    ledger = JobLedger({}, tmp_path)
+    metadata = {"phases": {"extract": {"completed": True, "batches": 1}}}
+    ledger._execute = MagicMock(
+        return_value={
+            "job_id": 3,
+            "status": STATUS_FAILED,
+            "input_data": INPUT,
+            "metadata": metadata,
+        }
+    )
+
+    job = ledger.open_job("Metro", INPUT)
+
+    assert job.resumed
+    assert job.job_id == 3
+    assert job.is_complete("extract")
+    assert job.artifact_dir == tmp_path / "3"
+    query, params = ledger._execute.call_args_list[0].args
+    assert params == ("Metro", JOB_TYPE)
+
+
+def test_open_job_starts_over_when_input_changed(tmp_path):
+    """Other options or content, or a forced run, start a new job."""
+    (tmp_path / "3").mkdir()
+    ledger = JobLedger({}, tmp_path)
+    last = {
+        "job_id": 3,
+        "status": STATUS_FAILED,
+        "input_data": INPUT,
+        "metadata": {},
+    }
+    ledger._execute = MagicMock(side_effect=[last, {"job_id": 4}])
+    changed = dict(INPUT, options={"load_mode": "delta"})
+
+    assert ledger.open_job("Metro", changed).job_id == 4
+
+    # The feed was republished after the failed run, or cannot be identified
+    for source_hash in ("sha256:5678", None):
+        ledger._execute = MagicMock(side_effect=[last, {"job_id": 4}])
+        changed = dict(INPUT, source_hash=source_hash)
+        assert not ledger.open_job("Metro", changed).resumed
+
+    ledger._execute = MagicMock(side_effect=[last, {"job_id": 5}])
+    job = ledger.open_job("Metro", INPUT, resume=False)
+    assert job.job_id == 5
+    assert not job.resumed
+    assert "INSERT INTO processing.processing_jobs" in (
+        ledger._execute.call_args.args[0]
+    )
+
+
+def test_feed_runs_are_recorded_as_jobs(tmp_path):
+    """The orchestrator checkpoints runs and finishes the job."""
+    config_path = tmp_path / "config.yaml"
+    config = {"postgres": {"host": "db"}}
+    config_path.write_text(yaml.safe_dump(config))
+    # Checkpointing is opt-in
+    assert StaticETLOrchestrator(str(config_path)).job_ledger is None
+
+    config["static_etl_jobs"] = {
+        "enabled": True,
+        "artifact_dir": str(tmp_path / "jobs"),
+    }
+    config_path.write_text(yaml.safe_dump(config))
+    orchestrator = StaticETLOrchestrator(str(config_path))
+    assert orchestrator.job_ledger.artifact_dir == tmp_path / "jobs"
+
+    orchestrator.job_ledger = MagicMock()
+    job = orchestrator.job_ledger.open_job.return_value
+    processor = MagicMock()
+    processor.process.return_value = False
+    orchestrator._get_processor_for_type = MagicMock(return_value=processor)
+
+    feed = {
+        "name": "Metro",
+        "type": "gtfs",
+        "source": "feed.zip",
+        "enabled": True,
+        "options": {"load_mode": "delta"},
+    }
+    result = orchestrator.execute_feed(feed, force=True)
+
+    assert not result.ok
+    orchestrator.job_ledger.open_job.assert_called_once_with(
+        "Metro",
+        {
+            "source": "feed.zip",
+            "source_hash": None,
+            "type": "gtfs",
+            "options": {"load_mode": "delta"},
+        },
+        resume=False,
+    )
+    assert processor.process.call_args.kwargs["checkpoints"] is job
+    orchestrator.job_ledger.finish.assert_called_once_with(
+        job, False, "processing_failed"
+    )
+
+
+def test_source_fingerprint_follows_content(tmp_path):
+    """Local feeds are identified by the SHA-256 of their content."""
+    feed_zip = tmp_path / "feed.zip"
+    feed_zip.write_bytes(b"v1")
+    feed_dir = tmp_path / "feed"
+    feed_dir.mkdir()
+    (feed_dir / "stops.txt").write_text("stop_id\nS1\n")
+
+    first = source_fingerprint(str(feed_zip))
+    assert first.startswith("sha256:")
+    assert source_fingerprint(str(feed_zip)) == first
+    feed_zip.write_bytes(b"v2")
+    assert source_fingerprint(str(feed_zip)) != first
+
+    in_dir = source_fingerprint(str(feed_dir))
+    (feed_dir / "stops.txt").write_text("stop_id\nS2\n")
+    assert source_fingerprint(str(feed_dir)) != in_dir
+    assert source_fingerprint(str(tmp_path / "missing.zip")) is None
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for feed scheduling in the static ETL orchestrator.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import run_static_etl  # noqa: E402
+from run_static_etl import FeedResult, StaticETLOrchestrator  # noqa: E402
+
+
+class ThreadExecutor(ThreadPoolExecutor):
+    """Stands in for the worker process pool, running feeds on threads."""
+
+    def __init__(self, max_workers, mp_context=None, **kwargs):
+        super().__init__(max_workers)
+
+
+def make_orchestrator(tmp_path, feeds):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"static_feeds": feeds}))
+    orchestrator = StaticETLOrchestrator(str(config_path))
+    orchestrator.metrics = MagicMock()
+    return orchestrator
+
+
+def feed(name, **config):
+    return dict({"name": name, "type": "gtfs", "enabled": True}, **config)
+
+
+def test_run_feed_fails_when_processing_fails(tmp_path):
+    """A processor returning False fails the feed."""
+    orchestrator = make_orchestrator(tmp_path, [])
+    processor = MagicMock()
+    processor.process.return_value = False
+    orchestrator._get_processor_for_type = MagicMock(return_value=processor)
+
+    assert not orchestrator.run_feed(feed("A", source="a.zip"))
+    orchestrator.metrics.record_etl_error.assert_called_once_with(
+        "processing_failed", "A"
+    )
+    orchestrator.metrics.record_etl_feed_processed.assert_called_once_with(
+        "failed", "gtfs"
+    )
+
+
+def test_serial_run_follows_dependencies(tmp_path):
+    """Feeds start after their dependencies; failures block dependents."""
+    orchestrator = make_orchestrator(
+        tmp_path,
+        [
+            feed("C", depends_on=["A", "B"]),
+            feed("A"),
+            feed("B", depends_on="A"),
+            feed("D", depends_on="Missing"),
+            feed("E", depends_on="F"),
+            feed("F", depends_on="E"),
+        ],
+    )
+    order = []
+
+    def execute_feed(feed_config, dry_run, force):
+        order.append(feed_config["name"])
+        return FeedResult(feed_config["name"], "gtfs", "success", 1.0)
+
+    orchestrator.execute_feed = execute_feed
+
+    assert not orchestrator.run_all_feeds()
+    assert order == ["A", "B", "C"]
+
+    results = orchestrator.run_feeds(orchestrator.get_static_feeds())
+    assert results["D"].error == "dependency_failed"
+    assert results["E"].error == results["F"].error == "dependency_cycle"
+
+
+def test_parallel_run_respects_connection_budget(tmp_path):
+    """Feeds run together only while their connections fit the budget."""
+    feeds = [
+        feed("A"),
+        feed("B"),
+        feed("Big", options={"load_workers": 2}),
+        feed("After", depends_on="Big"),
+    ]
+    orchestrator = make_orchestrator(tmp_path, feeds)
+    lock = threading.Lock()
+    active = {}
+    overlaps = []
+
+    def execute(feed_config, dry_run, force):
+        name = feed_config["name"]
+        with lock:
+            active[name] = StaticETLOrchestrator.feed_db_connections(
+                feed_config
+            )
+            overlaps.append((name, dict(active)))
+        time.sleep(0.05)
+        with lock:
+            del active[name]
+        status = "failed" if name == "Big" else "success"
+        return FeedResult(name, "gtfs", status, 0.05)
+
+    with patch.object(run_static_etl, "ProcessPoolExecutor", ThreadExecutor):
+        with patch.object(run_static_etl, "_execute_feed_in_worker", execute):
+            results = orchestrator.run_feeds(
+                feeds, parallel=3, db_connections=3
+            )
+
+    assert [name for name, _ in overlaps] == ["A", "B", "Big"]
+    # Big needs all three connections, so it waits for A and B to finish
+    assert overlaps[1][1] == {"A": 1, "B": 1}
+    assert overlaps[2][1] == {"Big": 3}
+    assert results["After"].error == "dependency_failed"
+    # Metrics are recorded in this process for every feed
+    assert orchestrator.metrics.record_etl_feed_processed.call_count == 4
+
+
+def test_parallel_run_in_worker_processes(tmp_path):
+    """Feeds run in spawned workers and their outcome comes back."""
+    feeds = [
+        feed("Bad", type="unknown"),
+        feed("Off", enabled=False),
+        feed("Later", type="unknown", depends_on="Off"),
+    ]
+    orchestrator = make_orchestrator(tmp_path, feeds)
+
+    results = orchestrator.run_feeds(feeds, parallel=2)
+
+    assert results["Bad"].error == "no_processor_found"
+    # Disabled feeds do not block their dependents
+    assert results["Off"].status == "disabled"
+    assert results["Later"].error == "no_processor_found"
+    orchestrator.metrics.record_etl_error.assert_any_call(
+        "no_processor_found", "Bad"
+    )
+
+
+FAKE_PROCESSOR = '''
+from common.processor_interface import ProcessorInterface
+
+
+class FakeProcessor(ProcessorInterface):
+    processor_name = "Fake"
+    supported_formats = [".fake"]
+
+    def extract(self, source_path, **kwargs):
+        return {}
+
+    def transform(self, raw_data, source_info):
+        return {}
+
+    def load(self, transformed_data):
+        return True
+
+    def validate_source(self, source_path):
+        return True
+'''
+
+
+def test_processors_are_imported_on_first_use(tmp_path, capsys):
+    """Only the manifest is read at startup; feeds import what they need."""
+    processors_dir = tmp_path / "plugins" / "Public" / "Fake" / "processors"
+    processors_dir.mkdir(parents=True)
+    (processors_dir / "fake_processor.py").write_text(FAKE_PROCESSOR)
+    (processors_dir / "processors.yaml").write_text(
+        yaml.safe_dump({
+            "processors": [
+                {
+                    "name": "Fake",
+                    "module": "fake_processor.py",
+                    "class": "FakeProcessor",
+                    "feed_types": ["FAKE"],
+                    "supported_formats": [".fake"],
+                }
+            ]
+        })
+    )
+
+    with patch.object(run_static_etl, "project_root", tmp_path):
+        orchestrator = make_orchestrator(tmp_path, [])
+    sys.modules.pop("processors.fake_processor", None)
+
+    orchestrator.list_processors()
+    assert "Feed types: fake" in capsys.readouterr().out
+    assert "processors.fake_processor" not in sys.modules
+    assert orchestrator.processor_registry.list_processors() == []
+
+    processor = orchestrator._get_processor_for_type("fake")
+    assert processor.processor_name == "Fake"
+    assert orchestrator._get_processor_for_type("Fake") is processor
+    assert orchestrator._get_processor_for_type("gtfs") is None
+
+    # The import is timed once, labelled with the processor module
+    (call,) = orchestrator.metrics.record_etl_processor_load_time.mock_calls
+    assert call.args[0] == "fake_processor"
+    assert call.args[1] >= 0
+
+
+def test_plugins_without_a_manifest_are_loaded_at_startup(tmp_path, capsys):
+    """Processor files of a plugin with no manifest are still registered."""
+    processors_dir = tmp_path / "plugins" / "Public" / "Fake" / "processors"
+    processors_dir.mkdir(parents=True)
+    (processors_dir / "fake_processor.py").write_text(FAKE_PROCESSOR)
+    metrics = MagicMock()
+
+    with patch.object(run_static_etl, "project_root", tmp_path):
+        with patch.object(run_static_etl, "get_metrics", lambda: metrics):
+            orchestrator = make_orchestrator(tmp_path, [])
+
+    # The abstract ProcessorInterface imported by the file is skipped
+    assert orchestrator.processor_registry.list_processors() == ["fake"]
+    processor = orchestrator._get_processor_for_type("FAKE")
+    assert processor.processor_name == "Fake"
+    assert orchestrator._get_processor_for_type("gtfs") is None
+    (call,) = metrics.record_etl_processor_load_time.mock_calls
+    assert call.args[0] == "fake_processor"
+
+    orchestrator.list_processors()
+    output = capsys.readouterr().out
+    assert "Name: Fake" in output
+    assert "Feed types: fake" in output
+
+
+def test_parallel_run_records_worker_phases(tmp_path):
+    """Phases measured in a worker are recorded in this process."""
+    namespace = {}
+    exec(FAKE_PROCESSOR, namespace)
+
+    class StopsProcessor(namespace["FakeProcessor"]):
+        def extract(self, source_path, **kwargs):
+            return {"stops": [1, 2, 3]}
+
+        def transform(self, raw_data, source_info):
+            return raw_data
+
+    feeds = [feed("A", source="a.zip")]
+    orchestrator = make_orchestrator(tmp_path, feeds)
+    worker = make_orchestrator(tmp_path, feeds)
+    worker._get_processor_for_type = MagicMock(
+        return_value=StopsProcessor({})
+    )
+
+    with patch.object(run_static_etl, "ProcessPoolExecutor", ThreadExecutor):
+        with patch.object(run_static_etl, "_worker_orchestrator", worker):
+            results = orchestrator.run_feeds(feeds, parallel=2)
+
+    assert results["A"].status == "success"
+    calls = orchestrator.metrics.record_etl_phase.call_args_list
+    assert [call.args[:2] for call in calls] == [
+        ("Fake", "extract"),
+        ("Fake", "transform"),
+        ("Fake", "load"),
+    ]
+    assert [call.args[5] for call in calls] == [3, 3, 3]
+    orchestrator.metrics.record_etl_processing_time.assert_called_once()
+
+
+def test_listing_feeds_does_not_import_the_job_ledger(tmp_path):
+    """The ledger, and psycopg2 with it, is only imported when enabled."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"postgres": {"host": "db"}}))
+    script = (
+        "import sys, run_static_etl\n"
+        f"run_static_etl.StaticETLOrchestrator({str(config_path)!r})"
+        ".list_feeds()\n"
+        "print('job_ledger' in sys.modules, 'psycopg2' in sys.modules)\n"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.splitlines()[-1] == "False False"
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GTFS ETL Benchmark Suite
+========================
+
+Times each phase of the GTFS pipelines on a synthetic feed and reports the
+results as JSON, so performance regressions show up between commits:
+
+- processor_extract, processor_transform and processor_load:
+  GTFSProcessor into the canonical schema
+- converter_read and converter_segments: the daemon's
+  GTFSToOpenJourneyConverter, with segment generation timed on its own
+
+Every phase reports wall time, rows, rows/sec and the peak RSS of the
+process while it ran. The load phase runs against a throwaway database
+created on a local PostgreSQL server for the run and dropped afterwards;
+pass --no-load to benchmark only the in-memory phases.
+
+Example:
+    python run_benchmarks.py --preset small --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Keep service logging at WARNING so it neither pollutes the JSON on
+# stdout nor shows up in the timings; set before common is imported
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+import gtfs_kit as gk
+import pandas as pd
+import psycopg2
+from psycopg2 import sql
+
+plugin_root = Path(__file__).parent.parent
+sys.path.insert(0, str(plugin_root.parent.parent.parent))
+sys.path.insert(0, str(plugin_root / "processors"))
+sys.path.insert(0, str(plugin_root / "gtfs_daemon"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from common.etl_instrumentation import PeakRSSSampler  # noqa: E402
+from gtfs_daemon import GTFSToOpenJourneyConverter  # noqa: E402
+from gtfs_processor import SCHEMA_SQL, GTFSProcessor  # noqa: E402
+from synthetic_gtfs import PRESETS, FeedSize, write_gtfs_zip  # noqa: E402
+
+# Interval between RSS samples while a phase runs
+RSS_SAMPLE_INTERVAL = 0.005
+
+
+class BenchmarkRun:
+    """Collects per-phase measurements for one benchmark run."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Measure one phase; the body stores its row count in ``["rows"]``.
+        """
+        result: Dict[str, Any] = {"rows": 0}
+        with PeakRSSSampler(RSS_SAMPLE_INTERVAL) as sampler:
+            start = time.perf_counter()
+            yield result
+            seconds = time.perf_counter() - start
+        result.update({
+            "seconds": round(seconds, 6),
+            "rows_per_sec": round(result["rows"] / seconds, 1)
+            if seconds
+            else None,
+            "peak_rss_bytes": sampler.peak_rss,
+            "rss_delta_bytes": sampler.peak_rss - sampler.start_rss,
+        })
+        self.phases[name] = result
+
+    def skip(self, name: str, reason: str):
+        self.phases[name] = {"skipped": reason}
+
+
+@contextmanager
+def throwaway_database(db_config: Dict[str, Any]) -> Iterator[Dict]:
+    """
+    Create an empty database with the canonical schema, dropping it after.
+
+    Args:
+        db_config: Connection settings; "database" names the maintenance
+            database used to create and drop the throwaway one
+
+    Yields:
+        Connection settings for the throwaway database
+    """
+    name = f"oj_benchmark_{os.getpid()}_{int(time.time())}"
+    admin = psycopg2.connect(**db_config)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute(
+                sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name))
+            )
+        bench_config = dict(db_config, database=name)
+        try:
+            with psycopg2.connect(**bench_config) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+                    cur.execute(SCHEMA_SQL.read_text())
+            conn.close()
+            yield bench_config
+        finally:
+            with admin.cursor() as cur:
+                cur.execute(
+                    sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(
+                        sql.Identifier(name)
+                    )
+                )
+    finally:
+        admin.close()
+
+
+def run_benchmarks(
+    size: FeedSize,
+    seed: int = 0,
+    db_config: Optional[Dict[str, Any]] = None,
+    load_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate a synthetic feed and benchmark every pipeline phase on it.
+
+    Args:
+        size: Dimensions of the synthetic feed
+        seed: Generator seed
+        db_config: Local PostgreSQL server for the load phase, or None to
+            skip it
+        load_options: GTFSProcessor options for the load, as accepted by
+            GTFSProcessor.process()
+
+    Returns:
+        JSON-serialisable report
+    """
+    run = BenchmarkRun()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed_path = Path(temp_dir) / "synthetic_gtfs.zip"
+        with run.phase("generate") as result:
+            counts = write_gtfs_zip(feed_path, size, seed)
+            result["rows"] = sum(counts.values())
+        total_rows = sum(counts.values())
+
+        processor = GTFSProcessor(db_config or {})
+        processor.options.update(load_options or {})
+        with run.phase("processor_extract") as result:
+            raw = processor.extract(feed_path)
+            result["rows"] = total_rows
+        with run.phase("processor_transform") as result:
+            transformed = processor.transform(raw, {})
+            result["rows"] = sum(len(frame) for frame in transformed.values())
+        del raw
+
+        if db_config is None:
+            run.skip("processor_load", "no database configured")
+        else:
+            with throwaway_database(db_config) as bench_config:
+                processor.writer.db_config = bench_config
+                with run.phase("processor_load") as result:
+                    if not processor.load(transformed):
+                        raise RuntimeError("GTFSProcessor load failed")
+                    stats = processor.load_stats
+                    result["rows"] = sum(t["rows"] for t in stats.values())
+                    result["tables"] = stats
+        processor.cleanup(processor.temp_files)
+        del transformed
+
+        converter = GTFSToOpenJourneyConverter()
+        with run.phase("converter_read") as result:
+            feed = gk.read_feed(feed_path, dist_units="km")
+            result["rows"] = total_rows
+        with run.phase("converter_segments") as result:
+            journey_data: Dict[str, Any] = {}
+            converter._generate_segments(feed, journey_data)
+            result["rows"] = len(journey_data["segments"])
+
+    return {
+        "feed": {"size": asdict(size), "seed": seed, "rows": counts},
+        "load_options": load_options or {},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pandas": pd.__version__,
+        },
+        "phases": run.phases,
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the GTFS ETL phases on a synthetic feed"
+    )
+    parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        default="small",
+        help="Synthetic feed size (default: small)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Feed seed")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Write the JSON report here instead of stdout",
+    )
+    parser.add_argument(
+        "--no-load",
+        action="store_true",
+        help="Skip the database load phase",
+    )
+    parser.add_argument(
+        "--load-mode",
+        default=GTFSProcessor.DEFAULT_OPTIONS["load_mode"],
+        help="GTFSProcessor load_mode for the load phase",
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=GTFSProcessor.DEFAULT_OPTIONS["load_workers"],
+        help="GTFSProcessor load_workers for the load phase",
+    )
+    parser.add_argument(
+        "--db-host", default=os.environ.get("PGHOST", "localhost")
+    )
+    parser.add_argument(
+        "--db-port", type=int, default=int(os.environ.get("PGPORT", 5432))
+    )
+    parser.add_argument(
+        "--db-user", default=os.environ.get("PGUSER", "postgres")
+    )
+    parser.add_argument(
+        "--db-password", default=os.environ.get("PGPASSWORD", "")
+    )
+    parser.add_argument(
+        "--db-maintenance-database",
+        default="postgres",
+        help="Database to connect to when creating the throwaway one",
+    )
+    args = parser.parse_args()
+
+    db_config = None
+    if not args.no_load:
+        db_config = {
+            "host": args.db_host,
+            "port": args.db_port,
+            "database": args.db_maintenance_database,
+            "user": args.db_user,
+            "password": args.db_password,
+        }
+    load_options = {
+        "load_mode": args.load_mode,
+        "load_workers": args.load_workers,
+    }
+
+    report = run_benchmarks(
+        PRESETS[args.preset], args.seed, db_config, load_options
+    )
+    report["feed"]["preset"] = args.preset
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
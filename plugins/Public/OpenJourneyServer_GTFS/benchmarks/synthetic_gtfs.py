@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic GTFS Feed Generator
+=============================
+
+Builds deterministic GTFS zip archives of configurable size for the ETL
+benchmarks. The same parameters and seed always produce a byte-identical
+archive, so content hashes and benchmark inputs are stable between runs.
+
+Feeds contain one agency, a cloud of stops around Hobart, routes that each
+visit a fixed sequence of stops along their own shape, weekday and weekend
+services, and trips spread over the day with the last departures running
+past midnight (times of 24:00:00 and above).
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import sys
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Centre of the generated stop cloud and its half-width in degrees
+CENTRE_LAT = -42.8821
+CENTRE_LON = 147.3272
+SPREAD_DEG = 0.25
+
+# Zip entries carry this timestamp so archives are byte-identical
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+ROUTE_TYPES = (3, 3, 3, 3, 0, 2, 4)
+FIRST_DEPARTURE_SECS = 5 * 3600
+LAST_DEPARTURE_SECS = 24 * 3600 + 30 * 60
+
+FEED_HEADERS = {
+    "agency.txt": (
+        "agency_id",
+        "agency_name",
+        "agency_url",
+        "agency_timezone",
+        "agency_lang",
+    ),
+    "stops.txt": (
+        "stop_id",
+        "stop_name",
+        "stop_lat",
+        "stop_lon",
+        "location_type",
+        "wheelchair_boarding",
+    ),
+    "routes.txt": (
+        "route_id",
+        "agency_id",
+        "route_short_name",
+        "route_long_name",
+        "route_type",
+        "route_color",
+    ),
+    "calendar.txt": (
+        "service_id",
+        "monday",
+        "tuesday",
+        "wednesday",
+        "thursday",
+        "friday",
+        "saturday",
+        "sunday",
+        "start_date",
+        "end_date",
+    ),
+    "calendar_dates.txt": ("service_id", "date", "exception_type"),
+    "shapes.txt": (
+        "shape_id",
+        "shape_pt_lat",
+        "shape_pt_lon",
+        "shape_pt_sequence",
+        "shape_dist_traveled",
+    ),
+    "trips.txt": (
+        "route_id",
+        "service_id",
+        "trip_id",
+        "trip_headsign",
+        "direction_id",
+        "shape_id",
+    ),
+    "stop_times.txt": (
+        "trip_id",
+        "arrival_time",
+        "departure_time",
+        "stop_id",
+        "stop_sequence",
+        "shape_dist_traveled",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class FeedSize:
+    """Dimensions of a synthetic feed."""
+
+    stops: int = 1000
+    routes: int = 50
+    trips_per_route: int = 40
+    stops_per_trip: int = 25
+    shape_points: int = 200
+
+    def __post_init__(self):
+        if self.stops < 2 or self.stops_per_trip < 2:
+            raise ValueError("Feeds need at least two stops per trip")
+        if self.stops_per_trip > self.stops:
+            raise ValueError("stops_per_trip cannot exceed stops")
+        if self.shape_points < 2:
+            raise ValueError("Shapes need at least two points")
+        if self.routes < 1 or self.trips_per_route < 1:
+            raise ValueError("Feeds need at least one route and trip")
+
+
+# Named sizes for the benchmark suite; "small" suits CI smoke runs
+PRESETS: Dict[str, FeedSize] = {
+    "small": FeedSize(
+        stops=200,
+        routes=10,
+        trips_per_route=10,
+        stops_per_trip=15,
+        shape_points=50,
+    ),
+    "medium": FeedSize(),
+    "large": FeedSize(
+        stops=10000,
+        routes=400,
+        trips_per_route=100,
+        stops_per_trip=40,
+        shape_points=500,
+    ),
+}
+
+
+def format_gtfs_time(seconds: int) -> str:
+    """Format seconds since noon minus 12h as a GTFS HH:MM:SS time."""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def _distance_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance in km between two (lat, lon) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0088 * math.asin(math.sqrt(h))
+
+
+def _polyline(
+    points: Sequence[Tuple[float, float]], count: int
+) -> List[Tuple[float, float, float]]:
+    """
+    Resample a path through ``points`` to ``count`` evenly spaced vertices.
+
+    Returns:
+        (lat, lon, km from the start) for every vertex
+    """
+    cumulative = [0.0]
+    for a, b in zip(points, points[1:]):
+        cumulative.append(cumulative[-1] + _distance_km(a, b))
+    total = cumulative[-1]
+
+    vertices = []
+    leg = 0
+    for i in range(count):
+        target = total * i / (count - 1)
+        while leg < len(points) - 2 and cumulative[leg + 1] < target:
+            leg += 1
+        span = cumulative[leg + 1] - cumulative[leg]
+        ratio = (target - cumulative[leg]) / span if span else 0.0
+        (lat1, lon1), (lat2, lon2) = points[leg], points[leg + 1]
+        vertices.append((
+            lat1 + (lat2 - lat1) * ratio,
+            lon1 + (lon2 - lon1) * ratio,
+            target,
+        ))
+    return vertices
+
+
+class SyntheticGTFSFeed:
+    """
+    Deterministic generator for the rows of every GTFS file in a feed.
+
+    Rows are produced lazily per file, so large feeds are written without
+    holding stop_times in memory.
+    """
+
+    def __init__(self, size: FeedSize, seed: int = 0):
+        self.size = size
+        self.seed = seed
+        rng = random.Random(seed)
+
+        self.stops = [
+            (
+                f"S{i:06d}",
+                round(CENTRE_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG), 6),
+                round(CENTRE_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG), 6),
+            )
+            for i in range(size.stops)
+        ]
+
+        # Each route visits its stops west to east, so shapes are plausible
+        # lines rather than random zig-zags
+        self.route_stops: List[List[int]] = []
+        self.route_types: List[int] = []
+        for _ in range(size.routes):
+            visited = rng.sample(range(size.stops), size.stops_per_trip)
+            visited.sort(key=lambda index: self.stops[index][2])
+            self.route_stops.append(visited)
+            self.route_types.append(rng.choice(ROUTE_TYPES))
+
+        # Per-route hop times between consecutive stops and dwell times
+        self.hops = [
+            [rng.randint(60, 240) for _ in range(size.stops_per_trip - 1)]
+            for _ in range(size.routes)
+        ]
+        self.dwells = [
+            [rng.choice((0, 0, 15, 30)) for _ in range(size.stops_per_trip)]
+            for _ in range(size.routes)
+        ]
+
+    def row_counts(self) -> Dict[str, int]:
+        """Number of data rows in each generated file."""
+        size = self.size
+        trips = size.routes * size.trips_per_route
+        return {
+            "agency.txt": 1,
+            "stops.txt": size.stops,
+            "routes.txt": size.routes,
+            "calendar.txt": 2,
+            "calendar_dates.txt": 2,
+            "shapes.txt": size.routes * size.shape_points,
+            "trips.txt": trips,
+            "stop_times.txt": trips * size.stops_per_trip,
+        }
+
+    def rows(self, file_name: str) -> Iterator[Sequence]:
+        """Yield the data rows of one GTFS file, without the header."""
+        generators = {
+            "agency.txt": self._agency,
+            "stops.txt": self._stops,
+            "routes.txt": self._routes,
+            "calendar.txt": self._calendar,
+            "calendar_dates.txt": self._calendar_dates,
+            "shapes.txt": self._shapes,
+            "trips.txt": self._trips,
+            "stop_times.txt": self._stop_times,
+        }
+        return generators[file_name]()
+
+    def _agency(self):
+        yield (
+            "SYN",
+            "Synthetic Transit",
+            "https://example.org",
+            "Australia/Hobart",
+            "en",
+        )
+
+    def _stops(self):
+        for i, (stop_id, lat, lon) in enumerate(self.stops):
+            yield (stop_id, f"Stop {i}", lat, lon, 0, i % 3)
+
+    def _routes(self):
+        for i, route_type in enumerate(self.route_types):
+            yield (
+                f"R{i:04d}",
+                "SYN",
+                str(i + 1),
+                f"Synthetic Route {i + 1}",
+                route_type,
+                f"{(i * 2654435761) & 0xFFFFFF:06X}",
+            )
+
+    def _calendar(self):
+        yield ("WK", 1, 1, 1, 1, 1, 0, 0, "20250101", "20251231")
+        yield ("WE", 0, 0, 0, 0, 0, 1, 1, "20250101", "20251231")
+
+    def _calendar_dates(self):
+        yield ("WK", "20251225", 2)
+        yield ("WE", "20251225", 1)
+
+    def _route_path(self, route: int) -> List[Tuple[float, float]]:
+        return [self.stops[index][1:] for index in self.route_stops[route]]
+
+    def _shapes(self):
+        for route in range(self.size.routes):
+            vertices = _polyline(
+                self._route_path(route), self.size.shape_points
+            )
+            for sequence, (lat, lon, km) in enumerate(vertices, start=1):
+                yield (
+                    f"SH{route:04d}",
+                    round(lat, 6),
+                    round(lon, 6),
+                    sequence,
+                    round(km, 3),
+                )
+
+    def _departures(self) -> List[int]:
+        """First-stop departure times, evenly spread over the service day."""
+        trips = self.size.trips_per_route
+        if trips == 1:
+            return [FIRST_DEPARTURE_SECS]
+        step = (LAST_DEPARTURE_SECS - FIRST_DEPARTURE_SECS) // (trips - 1)
+        return [FIRST_DEPARTURE_SECS + i * step for i in range(trips)]
+
+    def _trips(self):
+        for route in range(self.size.routes):
+            for trip in range(self.size.trips_per_route):
+                yield (
+                    f"R{route:04d}",
+                    "WE" if trip % 5 == 4 else "WK",
+                    f"T{route:04d}_{trip:04d}",
+                    f"Synthetic Route {route + 1}",
+                    0,
+                    f"SH{route:04d}",
+                )
+
+    def _stop_times(self):
+        departures = self._departures()
+        for route in range(self.size.routes):
+            path = self._route_path(route)
+            distances = [0.0]
+            for a, b in zip(path, path[1:]):
+                distances.append(distances[-1] + _distance_km(a, b))
+            stop_ids = [self.stops[i][0] for i in self.route_stops[route]]
+            hops, dwells = self.hops[route], self.dwells[route]
+
+            for trip, start in enumerate(departures):
+                trip_id = f"T{route:04d}_{trip:04d}"
+                arrival = start
+                for sequence, stop_id in enumerate(stop_ids):
+                    if sequence:
+                        arrival = departure + hops[sequence - 1]
+                    departure = arrival + dwells[sequence]
+                    yield (
+                        trip_id,
+                        format_gtfs_time(arrival),
+                        format_gtfs_time(departure),
+                        stop_id,
+                        sequence + 1,
+                        round(distances[sequence], 3),
+                    )
+
+
+def write_gtfs_zip(
+    path: Path, size: FeedSize = FeedSize(), seed: int = 0
+) -> Dict[str, int]:
+    """
+    Write a synthetic GTFS feed as a zip archive.
+
+    Args:
+        path: Destination of the archive
+        size: Dimensions of the feed
+        seed: Seed for stop positions, route stops and timings
+
+    Returns:
+        Number of data rows written to each file
+    """
+    feed = SyntheticGTFSFeed(size, seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w") as archive:
+        for file_name, header in FEED_HEADERS.items():
+            info = zipfile.ZipInfo(file_name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, "w") as member:
+                text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+                writer = csv.writer(text, lineterminator="\n")
+                writer.writerow(header)
+                writer.writerows(feed.rows(file_name))
+                text.flush()
+                text.detach()
+    return feed.row_counts()
+
+
+def main():
+    """Command line entry point: write a feed and print its row counts."""
+    parser = argparse.ArgumentParser(
+        description="Generate a deterministic synthetic GTFS feed"
+    )
+    parser.add_argument("output", type=Path, help="Zip file to write")
+    parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        default="medium",
+        help="Base feed size (default: medium)",
+    )
+    for field, default in asdict(FeedSize()).items():
+        parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            type=int,
+            dest=field,
+            help=f"Override the preset {field} (medium: {default})",
+        )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    dimensions = asdict(PRESETS[args.preset])
+    for field in dimensions:
+        if getattr(args, field) is not None:
+            dimensions[field] = getattr(args, field)
+
+    counts = write_gtfs_zip(args.output, FeedSize(**dimensions), args.seed)
+    json.dump(counts, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
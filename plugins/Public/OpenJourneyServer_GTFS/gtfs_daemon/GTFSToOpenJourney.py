@@ -8,6 +8,9 @@ import requests
 from pathlib import Path
 from typing import Optional
 
+# Bytes read from the download per write to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def download_gtfs_from_url(url: str, temp_dir: str) -> Optional[Path]:
     """
@@ -21,13 +24,14 @@ def download_gtfs_from_url(url: str, temp_dir: str) -> Optional[Path]:
         Path to downloaded file or None if failed
     """
     try:
-        response = requests.get(url, timeout=300)
-        response.raise_for_status()
-
-        # Save to temporary file
-        temp_path = Path(temp_dir) / "gtfs_feed.zip"
-        with open(temp_path, "wb") as f:
-            f.write(response.content)
+        with requests.get(url, stream=True, timeout=300) as response:
+            response.raise_for_status()
+
+            # Stream to a temporary file rather than holding it in memory
+            temp_path = Path(temp_dir) / "gtfs_feed.zip"
+            with open(temp_path, "wb") as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
 
         return temp_path
 
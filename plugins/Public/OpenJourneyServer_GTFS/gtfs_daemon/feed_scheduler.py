@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Feed Schedules for the Resident GTFS Daemon
+===========================================
+
+Works out when each feed is next due when the daemon runs as a long-lived
+process instead of a Kubernetes CronJob. A feed runs either at a fixed
+interval or on a standard five-field cron expression, with an optional
+random jitter so feeds on the same cadence do not all start at once.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+# Default cadence, matching the CronJob's every-six-hours schedule
+DEFAULT_INTERVAL = 6 * 3600
+
+# Give up looking for a matching minute after this long (e.g. "0 0 30 2 *")
+CRON_SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+class CronSchedule:
+    """
+    A five-field cron expression: minute, hour, day of month, month and
+    day of week.
+
+    Fields accept *, numbers, ranges (1-5), lists (1,15) and steps (*/15,
+    8-18/2). Day of week runs from 0 (Sunday) to 6, with 7 also Sunday. As
+    in cron, when both day fields are restricted a day matching either
+    one is due.
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(
+                f"Cron expression {expression!r} needs five fields"
+            )
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            try:
+                step = int(step) if step else 1
+                if span == "*":
+                    start, end = low, high
+                elif "-" in span:
+                    start, end = (int(value) for value in span.split("-"))
+                else:
+                    start = end = int(span)
+                    if step != 1:
+                        end = high
+            except ValueError:
+                raise ValueError(f"Invalid cron field {field!r}") from None
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(
+                    f"Cron field {field!r} is outside {low}-{high}"
+                )
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First minute strictly after ``moment`` that the schedule is due."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(
+            minutes=1
+        )
+        limit = moment + CRON_SEARCH_LIMIT
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(
+                    year=candidate.year + year,
+                    month=month + 1,
+                    day=1,
+                    hour=0,
+                    minute=0,
+                )
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(
+                    days=1
+                )
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never runs")
+
+
+class FeedSchedule:
+    """When a feed runs: a fixed interval or a cron expression, plus jitter."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0,
+    ):
+        if (interval is None) == (cron is None):
+            raise ValueError("A feed schedule needs an interval or a cron")
+        if interval is not None and interval <= 0:
+            raise ValueError("A feed schedule interval must be positive")
+        if jitter < 0:
+            raise ValueError("A feed schedule jitter cannot be negative")
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+
+    @classmethod
+    def from_config(cls, feed_config: Dict, defaults: Dict) -> "FeedSchedule":
+        """
+        Build a feed's schedule from its interval, cron and jitter keys.
+
+        Keys missing from the feed fall back to the daemon configuration,
+        and then to running every DEFAULT_INTERVAL seconds.
+        """
+        interval = feed_config.get("interval")
+        cron = feed_config.get("cron")
+        if interval is None and cron is None:
+            interval = defaults.get("interval")
+            cron = defaults.get("cron")
+            if interval is None and cron is None:
+                interval = DEFAULT_INTERVAL
+        jitter = feed_config.get("jitter", defaults.get("jitter", 0))
+        return cls(interval=interval, cron=cron, jitter=jitter)
+
+    def jitter_delay(self, rng: random.Random) -> float:
+        """Random extra delay spreading out feeds on the same cadence."""
+        return rng.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def next_delay(self, now: datetime, rng: random.Random) -> float:
+        """Seconds from ``now`` until the feed is next due."""
+        if self.cron:
+            delay = (self.cron.next_after(now) - now).total_seconds()
+        else:
+            delay = self.interval
+        return delay + self.jitter_delay(rng)
+
+    def describe(self) -> str:
+        if self.cron:
+            cadence = f"cron {self.cron.expression!r}"
+        else:
+            cadence = f"every {self.interval:g} seconds"
+        if self.jitter:
+            cadence += f" (+ up to {self.jitter:g}s jitter)"
+        return cadence
+
+
+def build_schedules(
+    feeds: List[Dict], defaults: Dict
+) -> Dict[str, FeedSchedule]:
+    """Schedule of every feed, keyed by feed name."""
+    return {
+        feed.get("name", feed["url"]): FeedSchedule.from_config(
+            feed, defaults
+        )
+        for feed in feeds
+    }
@@ -12,26 +12,161 @@ and the OpenJourney database schema in a Kubernetes environment.
 """
 
 import argparse
+import hashlib
+import heapq
+import io
 import json
 import logging
+import multiprocessing
 import os
+import queue
+import random
+import shutil
 import sys
+import threading
 import time
 import tempfile
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
+from urllib.parse import urlsplit
 import requests
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+import numpy as np
 import pandas as pd
 import gtfs_kit as gk
 
-# Add the project root to the Python path for metrics import
+# Add the project root to the Python path for metrics import, and the
+# plugin's processors for the canonical schema loader, which is only
+# imported when a feed is loaded into the canonical schema
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
-
-from common.metrics import get_metrics
+sys.path.insert(0, str(Path(__file__).parent.parent / "processors"))
+
+from common.gtfs_utils import gtfs_time_to_seconds, haversine_m
+from common.metrics import get_metrics, start_metrics_server
+from feed_scheduler import FeedSchedule, build_schedules
+
+if TYPE_CHECKING:
+    from gtfs_processor import GTFSProcessor
+
+# OpenJourney transit mode for each GTFS route_type; others map to "bus"
+ROUTE_TYPE_MODES = {
+    0: "tram",
+    1: "subway",
+    2: "rail",
+    3: "bus",
+    4: "ferry",
+    5: "cable_tram",
+    6: "aerial_lift",
+    7: "funicular",
+    11: "trolleybus",
+    12: "monorail",
+}
+
+# Bulk-written OpenJourney tables, in foreign key order: their staged
+# columns, conflict key and any computed column filled in by the merge
+OPENJOURNEY_TABLES = {
+    "routes": {
+        "columns": (
+            "route_id",
+            "route_name",
+            "agency_id",
+            "agency_route_id",
+            "transit_mode",
+        ),
+        "conflict": ("route_id",),
+    },
+    "stops": {
+        "columns": (
+            "stop_id",
+            "stop_name",
+            "stop_lat",
+            "stop_lon",
+            "location_type",
+            "parent_station",
+            "wheelchair_boarding",
+        ),
+        "conflict": ("stop_id",),
+        "computed": {
+            "geom": "ST_SetSRID(ST_MakePoint(stop_lon, stop_lat), 4326)"
+        },
+    },
+    "segments": {
+        "columns": (
+            "segment_id",
+            "pattern_id",
+            "sequence_order",
+            "route_id",
+            "start_stop_id",
+            "end_stop_id",
+            "distance",
+            "duration",
+            "transport_mode",
+            "accessibility",
+        ),
+        "conflict": ("segment_id",),
+    },
+    "trip_patterns": {
+        "columns": ("trip_id", "pattern_id", "route_id", "service_id"),
+        "conflict": ("trip_id",),
+    },
+    "temporal_data": {
+        "columns": (
+            "service_id",
+            "start_date",
+            "end_date",
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+            "sunday",
+        ),
+        "conflict": ("service_id",),
+    },
+}
+
+
+# How often a resident daemon checks for a stop request while feeds run
+STOP_POLL_INTERVAL = 1.0
+
+# Bytes read from a feed download per write to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class IncompleteDownloadError(Exception):
+    """A feed download stopped before the whole archive arrived."""
+
+
+@dataclass
+class FeedDownload:
+    """Outcome of a conditional feed download."""
+
+    # Downloaded archive, or None when the server answered 304
+    path: Optional[Path]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    sha256: Optional[str] = None
+    size: int = 0
+
+    @property
+    def not_modified(self) -> bool:
+        return self.path is None
 
 
 class PostgreSQLOpenJourneyWriter:
@@ -39,20 +174,73 @@ class PostgreSQLOpenJourneyWriter:
     Writes GTFS data converted to OpenJourney format directly to PostgreSQL database.
     """
 
-    def __init__(self, db_config: Dict):
+    # write_mode "copy" bulk-loads tables through COPY into a staging
+    # table and one merge per table; "rows" upserts them row by row.
+    # copy_batch_size is the number of rows serialised per COPY chunk.
+    WRITE_MODES = ("copy", "rows")
+
+    def __init__(
+        self,
+        db_config: Dict,
+        write_mode: str = "copy",
+        copy_batch_size: int = 50000,
+    ):
         """Initialize with database configuration."""
+        if write_mode not in self.WRITE_MODES:
+            raise ValueError(f"Unknown write_mode {write_mode!r}")
         self.db_config = db_config
+        self.write_mode = write_mode
+        self.copy_batch_size = max(1, copy_batch_size)
         self.logger = logging.getLogger("PostgreSQLOpenJourneyWriter")
+        self.metrics = get_metrics()
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self.write_stats: Dict[str, Dict[str, Any]] = {}
+
+    def _connection_params(self) -> Dict:
+        return {
+            key: self.db_config[key]
+            for key in ("host", "port", "database", "user", "password")
+        }
 
     def get_connection(self):
         """Get database connection."""
-        return psycopg2.connect(
-            host=self.db_config["host"],
-            port=self.db_config["port"],
-            database=self.db_config["database"],
-            user=self.db_config["user"],
-            password=self.db_config["password"],
-        )
+        return psycopg2.connect(**self._connection_params())
+
+    def open_pool(self, size: int):
+        """
+        Keep up to ``size`` connections open for reuse between feed runs.
+
+        The pool does not block when exhausted, so size it to the number
+        of feeds processed at once.
+        """
+        if self.pool is None:
+            self.pool = ThreadedConnectionPool(
+                1, max(1, size), **self._connection_params()
+            )
+
+    def close_pool(self):
+        """Close every pooled connection."""
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    @contextmanager
+    def connection(self):
+        """
+        Connection for one transaction, committed if the block succeeds and
+        rolled back otherwise. Pooled connections are returned to the pool,
+        others are closed.
+        """
+        pool = self.pool
+        conn = pool.getconn() if pool else self.get_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            if pool:
+                pool.putconn(conn, close=bool(conn.closed))
+            else:
+                conn.close()
 
     def write_data_source(self, conn, source_data: Dict):
         """Write data source information."""
@@ -118,15 +306,17 @@ class PostgreSQLOpenJourneyWriter:
                 )
 
     def write_segments(self, conn, segments_data: List[Dict]):
-        """Write segments data."""
+        """Write journey-pattern segments data."""
         with conn.cursor() as cur:
             for segment in segments_data:
                 cur.execute(
                     """
                     INSERT INTO openjourney.segments 
-                    (segment_id, route_id, start_stop_id, end_stop_id, distance, duration, transport_mode, accessibility)
-                    VALUES (%(segment_id)s, %(route_id)s, %(start_stop_id)s, %(end_stop_id)s, %(distance)s, %(duration)s, %(transport_mode)s, %(accessibility)s)
+                    (segment_id, pattern_id, sequence_order, route_id, start_stop_id, end_stop_id, distance, duration, transport_mode, accessibility)
+                    VALUES (%(segment_id)s, %(pattern_id)s, %(sequence_order)s, %(route_id)s, %(start_stop_id)s, %(end_stop_id)s, %(distance)s, %(duration)s, %(transport_mode)s, %(accessibility)s)
                     ON CONFLICT (segment_id) DO UPDATE SET
+                        pattern_id = EXCLUDED.pattern_id,
+                        sequence_order = EXCLUDED.sequence_order,
                         route_id = EXCLUDED.route_id,
                         start_stop_id = EXCLUDED.start_stop_id,
                         end_stop_id = EXCLUDED.end_stop_id,
@@ -139,6 +329,24 @@ class PostgreSQLOpenJourneyWriter:
                     segment,
                 )
 
+    def write_trip_patterns(self, conn, trip_patterns: List[Dict]):
+        """Write the journey pattern of each trip."""
+        with conn.cursor() as cur:
+            for trip_pattern in trip_patterns:
+                cur.execute(
+                    """
+                    INSERT INTO openjourney.trip_patterns
+                    (trip_id, pattern_id, route_id, service_id)
+                    VALUES (%(trip_id)s, %(pattern_id)s, %(route_id)s, %(service_id)s)
+                    ON CONFLICT (trip_id) DO UPDATE SET
+                        pattern_id = EXCLUDED.pattern_id,
+                        route_id = EXCLUDED.route_id,
+                        service_id = EXCLUDED.service_id,
+                        updated_at = NOW()
+                """,
+                    trip_pattern,
+                )
+
     def write_temporal_data(self, conn, temporal_data: List[Dict]):
         """Write temporal/calendar data."""
         with conn.cursor() as cur:
@@ -163,10 +371,209 @@ class PostgreSQLOpenJourneyWriter:
                     temporal,
                 )
 
+    @staticmethod
+    def staging_table(key: str) -> str:
+        """Name of the session's temporary staging table for a table."""
+        return f"staging_{key}"
+
+    def prepare_staging(self, conn, key: str):
+        """
+        Create (if needed) and empty the staging table for a table.
+
+        Staging tables are temporary, so concurrent writers each get their
+        own. They carry the column types of the OpenJourney table but no
+        constraints, indexes or triggers, so COPY into them is cheap. A
+        staged_row identity column numbers the rows in the order they are
+        copied, so that merges keep the last row staged for a key.
+        """
+        columns = ", ".join(OPENJOURNEY_TABLES[key]["columns"])
+        staging = self.staging_table(key)
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TEMP TABLE IF NOT EXISTS {staging} AS
+                SELECT {columns} FROM openjourney.{key} WITH NO DATA
+            """
+            )
+            cur.execute(
+                f"ALTER TABLE {staging} ADD COLUMN IF NOT EXISTS "
+                "staged_row BIGINT GENERATED ALWAYS AS IDENTITY"
+            )
+            cur.execute(f"TRUNCATE {staging} RESTART IDENTITY")
+
+    def copy_to_staging(self, conn, key: str, rows: List[Dict]) -> int:
+        """
+        Stream rows into the staging table with COPY.
+
+        The rows are framed once and each chunk of copy_batch_size rows is
+        serialised with DataFrame.to_csv, so the COPY buffer never holds more
+        than one chunk. The frame keeps object dtype, so integer columns
+        with missing values are not written as floats.
+
+        Returns:
+            Number of rows copied
+        """
+        columns = OPENJOURNEY_TABLES[key]["columns"]
+        copy_sql = (
+            f"COPY {self.staging_table(key)} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+
+        frame = pd.DataFrame(rows, columns=list(columns), dtype=object)
+        with conn.cursor() as cur:
+            for start in range(0, len(frame), self.copy_batch_size):
+                buffer = io.StringIO()
+                frame.iloc[start : start + self.copy_batch_size].to_csv(
+                    buffer,
+                    header=False,
+                    index=False,
+                    na_rep="\\N",
+                )
+                buffer.seek(0)
+                cur.copy_expert(copy_sql, buffer)
+        return len(rows)
+
+    def merge_from_staging(self, conn, key: str) -> int:
+        """
+        Upsert the staged rows into the OpenJourney table in one statement.
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        spec = OPENJOURNEY_TABLES[key]
+        computed = spec.get("computed", {})
+        columns = list(spec["columns"]) + list(computed)
+        select_columns = list(spec["columns"]) + list(computed.values())
+        conflict = ", ".join(spec["conflict"])
+        updates = [
+            f"{column} = EXCLUDED.{column}"
+            for column in columns
+            if column not in spec["conflict"]
+        ]
+        updates.append("updated_at = NOW()")
+
+        with conn.cursor() as cur:
+            # DISTINCT ON guards against duplicate keys inside one feed,
+            # which ON CONFLICT DO UPDATE would otherwise reject; the last
+            # row staged for a key wins, as with the row-by-row writes
+            cur.execute(
+                f"""
+                INSERT INTO openjourney.{key} ({", ".join(columns)})
+                SELECT DISTINCT ON ({conflict}) {", ".join(select_columns)}
+                FROM {self.staging_table(key)}
+                ORDER BY {conflict}, staged_row DESC
+                ON CONFLICT ({conflict}) DO UPDATE SET
+                    {", ".join(updates)}
+            """
+            )
+            merged = cur.rowcount
+            cur.execute(f"TRUNCATE {self.staging_table(key)}")
+        return merged
+
+    def delete_trip_segments(self, conn, route_ids: List[str]) -> int:
+        """
+        Delete the per-trip segments (NULL pattern_id) of routes whose
+        journey-pattern segments replace them.
+
+        Returns:
+            Number of segments deleted
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM openjourney.segments
+                WHERE pattern_id IS NULL AND route_id = ANY(%s)
+            """,
+                (list(route_ids),),
+            )
+            return cur.rowcount
+
+    def bulk_write(self, conn, key: str, rows: List[Dict]) -> int:
+        """
+        Load one table through COPY into staging and a set-based merge.
+
+        Returns:
+            Number of rows merged
+        """
+        self.prepare_staging(conn, key)
+        self.copy_to_staging(conn, key, rows)
+        return self.merge_from_staging(conn, key)
+
+    def write_table(self, conn, key: str, rows: List[Dict]):
+        """
+        Write one OpenJourney table in the configured write mode, recording
+        its throughput.
+        """
+        start_time = time.perf_counter()
+        if self.write_mode == "copy":
+            self.bulk_write(conn, key, rows)
+        else:
+            getattr(self, f"write_{key}")(conn, rows)
+        elapsed = time.perf_counter() - start_time
+
+        rows_per_sec = len(rows) / elapsed if elapsed > 0 else float(len(rows))
+        self.metrics.record_gtfs_table_write(
+            key, self.write_mode, len(rows), elapsed
+        )
+        self.write_stats[key] = {
+            "rows": len(rows),
+            "seconds": elapsed,
+            "rows_per_sec": rows_per_sec,
+        }
+        self.logger.info(
+            f"Wrote {len(rows)} {key} rows in {elapsed:.2f}s "
+            f"({rows_per_sec:.0f} rows/sec, {self.write_mode})"
+        )
+
+    def get_feed_state(self, feed_name: str) -> Dict:
+        """
+        Read the validators and checksum stored for a feed's last download.
+
+        Returns:
+            The stored state, or an empty dict if the feed has none
+        """
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT feed_name, feed_url, etag, last_modified, sha256, content_length
+                    FROM openjourney.feed_sync_state
+                    WHERE feed_name = %s
+                """,
+                    (feed_name,),
+                )
+                row = cur.fetchone()
+        return dict(row) if row else {}
+
+    def save_feed_state(self, feed_state: Dict):
+        """Store the validators and checksum of a feed's latest download."""
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO openjourney.feed_sync_state
+                    (feed_name, feed_url, etag, last_modified, sha256, content_length, checked_at, changed_at)
+                    VALUES (%(feed_name)s, %(feed_url)s, %(etag)s, %(last_modified)s, %(sha256)s, %(content_length)s, NOW(), NOW())
+                    ON CONFLICT (feed_name) DO UPDATE SET
+                        feed_url = EXCLUDED.feed_url,
+                        etag = EXCLUDED.etag,
+                        last_modified = EXCLUDED.last_modified,
+                        sha256 = EXCLUDED.sha256,
+                        content_length = EXCLUDED.content_length,
+                        checked_at = NOW(),
+                        changed_at = CASE
+                            WHEN openjourney.feed_sync_state.sha256 IS DISTINCT FROM EXCLUDED.sha256
+                            THEN NOW()
+                            ELSE openjourney.feed_sync_state.changed_at
+                        END
+                """,
+                    feed_state,
+                )
+
     def write_journey_data(self, journey_data: Dict):
         """Write complete journey data to PostgreSQL."""
         try:
-            with self.get_connection() as conn:
+            with self.connection() as conn:
                 self.logger.info(
                     "Writing data to OpenJourney PostgreSQL database..."
                 )
@@ -179,35 +586,24 @@ class PostgreSQLOpenJourneyWriter:
                         f"Wrote {len(journey_data['data_sources'])} data sources"
                     )
 
-                # Write routes
-                if journey_data.get("routes"):
-                    self.write_routes(conn, journey_data["routes"])
-                    self.logger.info(
-                        f"Wrote {len(journey_data['routes'])} routes"
-                    )
-
-                # Write stops
-                if journey_data.get("stops"):
-                    self.write_stops(conn, journey_data["stops"])
-                    self.logger.info(
-                        f"Wrote {len(journey_data['stops'])} stops"
-                    )
+                # Write routes, stops, segments, trip to journey pattern
+                # links and temporal data
+                for key in OPENJOURNEY_TABLES:
+                    if journey_data.get(key):
+                        self.write_table(conn, key, journey_data[key])
 
-                # Write segments
                 if journey_data.get("segments"):
-                    self.write_segments(conn, journey_data["segments"])
-                    self.logger.info(
-                        f"Wrote {len(journey_data['segments'])} segments"
-                    )
-
-                # Write temporal data
-                if journey_data.get("temporal_data"):
-                    self.write_temporal_data(
-                        conn, journey_data["temporal_data"]
-                    )
-                    self.logger.info(
-                        f"Wrote {len(journey_data['temporal_data'])} temporal records"
-                    )
+                    route_ids = sorted({
+                        segment["route_id"]
+                        for segment in journey_data["segments"]
+                        if segment.get("route_id")
+                    })
+                    deleted = self.delete_trip_segments(conn, route_ids)
+                    if deleted:
+                        self.logger.info(
+                            f"Deleted {deleted} per-trip segments replaced "
+                            "by journey patterns"
+                        )
 
                 conn.commit()
                 self.logger.info("Successfully wrote all data to PostgreSQL")
@@ -228,17 +624,32 @@ class GTFSToOpenJourneyConverter:
     def convert_gtfs_to_openjourney(
         self, gtfs_path: Path, source_info: Dict
     ) -> Dict:
-        """Convert GTFS data to OpenJourney format."""
+        """
+        Convert GTFS data to OpenJourney format.
+
+        The archive is parsed once. When source_info["canonical"] is set,
+        the same parsed tables are also transformed for the canonical
+        schema and returned under "canonical" (see
+        GTFSDaemon.write_feed), so a feed loaded into both schemas is
+        never read twice.
+        """
         self.logger.info(f"Converting GTFS data from {gtfs_path}")
-
-        # Load GTFS feed
         feed = gk.read_feed(gtfs_path, dist_units="km")
+        journey_data = self.convert_feed_to_openjourney(feed, source_info)
+        if source_info.get("canonical"):
+            from gtfs_processor import transform_feed
 
+            journey_data["canonical"] = transform_feed(feed)
+        return journey_data
+
+    def convert_feed_to_openjourney(self, feed, source_info: Dict) -> Dict:
+        """Convert an already parsed gtfs_kit Feed to OpenJourney format."""
         journey_data: Dict[str, List[Dict[str, Any]]] = {
             "data_sources": [],
             "routes": [],
             "stops": [],
             "segments": [],
+            "trip_patterns": [],
             "temporal_data": [],
         }
 
@@ -309,71 +720,425 @@ class GTFSToOpenJourneyConverter:
 
     def _map_gtfs_route_type(self, route_type: int) -> str:
         """Map GTFS route type to OpenJourney transit mode."""
-        mapping = {
-            0: "tram",
-            1: "subway",
-            2: "rail",
-            3: "bus",
-            4: "ferry",
-            5: "cable_tram",
-            6: "aerial_lift",
-            7: "funicular",
-            11: "trolleybus",
-            12: "monorail",
-        }
-        return mapping.get(route_type, "bus")
+        return ROUTE_TYPE_MODES.get(route_type, "bus")
 
     def _generate_segments(self, feed, journey_data: Dict):
-        """Generate segments from GTFS trips and stop_times."""
+        """
+        Generate journey-pattern segments from GTFS trips and stop_times.
+
+        Trips of a route that call at the same stops in the same order
+        share a journey pattern, identified by a hash of the route and its
+        stop sequence. Each pair of consecutive stops of a pattern becomes
+        one segment, so a route running hundreds of identical trips gets
+        one set of segments; journey_data["trip_patterns"] links every trip
+        to its pattern.
+
+        Everything is done column-wise over the whole feed: stop_times is
+        sorted once by trip and sequence, each row is paired with the next
+        row when it belongs to the same trip, and route_id is joined from
+        trips once. Trips missing from trips.txt are skipped.
+
+        Segment costs are computed on the same arrays, per trip, and the
+        median over the pattern's trips is kept:
+
+        - duration: seconds from departure at the first stop to arrival at
+          the next, from GTFS times (hours past 24 included); None where
+          no trip has both times, as for stops that are not timepoints
+        - distance: metres, from the shape_dist_traveled difference when
+          both stops have one, otherwise the haversine distance between
+          the stops; None when neither is known
+        - transport_mode: from the route_type of the pattern's route
+        """
         if not (hasattr(feed, "trips") and hasattr(feed, "stop_times")):
             return
+        if feed.stop_times is None or feed.trips is None:
+            journey_data["segments"] = []
+            journey_data["trip_patterns"] = []
+            return
 
-        segments = []
+        columns = [
+            "trip_id",
+            "stop_sequence",
+            "stop_id",
+            "arrival_time",
+            "departure_time",
+        ]
+        if "shape_dist_traveled" in feed.stop_times.columns:
+            columns.append("shape_dist_traveled")
+        stop_times = feed.stop_times[columns].dropna(subset=["trip_id"])
+        stop_times = stop_times.sort_values(
+            ["trip_id", "stop_sequence"], kind="mergesort"
+        )
 
-        # Group stop_times by trip_id
-        if feed.stop_times is not None:
-            stop_times_grouped = feed.stop_times.groupby("trip_id")
+        trip_columns = ["trip_id", "route_id"]
+        if "service_id" in feed.trips.columns:
+            trip_columns.append("service_id")
+        trips = feed.trips[trip_columns].drop_duplicates("trip_id")
+        stop_times = stop_times.merge(
+            trips[["trip_id", "route_id"]], on="trip_id", how="inner"
+        )
 
-            for trip_id, trip_stops in stop_times_grouped:
-                trip_stops = trip_stops.sort_values("stop_sequence")
-                trip_stops_list = trip_stops.to_dict("records")
+        trip_patterns = self._journey_patterns(stop_times)
+        stop_times["pattern_id"] = (
+            stop_times["trip_id"].map(trip_patterns).to_numpy()
+        )
+        stop_times["position"] = stop_times.groupby(
+            "trip_id", sort=False
+        ).cumcount()
+
+        # Pair every stop with the next stop of the same trip; the last
+        # stop of each trip has no successor and starts no segment
+        trip_ids = stop_times["trip_id"].to_numpy()
+        pairs = trip_ids[:-1] == trip_ids[1:]
+        current = stop_times.iloc[:-1][pairs]
+        following = stop_times.iloc[1:][pairs]
+
+        trip_segments = pd.DataFrame({
+            "pattern_id": current["pattern_id"].to_numpy(),
+            "sequence_order": current["position"].to_numpy() + 1,
+            "route_id": current["route_id"].to_numpy(),
+            "start_stop_id": current["stop_id"].to_numpy(),
+            "end_stop_id": following["stop_id"].to_numpy(),
+            "duration": self._segment_durations(current, following),
+            "distance": self._segment_distances(feed, current, following),
+        })
+        segments = (
+            trip_segments.groupby(
+                ["pattern_id", "sequence_order"], sort=False
+            )
+            .agg(
+                route_id=("route_id", "first"),
+                start_stop_id=("start_stop_id", "first"),
+                end_stop_id=("end_stop_id", "first"),
+                duration=("duration", "median"),
+                distance=("distance", "median"),
+            )
+            .reset_index()
+        )
 
-                # Get route_id for this trip
-                trip_info = feed.trips[feed.trips["trip_id"] == trip_id]
-                if trip_info.empty:
-                    continue
-                route_id = trip_info.iloc[0]["route_id"]
-
-                # Create segments between consecutive stops
-                for i in range(len(trip_stops_list) - 1):
-                    current_stop = trip_stops_list[i]
-                    next_stop = trip_stops_list[i + 1]
-
-                    segment_id = f"{trip_id}_{current_stop['stop_sequence']}_{next_stop['stop_sequence']}"
-
-                    # Calculate duration if times are available
-                    duration = None
-                    if current_stop.get("departure_time") and next_stop.get(
-                        "arrival_time"
-                    ):
-                        try:
-                            # Simple time difference calculation (this is simplified)
-                            duration = 300  # Default 5 minutes, should be calculated properly
-                        except:
-                            duration = None
-
-                    segments.append({
-                        "segment_id": segment_id,
-                        "route_id": route_id,
-                        "start_stop_id": current_stop["stop_id"],
-                        "end_stop_id": next_stop["stop_id"],
-                        "distance": None,  # Could be calculated from stop coordinates
-                        "duration": duration,
-                        "transport_mode": "bus",  # Default, should map from route
-                        "accessibility": None,
-                    })
+        segment_ids = (
+            segments["pattern_id"].astype(str)
+            + "_"
+            + segments["sequence_order"].astype(str)
+        )
+        durations = segments["duration"].round().to_numpy()
+        seconds = np.nan_to_num(durations).astype("int64")
+        durations = np.where(np.isnan(durations), None, seconds)
+        distances = segments["distance"].round(1).to_numpy()
+        distances = np.where(np.isnan(distances), None, distances)
+        modes = self._segment_modes(feed, segments["route_id"])
+
+        # Build the records straight from the columns; DataFrame.to_dict
+        # would box every value through pandas and dominate the runtime
+        journey_data["segments"] = [
+            {
+                "segment_id": segment_id,
+                "pattern_id": pattern_id,
+                "sequence_order": sequence_order,
+                "route_id": route_id,
+                "start_stop_id": start_stop_id,
+                "end_stop_id": end_stop_id,
+                "distance": distance,
+                "duration": duration,
+                "transport_mode": mode,
+                "accessibility": None,
+            }
+            for (
+                segment_id,
+                pattern_id,
+                sequence_order,
+                route_id,
+                start_stop_id,
+                end_stop_id,
+                distance,
+                duration,
+                mode,
+            ) in zip(
+                segment_ids.tolist(),
+                segments["pattern_id"].tolist(),
+                segments["sequence_order"].tolist(),
+                segments["route_id"].tolist(),
+                segments["start_stop_id"].tolist(),
+                segments["end_stop_id"].tolist(),
+                distances.tolist(),
+                durations.tolist(),
+                modes,
+            )
+        ]
+
+        trips = trips[trips["trip_id"].isin(trip_patterns.index)]
+        journey_data["trip_patterns"] = [
+            {
+                "trip_id": trip_id,
+                "pattern_id": pattern_id,
+                "route_id": route_id,
+                "service_id": service_id,
+            }
+            for trip_id, pattern_id, route_id, service_id in zip(
+                trips["trip_id"].tolist(),
+                trips["trip_id"].map(trip_patterns).tolist(),
+                trips["route_id"].tolist(),
+                trips["service_id"].tolist()
+                if "service_id" in trips.columns
+                else [None] * len(trips),
+            )
+        ]
+
+    def _journey_patterns(self, stop_times: pd.DataFrame) -> pd.Series:
+        """
+        Identify the journey pattern of every trip.
+
+        Args:
+            stop_times: Stop times with route_id, sorted by trip and
+                stop_sequence
+
+        Returns:
+            Pattern ID indexed by trip_id. The ID is a hash of the route and
+            its ordered stop IDs, so it is stable between runs and feeds.
+        """
+        # Rows of a trip are contiguous, so each trip is a slice of the
+        # stop ID list between two trip boundaries
+        trip_ids = stop_times["trip_id"].to_numpy()
+        starts = np.flatnonzero(
+            np.r_[True, trip_ids[1:] != trip_ids[:-1]]
+        )
+        ends = np.r_[starts[1:], len(trip_ids)]
+        stop_ids = stop_times["stop_id"].astype(str).tolist()
+        route_ids = stop_times["route_id"].astype(str).to_numpy()[starts]
+        keys = [
+            route_id + "\x1e" + "\x1f".join(stop_ids[start:end])
+            for route_id, start, end in zip(
+                route_ids.tolist(), starts.tolist(), ends.tolist()
+            )
+        ]
+
+        # Hash each distinct stop sequence once, however many trips run it
+        codes, uniques = pd.factorize(np.array(keys, dtype=object))
+        pattern_ids = np.array([
+            "P" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            for key in uniques
+        ])
+        return pd.Series(pattern_ids[codes], index=trip_ids[starts])
+
+    def _segment_durations(
+        self, current: pd.DataFrame, following: pd.DataFrame
+    ) -> np.ndarray:
+        """Seconds from departure at each stop to arrival at the next."""
+        departs = gtfs_time_to_seconds(current["departure_time"]).to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+        arrives = gtfs_time_to_seconds(following["arrival_time"]).to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+        durations = arrives - departs
+        # A negative duration is a data error, not a cost
+        durations[durations < 0] = np.nan
+        return durations
+
+    def _segment_distances(
+        self, feed, current: pd.DataFrame, following: pd.DataFrame
+    ) -> np.ndarray:
+        """Metres between consecutive stops, preferring shape distances."""
+        distances = np.full(len(current), np.nan)
+
+        stops = getattr(feed, "stops", None)
+        if stops is not None and len(current):
+            stops = stops.drop_duplicates("stop_id").set_index("stop_id")
+            lat = stops["stop_lat"].astype("float64")
+            lon = stops["stop_lon"].astype("float64")
+            distances = haversine_m(
+                current["stop_id"].map(lat),
+                current["stop_id"].map(lon),
+                following["stop_id"].map(lat),
+                following["stop_id"].map(lon),
+            )
 
-        journey_data["segments"] = segments
+        if "shape_dist_traveled" in current.columns:
+            dist_units = getattr(feed, "dist_units", None) or "km"
+            to_metres = gk.get_convert_dist(dist_units, "m")
+            travelled = to_metres(
+                following["shape_dist_traveled"].to_numpy(
+                    dtype="float64", na_value=np.nan
+                )
+                - current["shape_dist_traveled"].to_numpy(
+                    dtype="float64", na_value=np.nan
+                )
+            )
+            # Shape distances only count where both ends have one and
+            # they increase along the trip
+            usable = ~np.isnan(travelled) & (travelled >= 0)
+            distances = np.where(usable, travelled, distances)
+
+        return distances
+
+    def _segment_modes(self, feed, route_ids: pd.Series) -> List[str]:
+        """Transit mode for each route ID, from the route's route_type."""
+        routes = getattr(feed, "routes", None)
+        if routes is None or "route_type" not in routes.columns:
+            return ["bus"] * len(route_ids)
+
+        route_types = routes.drop_duplicates("route_id").set_index(
+            "route_id"
+        )["route_type"]
+        modes = route_ids.map(route_types).map(ROUTE_TYPE_MODES)
+        return modes.fillna("bus").tolist()
+
+
+def convert_feed(gtfs_path: Path, feed_config: Dict) -> Dict:
+    """Convert a downloaded feed in a conversion worker process."""
+    return GTFSToOpenJourneyConverter().convert_gtfs_to_openjourney(
+        gtfs_path, feed_config
+    )
+
+
+class FeedPipeline:
+    """
+    Conversion and write stages shared by the feeds being processed.
+
+    Feeds are downloaded on the daemon's feed threads, converted on a
+    process pool so pandas work is not serialised by the GIL, and handed
+    to dedicated writer threads through a bounded queue. While one feed
+    is written the next can already download and convert.
+
+    Backpressure keeps memory bounded: a feed holds a conversion slot from
+    the start of its conversion until its result is queued for writing, so
+    at most convert_workers + write_queue_size + write_workers converted
+    feeds exist at once. Feeds waiting for a slot hold only their
+    downloaded archive on disk.
+
+    Until start() is called, or with no workers configured, a stage runs
+    inline on the calling thread.
+    """
+
+    def __init__(
+        self,
+        convert_workers: int = 0,
+        write_queue_size: int = 1,
+        write_workers: int = 1,
+    ):
+        self.convert_workers = max(0, convert_workers)
+        self.write_queue_size = max(1, write_queue_size)
+        self.write_workers = max(0, write_workers)
+        self.logger = logging.getLogger("FeedPipeline")
+
+        self._convert_slots = threading.BoundedSemaphore(
+            max(1, self.convert_workers)
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._write_queue: Optional[queue.Queue] = None
+        self._writers: List[threading.Thread] = []
+
+    @contextmanager
+    def running(self):
+        """Run the conversion pool and writer threads for the block."""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.close()
+
+    def start(self):
+        if self.convert_workers:
+            self._process_pool = self._new_process_pool()
+        if self.write_workers:
+            self._write_queue = queue.Queue(maxsize=self.write_queue_size)
+            self._writers = [
+                threading.Thread(
+                    target=self._write_loop,
+                    name=f"gtfs-writer-{i}",
+                    daemon=True,
+                )
+                for i in range(self.write_workers)
+            ]
+            for writer in self._writers:
+                writer.start()
+
+    def close(self):
+        """Finish queued writes, then stop the writers and process pool."""
+        if self._write_queue is not None:
+            for _ in self._writers:
+                self._write_queue.put(None)
+            for writer in self._writers:
+                writer.join()
+            self._write_queue = None
+            self._writers = []
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked: forking a process with running feed
+        # and writer threads can copy locks those threads hold
+        return ProcessPoolExecutor(
+            max_workers=self.convert_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @contextmanager
+    def conversion_slot(self):
+        """
+        Hold a conversion slot; release it once the result has been queued
+        for writing.
+        """
+        with self._convert_slots:
+            yield
+
+    def convert(
+        self,
+        converter: "GTFSToOpenJourneyConverter",
+        gtfs_path: Path,
+        feed_config: Dict,
+    ) -> Dict:
+        """Convert a feed on the process pool, or with converter inline."""
+        pool = self._process_pool
+        if pool is None:
+            return converter.convert_gtfs_to_openjourney(
+                gtfs_path, feed_config
+            )
+        try:
+            return pool.submit(convert_feed, gtfs_path, feed_config).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool so
+            # later feeds can still convert, and fail this attempt
+            with self._pool_lock:
+                if self._process_pool is pool:
+                    self.logger.error(
+                        "Conversion worker died, restarting the pool"
+                    )
+                    self._process_pool = self._new_process_pool()
+                    pool.shutdown(wait=False)
+            raise
+
+    def write(self, write_function, *args) -> Future:
+        """
+        Queue a write, blocking while the queue is full.
+
+        Returns:
+            Future that completes when a writer has run the write
+        """
+        done: Future = Future()
+        if self._write_queue is None:
+            self._run_write(done, write_function, args)
+        else:
+            self._write_queue.put((done, write_function, args))
+        return done
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                return
+            self._run_write(*item)
+
+    @staticmethod
+    def _run_write(done: Future, write_function, args):
+        if not done.set_running_or_notify_cancel():
+            return
+        try:
+            done.set_result(write_function(*args))
+        except Exception as e:
+            done.set_exception(e)
 
 
 class GTFSDaemon:
@@ -388,6 +1153,24 @@ class GTFSDaemon:
         self.db_config = config.get("database", {})
         self.max_retries = config.get("max_retries", 3)
         self.retry_delay = config.get("retry_delay", 60)
+        # Feeds processed at once, and at once from the same server
+        self.max_concurrent_feeds = max(
+            1, config.get("max_concurrent_feeds", 4)
+        )
+        self.max_feeds_per_host = max(1, config.get("max_feeds_per_host", 1))
+        # Interrupted downloads are kept here so a later attempt can resume
+        self.download_dir = Path(
+            config.get("download_dir")
+            or Path(tempfile.gettempdir()) / "gtfs_daemon"
+        )
+        self.download_timeout = config.get("download_timeout", 300)
+        self.download_resume_attempts = config.get(
+            "download_resume_attempts", 3
+        )
+
+        self._active_feeds = 0
+        self._active_lock = threading.Lock()
+        self._rng = random.Random()
 
         # Setup logging
         self.setup_logging()
@@ -397,7 +1180,23 @@ class GTFSDaemon:
 
         # Initialize components
         self.converter = GTFSToOpenJourneyConverter()
-        self.db_writer = PostgreSQLOpenJourneyWriter(self.db_config)
+        self.db_writer = PostgreSQLOpenJourneyWriter(
+            self.db_config,
+            write_mode=config.get("write_mode", "copy"),
+            copy_batch_size=config.get("copy_batch_size", 50000),
+        )
+        self.pipeline = FeedPipeline(
+            convert_workers=config.get(
+                "convert_workers",
+                min(self.max_concurrent_feeds, os.cpu_count() or 1),
+            ),
+            write_queue_size=config.get("write_queue_size", 1),
+            write_workers=config.get("write_workers", 1),
+        )
+        # Canonical schema loads replace whole tables in one transaction,
+        # so they run one at a time even with several writer threads
+        self._canonical_loader: Optional["GTFSProcessor"] = None
+        self._canonical_lock = threading.Lock()
 
     def setup_logging(self):
         """Setup logging configuration."""
@@ -413,27 +1212,76 @@ class GTFSDaemon:
         self.logger = logging.getLogger("GTFSDaemon")
 
     def download_gtfs_from_url(
-        self, url: str, temp_dir: str, feed_name: str = "unknown"
-    ) -> Optional[Path]:
-        """Download GTFS feed from URL."""
+        self,
+        url: str,
+        temp_dir: str,
+        feed_name: str = "unknown",
+        validators: Optional[Dict] = None,
+    ) -> Optional[FeedDownload]:
+        """
+        Stream a GTFS feed to disk, skipping it if the server reports it
+        unchanged.
+
+        The archive is written in chunks while its SHA-256 is computed.
+        The ETag and Last-Modified from the previous download are sent as
+        If-None-Match and If-Modified-Since. An interrupted transfer is
+        kept in download_dir and resumed with a Range request, both within
+        this call and by later attempts.
+
+        Args:
+            url: URL of the GTFS zip
+            temp_dir: Directory to move the finished archive into
+            feed_name: Feed name for logging and metrics
+            validators: Stored state of the previous download, with etag
+                and last_modified
+
+        Returns:
+            The download, with no path if the feed is not modified, or
+            None if it failed
+        """
         start_time = time.time()
+        part_path = self._partial_download_path(url)
 
         try:
             self.logger.info(f"Downloading GTFS feed from {url}")
-            response = requests.get(url, timeout=300)
-            response.raise_for_status()
-
-            # Save to temporary file
-            temp_path = Path(temp_dir) / "gtfs_feed.zip"
-            with open(temp_path, "wb") as f:
-                f.write(response.content)
+            for attempt in range(self.download_resume_attempts + 1):
+                try:
+                    download = self._fetch_feed(
+                        url, part_path, validators or {}
+                    )
+                    break
+                except (
+                    requests.ConnectionError,
+                    requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError,
+                    IncompleteDownloadError,
+                ) as e:
+                    if attempt == self.download_resume_attempts:
+                        raise
+                    received = (
+                        part_path.stat().st_size if part_path.exists() else 0
+                    )
+                    self.logger.warning(
+                        f"Download of {url} interrupted after {received} "
+                        f"bytes, resuming: {str(e)}"
+                    )
 
-            # Record successful download
             duration = time.time() - start_time
             self.metrics.record_gtfs_download_time(feed_name, duration)
 
-            self.logger.info(f"Downloaded GTFS feed to {temp_path}")
-            return temp_path
+            if download.not_modified:
+                self.logger.info(f"GTFS feed at {url} not modified")
+                return download
+
+            temp_path = Path(temp_dir) / "gtfs_feed.zip"
+            shutil.move(str(part_path), temp_path)
+            self._partial_validator_path(part_path).unlink(missing_ok=True)
+            download.path = temp_path
+
+            self.logger.info(
+                f"Downloaded GTFS feed to {temp_path} ({download.size} bytes)"
+            )
+            return download
 
         except Exception as e:
             self.logger.error(
@@ -441,6 +1289,124 @@ class GTFSDaemon:
             )
             return None
 
+    def _fetch_feed(
+        self, url: str, part_path: Path, validators: Dict
+    ) -> FeedDownload:
+        """Make one request for a feed, appending to any partial download."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        resume = self._read_partial_validator(part_path) if offset else {}
+
+        headers = {}
+        if resume:
+            # If-Range makes the server send the whole feed if it changed
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = resume.get("etag") or resume.get(
+                "last_modified"
+            )
+        else:
+            offset = 0
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        with requests.get(
+            url, headers=headers, stream=True, timeout=self.download_timeout
+        ) as response:
+            if response.status_code == 304:
+                return FeedDownload(
+                    path=None,
+                    etag=validators.get("etag"),
+                    last_modified=validators.get("last_modified"),
+                    sha256=validators.get("sha256"),
+                    size=validators.get("content_length") or 0,
+                )
+            if response.status_code == 416:
+                self._discard_partial_download(part_path)
+                raise IncompleteDownloadError(
+                    "server rejected the resume range"
+                )
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                if not content_range.startswith(f"bytes {offset}-"):
+                    self._discard_partial_download(part_path)
+                    raise IncompleteDownloadError(
+                        f"unexpected Content-Range {content_range!r}"
+                    )
+            else:
+                offset = 0
+
+            etag = response.headers.get("ETag") or resume.get("etag")
+            last_modified = response.headers.get(
+                "Last-Modified"
+            ) or resume.get("last_modified")
+            expected = response.headers.get("Content-Length")
+            expected = offset + int(expected) if expected else None
+
+            checksum = hashlib.sha256()
+            if offset:
+                with open(part_path, "rb") as f:
+                    while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                        checksum.update(chunk)
+            else:
+                self._write_partial_validator(part_path, etag, last_modified)
+
+            size = offset
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    checksum.update(chunk)
+                    size += len(chunk)
+
+        if expected is not None and size != expected:
+            raise IncompleteDownloadError(
+                f"received {size} of {expected} bytes"
+            )
+        return FeedDownload(
+            path=part_path,
+            etag=etag,
+            last_modified=last_modified,
+            sha256=checksum.hexdigest(),
+            size=size,
+        )
+
+    def _partial_download_path(self, url: str) -> Path:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        return self.download_dir / f"{key}.zip.part"
+
+    @staticmethod
+    def _partial_validator_path(part_path: Path) -> Path:
+        return part_path.with_suffix(".json")
+
+    def _read_partial_validator(self, part_path: Path) -> Dict:
+        """Validators of the feed version a partial download belongs to."""
+        try:
+            with open(self._partial_validator_path(part_path), "r") as f:
+                validator = json.load(f)
+        except (OSError, ValueError):
+            validator = {}
+        # Without a validator we cannot tell if the feed changed meanwhile
+        if not (validator.get("etag") or validator.get("last_modified")):
+            self._discard_partial_download(part_path)
+            return {}
+        return validator
+
+    def _write_partial_validator(
+        self,
+        part_path: Path,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ):
+        with open(self._partial_validator_path(part_path), "w") as f:
+            json.dump({"etag": etag, "last_modified": last_modified}, f)
+
+    def _discard_partial_download(self, part_path: Path):
+        part_path.unlink(missing_ok=True)
+        self._partial_validator_path(part_path).unlink(missing_ok=True)
+
     def process_feed(self, feed_config: Dict) -> bool:
         """Process a single GTFS feed."""
         feed_url = feed_config["url"]
@@ -450,29 +1416,58 @@ class GTFSDaemon:
 
         try:
             with tempfile.TemporaryDirectory() as temp_dir:
-                # Download GTFS feed
-                gtfs_path = self.download_gtfs_from_url(
-                    feed_url, temp_dir, feed_name
+                # Download GTFS feed unless it is unchanged since last run
+                feed_state = self._load_feed_state(feed_name, feed_url)
+                download = self.download_gtfs_from_url(
+                    feed_url, temp_dir, feed_name, feed_state
                 )
-                if not gtfs_path:
+                if not download:
                     self.metrics.record_gtfs_feed_processed(
                         "failed", feed_name
                     )
                     return False
 
-                # Convert to OpenJourney format
-                conversion_start = time.time()
-                journey_data = self.converter.convert_gtfs_to_openjourney(
-                    gtfs_path, feed_config
-                )
-                conversion_duration = time.time() - conversion_start
-                self.metrics.record_gtfs_conversion_time(
-                    feed_name, conversion_duration
+                if download.not_modified or (
+                    download.sha256 == feed_state.get("sha256")
+                ):
+                    reason = (
+                        "not modified"
+                        if download.not_modified
+                        else "checksum unchanged"
+                    )
+                    self.logger.info(
+                        f"Feed {feed_name} is unchanged ({reason}), "
+                        f"skipping conversion"
+                    )
+                    self._save_feed_state(feed_name, feed_url, download)
+                    self.metrics.record_gtfs_feed_processed(
+                        "unchanged", feed_name
+                    )
+                    return True
+
+                # Convert to OpenJourney format, and from the same parse to
+                # the canonical schema if enabled, and queue it for writing
+                convert_config = dict(
+                    feed_config,
+                    canonical=self.canonical_options(feed_config) is not None,
                 )
+                with self.pipeline.conversion_slot():
+                    conversion_start = time.time()
+                    journey_data = self.pipeline.convert(
+                        self.converter, download.path, convert_config
+                    )
+                    conversion_duration = time.time() - conversion_start
+                    self.metrics.record_gtfs_conversion_time(
+                        feed_name, conversion_duration
+                    )
+                    written = self.pipeline.write(
+                        self.write_feed, journey_data, feed_config
+                    )
+                    del journey_data
 
                 # Write to PostgreSQL
                 try:
-                    self.db_writer.write_journey_data(journey_data)
+                    written.result()
                     self.metrics.record_gtfs_database_operation(
                         "write_journey_data", "success"
                     )
@@ -488,6 +1483,9 @@ class GTFSDaemon:
                     )
                     return False
 
+                # Only now may later runs skip this version of the feed
+                self._save_feed_state(feed_name, feed_url, download)
+
                 self.metrics.record_gtfs_feed_processed("success", feed_name)
                 self.logger.info(f"Successfully processed feed: {feed_name}")
                 return True
@@ -497,45 +1495,305 @@ class GTFSDaemon:
             self.metrics.record_gtfs_feed_processed("failed", feed_name)
             return False
 
-    def process_feed_with_retry(self, feed_config: Dict):
+    def canonical_options(self, feed_config: Dict) -> Optional[Dict]:
+        """
+        GTFSProcessor options for loading a feed into the canonical schema.
+
+        A feed's "canonical" setting, or else the daemon's, is either a
+        boolean or a dictionary of GTFSProcessor options (see
+        GTFSProcessor.DEFAULT_OPTIONS) that also enables the load.
+
+        Returns:
+            Options to load with, or None if the feed is not loaded there
+        """
+        setting = feed_config.get("canonical", self.config.get("canonical"))
+        if not setting:
+            return None
+        return dict(setting) if isinstance(setting, dict) else {}
+
+    def write_feed(self, journey_data: Dict, feed_config: Dict):
+        """
+        Write a converted feed to the OpenJourney schema, then to the
+        canonical schema if it was converted for it.
+
+        Raises:
+            RuntimeError: If the canonical load fails
+        """
+        canonical = journey_data.pop("canonical", None)
+        self.db_writer.write_journey_data(journey_data)
+        if canonical is None:
+            return
+
+        feed_name = feed_config.get("name", feed_config["url"])
+        options = self.canonical_options(feed_config) or {}
+        with self._canonical_lock:
+            if self._canonical_loader is None:
+                from gtfs_processor import GTFSProcessor
+
+                self._canonical_loader = GTFSProcessor(self.db_config)
+            loaded = self._canonical_loader.load_feed_tables(
+                canonical, {"name": feed_name}, **options
+            )
+        if not loaded:
+            raise RuntimeError(
+                f"Canonical schema load failed for feed {feed_name}"
+            )
+
+    def _load_feed_state(self, feed_name: str, feed_url: str) -> Dict:
+        """Stored download state for a feed, if it still has the same URL."""
+        try:
+            feed_state = self.db_writer.get_feed_state(feed_name)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not read download state for feed {feed_name}, "
+                f"downloading unconditionally: {str(e)}"
+            )
+            return {}
+        if feed_state.get("feed_url") != feed_url:
+            return {}
+        return feed_state
+
+    def _save_feed_state(
+        self, feed_name: str, feed_url: str, download: FeedDownload
+    ):
+        try:
+            self.db_writer.save_feed_state({
+                "feed_name": feed_name,
+                "feed_url": feed_url,
+                "etag": download.etag,
+                "last_modified": download.last_modified,
+                "sha256": download.sha256,
+                "content_length": download.size,
+            })
+        except Exception as e:
+            self.logger.warning(
+                f"Could not store download state for feed {feed_name}: "
+                f"{str(e)}"
+            )
+
+    def process_feed_with_retry(self, feed_config: Dict) -> bool:
         """Process feed with retry logic."""
         feed_name = feed_config.get("name", feed_config["url"])
+        return self.process_feeds([feed_config])[feed_name]
+
+    def process_feeds(self, feeds: List[Dict]) -> Dict[str, bool]:
+        """
+        Process feeds concurrently, retrying failures with backoff.
+
+        Up to max_concurrent_feeds feeds are downloaded and converted at
+        the same time, with at most max_feeds_per_host of them from the
+        same server. A failed feed is rescheduled retry_delay * 2**attempt
+        seconds later without holding a worker, so a flaky server never
+        delays the other feeds.
+
+        Args:
+            feeds: Feed configurations, each with a url and optional name
+
+        Returns:
+            Whether each feed, by name, was processed successfully
+        """
+        return self._run_feeds([(0.0, feed) for feed in feeds])
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """
+        Run as a resident daemon, processing each feed on its own schedule.
+
+        Each feed runs at its interval or cron expression (feed keys
+        interval, cron and jitter, falling back to the daemon config) and
+        is rescheduled once its run and any retries finish. Database
+        connections are pooled and the metrics server is started once and
+        kept for the life of the process.
+
+        Args:
+            stop: Event that ends the daemon once set; feeds already running
+                are allowed to finish
+        """
+        stop = stop or threading.Event()
+        schedules = build_schedules(self.feeds, self.config)
+        # Feeds run at startup, spread out by their jitter
+        first_runs = []
+        for feed_config in self.feeds:
+            feed_name = feed_config.get("name", feed_config["url"])
+            schedule = schedules[feed_name]
+            self.logger.info(
+                f"Scheduling feed {feed_name} {schedule.describe()}"
+            )
+            first_runs.append((schedule.jitter_delay(self._rng), feed_config))
 
-        for attempt in range(self.max_retries):
-            try:
-                if self.process_feed(feed_config):
-                    return  # Success
-            except Exception as e:
-                self.logger.error(
-                    f"Attempt {attempt + 1} failed for feed {feed_name}: {str(e)}"
-                )
+        metrics_port = self.config.get("metrics_port")
+        if metrics_port:
+            start_metrics_server(port=metrics_port)
 
-            if attempt < self.max_retries - 1:
-                # Record retry attempt
-                self.metrics.record_gtfs_retry_attempt(
-                    feed_name, "processing_failed"
-                )
+        # Feed threads read and save download state; writers write
+        self.db_writer.open_pool(
+            self.config.get(
+                "db_pool_size",
+                self.max_concurrent_feeds + self.pipeline.write_workers,
+            )
+        )
+        try:
+            self._run_feeds(first_runs, schedules=schedules, stop=stop)
+        finally:
+            self.db_writer.close_pool()
+        self.logger.info("GTFS daemon stopped")
+
+    def _run_feeds(
+        self,
+        feeds: List[tuple],
+        schedules: Optional[Dict[str, FeedSchedule]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Dict[str, bool]:
+        """
+        Scheduling loop shared by run_once and run_forever.
+
+        Args:
+            feeds: (seconds from now, feed config) for each feed's first run
+            schedules: When given, each feed is queued again for its next
+                scheduled run once it finishes
+            stop: Event that ends the loop once set
+
+        Returns:
+            Whether each feed, by name, was last processed successfully
+        """
+        results: Dict[str, bool] = {}
+        start = time.monotonic()
+        # (ready at, order, attempt, feed config), earliest first
+        pending = [
+            (start + delay, order, 0, feed)
+            for order, (delay, feed) in enumerate(feeds)
+        ]
+        heapq.heapify(pending)
+        running: Dict[Any, tuple] = {}
+        hosts: Counter = Counter()
+
+        with self.pipeline.running(), ThreadPoolExecutor(
+            max_workers=self.max_concurrent_feeds,
+            thread_name_prefix="gtfs-feed",
+        ) as executor:
+            while (pending or running) and not (stop and stop.is_set()):
+                self._start_ready_feeds(executor, pending, running, hosts)
+
+                now = time.monotonic()
+                waiting = [ready for ready, *_ in pending if ready > now]
+                timeout = min(waiting) - now if waiting else None
+                if not running:
+                    # Nothing can run until the next feed is due
+                    if stop:
+                        stop.wait(timeout)
+                    else:
+                        time.sleep(timeout or 0)
+                    continue
 
-                delay = self.retry_delay * (2**attempt)
-                self.logger.info(
-                    f"Retrying feed {feed_name} in {delay} seconds..."
+                if stop:
+                    timeout = min(
+                        timeout or STOP_POLL_INTERVAL, STOP_POLL_INTERVAL
+                    )
+                done, _ = wait(
+                    running, timeout=timeout, return_when=FIRST_COMPLETED
                 )
-                time.sleep(delay)
+                for future in done:
+                    _, order, attempt, feed_config = running.pop(future)
+                    hosts[self._feed_host(feed_config)] -= 1
+                    feed_name = feed_config.get("name", feed_config["url"])
+                    succeeded = future.result()
+                    if not succeeded and attempt + 1 < self.max_retries:
+                        self.metrics.record_gtfs_retry_attempt(
+                            feed_name, "processing_failed"
+                        )
+                        delay = self.retry_delay * (2**attempt)
+                        self.logger.info(
+                            f"Retrying feed {feed_name} in {delay} seconds..."
+                        )
+                        heapq.heappush(
+                            pending,
+                            (
+                                time.monotonic() + delay,
+                                order,
+                                attempt + 1,
+                                feed_config,
+                            ),
+                        )
+                        continue
+                    if not succeeded:
+                        self.logger.error(
+                            f"Giving up on feed {feed_name} after "
+                            f"{attempt + 1} attempts"
+                        )
+                    results[feed_name] = succeeded
+
+                    if schedules:
+                        delay = schedules[feed_name].next_delay(
+                            datetime.now(), self._rng
+                        )
+                        self.logger.info(
+                            f"Next run of feed {feed_name} in "
+                            f"{delay:.0f} seconds"
+                        )
+                        heapq.heappush(
+                            pending,
+                            (time.monotonic() + delay, order, 0, feed_config),
+                        )
+
+        return results
+
+    def _start_ready_feeds(self, executor, pending, running, hosts):
+        """Submit due feeds while the global and per-host limits allow."""
+        now = time.monotonic()
+        blocked = []
+        while (
+            pending
+            and pending[0][0] <= now
+            and len(running) < self.max_concurrent_feeds
+        ):
+            item = heapq.heappop(pending)
+            host = self._feed_host(item[3])
+            if hosts[host] >= self.max_feeds_per_host:
+                blocked.append(item)
+                continue
+            hosts[host] += 1
+            running[executor.submit(self._run_feed, item[3])] = item
+        for item in blocked:
+            heapq.heappush(pending, item)
+
+    def _run_feed(self, feed_config: Dict) -> bool:
+        """Process one feed attempt, tracking it in gtfs_active_feeds."""
+        self._adjust_active_feeds(1)
+        try:
+            return self.process_feed(feed_config)
+        except Exception as e:
+            feed_name = feed_config.get("name", feed_config["url"])
+            self.logger.error(
+                f"Attempt failed for feed {feed_name}: {str(e)}"
+            )
+            return False
+        finally:
+            self._adjust_active_feeds(-1)
 
-    def run_once(self):
-        """Run the daemon once (process all feeds)."""
-        self.logger.info("Starting GTFS daemon run...")
+    def _adjust_active_feeds(self, delta: int):
+        with self._active_lock:
+            self._active_feeds += delta
+            self.metrics.set_gtfs_active_feeds(self._active_feeds)
 
-        # Set active feeds gauge
-        self.metrics.set_gtfs_active_feeds(len(self.feeds))
+    @staticmethod
+    def _feed_host(feed_config: Dict) -> str:
+        return urlsplit(feed_config["url"]).hostname or feed_config["url"]
 
-        for feed_config in self.feeds:
-            self.process_feed_with_retry(feed_config)
+    def run_once(self) -> bool:
+        """
+        Run the daemon once (process all feeds).
+
+        Returns:
+            True if every feed was processed successfully
+        """
+        self.logger.info("Starting GTFS daemon run...")
 
-        # Reset active feeds gauge after processing
-        self.metrics.set_gtfs_active_feeds(0)
+        results = self.process_feeds(self.feeds)
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            self.logger.error(f"Failed feeds: {', '.join(failed)}")
 
         self.logger.info("GTFS daemon run completed")
+        return not failed
 
 
 def main():
@@ -544,6 +1802,11 @@ def main():
     parser.add_argument(
         "--config", default="/app/config.json", help="Configuration file path"
     )
+    parser.add_argument(
+        "--resident",
+        action="store_true",
+        help="Keep running and process each feed on its schedule",
+    )
     args = parser.parse_args()
 
     # Load configuration
@@ -556,7 +1819,10 @@ def main():
 
     # Create and run daemon
     daemon = GTFSDaemon(config)
-    daemon.run_once()
+    if args.resident:
+        daemon.run_forever()
+    else:
+        daemon.run_once()
 
 
 if __name__ == "__main__":
@@ -8,8 +8,10 @@ This script handles environment variable configuration and starts the daemon.
 """
 
 import os
+import signal
 import sys
 import json
+import threading
 from gtfs_daemon import GTFSDaemon
 
 
@@ -60,8 +62,30 @@ def get_config_from_env():
         "log_level": os.getenv("LOG_LEVEL", "INFO"),
         "max_retries": int(os.getenv("MAX_RETRIES", "3")),
         "retry_delay": int(os.getenv("RETRY_DELAY", "60")),
+        "max_concurrent_feeds": int(os.getenv("MAX_CONCURRENT_FEEDS", "4")),
+        "max_feeds_per_host": int(os.getenv("MAX_FEEDS_PER_HOST", "1")),
+        "download_dir": os.getenv("GTFS_DOWNLOAD_DIR"),
+        "write_queue_size": int(os.getenv("WRITE_QUEUE_SIZE", "1")),
+        "write_mode": os.getenv("WRITE_MODE", "copy"),
+        "copy_batch_size": int(os.getenv("COPY_BATCH_SIZE", "50000")),
+        # Also load every feed into the canonical schema from the same parse
+        "canonical": os.getenv("WRITE_CANONICAL", "false").lower() == "true",
+        # "once" for the CronJob, "resident" for a long-running Deployment
+        "mode": os.getenv("DAEMON_MODE", "once").lower(),
+        "jitter": int(os.getenv("SCHEDULE_JITTER", "0")),
+        "metrics_port": int(os.getenv("METRICS_PORT", "8000")),
     }
 
+    # Conversion processes default to one per CPU, up to the feed limit
+    if os.getenv("CONVERT_WORKERS"):
+        config["convert_workers"] = int(os.getenv("CONVERT_WORKERS"))
+
+    # Default schedule for feeds without their own interval or cron
+    if os.getenv("SCHEDULE_CRON"):
+        config["cron"] = os.getenv("SCHEDULE_CRON")
+    elif os.getenv("SCHEDULE_INTERVAL"):
+        config["interval"] = int(os.getenv("SCHEDULE_INTERVAL"))
+
     return config
 
 
@@ -96,11 +120,25 @@ def main():
         f"Database: {config['database']['host']}:{config['database']['port']}/{config['database']['database']}"
     )
 
+    if config["mode"] not in ("once", "resident"):
+        print(
+            f"Error: Unknown DAEMON_MODE {config['mode']!r}, expected once or resident."
+        )
+        sys.exit(1)
+
     # Create and run daemon
     try:
         daemon = GTFSDaemon(config)
-        daemon.run_once()
-        print("GTFS daemon completed successfully")
+        if config["mode"] == "resident":
+            # Finish the feeds in progress on SIGTERM, as Kubernetes sends
+            stop = threading.Event()
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *args: stop.set())
+            daemon.run_forever(stop)
+            print("GTFS daemon stopped")
+        else:
+            daemon.run_once()
+            print("GTFS daemon completed successfully")
     except Exception as e:
         print(f"Error running GTFS daemon: {e}")
         sys.exit(1)
@@ -6,16 +6,36 @@ Test script for GTFS to OpenJourney Daemon
 This script tests the GTFS daemon functionality locally before deployment.
 """
 
+import hashlib
 import json
 import os
+import subprocess
 import sys
 import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import gtfs_kit as gk
+import pandas as pd
+import requests
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from gtfs_daemon import GTFSDaemon, GTFSToOpenJourneyConverter
+from gtfs_daemon import (
+    FeedDownload,
+    FeedPipeline,
+    GTFSDaemon,
+    GTFSToOpenJourneyConverter,
+    PostgreSQLOpenJourneyWriter,
+)
+from feed_scheduler import CronSchedule, FeedSchedule
+from common.gtfs_utils import haversine_m
 
 
 def test_config_loading():
@@ -98,6 +118,716 @@ def test_route_type_mapping():
     print("✓ Route type mapping test passed")
 
 
+def make_segment_feed():
+    """Small feed where trips T1 and T4 share a journey pattern."""
+    return SimpleNamespace(
+        dist_units="km",
+        routes=pd.DataFrame({
+            "route_id": ["R1", "R2"],
+            "route_type": [3, 4],
+        }),
+        stops=pd.DataFrame({
+            "stop_id": ["S1", "S2", "S3"],
+            "stop_lat": [-42.8827, -42.8850, -42.8900],
+            "stop_lon": [147.3258, 147.3350, 147.3400],
+        }),
+        trips=pd.DataFrame({
+            "trip_id": ["T2", "T1", "T3", "T4", "T5"],
+            "route_id": ["R2", "R1", "R1", "R1", "R2"],
+            "service_id": ["WE", "WK", "WK", "WE", "WE"],
+        }),
+        stop_times=pd.DataFrame(
+            [
+                ("T1", 2, "S2", "08:05:00", "08:06:00", 1.2),
+                ("T2", 1, "S3", "09:00:00", "09:00:00", None),
+                ("T1", 1, "S1", "08:00:00", "08:00:00", 0.0),
+                ("T1", 3, "S3", "08:10:00", "08:10:00", None),
+                ("T9", 1, "S1", "10:00:00", "10:00:00", None),
+                ("T9", 2, "S2", "10:05:00", "10:05:00", None),
+                ("T2", 2, "S1", "24:10:00", "24:10:00", None),
+                ("T3", 1, "S1", "11:00:00", "11:00:00", None),
+                ("T4", 5, "S1", "09:00:00", "09:00:00", 0.0),
+                ("T4", 6, "S2", "09:07:00", "09:07:00", 1.2),
+                ("T4", 7, "S3", "09:10:00", "09:10:00", None),
+                ("T5", 1, "S3", "10:00:00", "10:00:00", None),
+                ("T5", 2, "S1", "10:20:00", "10:20:00", None),
+            ],
+            columns=[
+                "trip_id",
+                "stop_sequence",
+                "stop_id",
+                "arrival_time",
+                "departure_time",
+                "shape_dist_traveled",
+            ],
+        ),
+    )
+
+
+def stop_distance(feed, a, b):
+    """Rounded haversine metres between two stops of a feed."""
+    stops = feed.stops.set_index("stop_id")
+    distance = haversine_m(
+        [stops.at[a, "stop_lat"]],
+        [stops.at[a, "stop_lon"]],
+        [stops.at[b, "stop_lat"]],
+        [stops.at[b, "stop_lon"]],
+    )[0]
+    return round(float(distance), 1)
+
+
+def test_segment_generation():
+    """Test segments are generated once per journey pattern."""
+    print("Testing segment generation...")
+
+    feed = make_segment_feed()
+    journey_data = {}
+    GTFSToOpenJourneyConverter()._generate_segments(feed, journey_data)
+    segments = journey_data["segments"]
+    patterns = {
+        link["trip_id"]: link["pattern_id"]
+        for link in journey_data["trip_patterns"]
+    }
+
+    # T1 and T4 run the same stops, as do T2 and T5; T9 has no trip
+    assert set(patterns) == {"T1", "T2", "T3", "T4", "T5"}
+    assert patterns["T1"] == patterns["T4"]
+    assert patterns["T2"] == patterns["T5"]
+    assert len(set(patterns.values())) == 3
+    assert journey_data["trip_patterns"][0] == {
+        "trip_id": "T2",
+        "pattern_id": patterns["T2"],
+        "route_id": "R2",
+        "service_id": "WE",
+    }
+
+    assert [
+        (s["segment_id"], s["pattern_id"], s["sequence_order"])
+        for s in segments
+    ] == [
+        (f"{patterns['T1']}_1", patterns["T1"], 1),
+        (f"{patterns['T1']}_2", patterns["T1"], 2),
+        (f"{patterns['T2']}_1", patterns["T2"], 1),
+    ]
+    assert [(s["start_stop_id"], s["end_stop_id"]) for s in segments] == [
+        ("S1", "S2"),
+        ("S2", "S3"),
+        ("S3", "S1"),
+    ]
+
+    # Durations are medians over the pattern's trips, past midnight too
+    assert [s["duration"] for s in segments] == [
+        360,
+        210,
+        (15 * 3600 + 600 + 20 * 60) // 2,
+    ]
+
+    # Shape distances (km) where both stops have one, haversine otherwise
+    assert [s["distance"] for s in segments] == [
+        1200.0,
+        stop_distance(feed, "S2", "S3"),
+        stop_distance(feed, "S3", "S1"),
+    ]
+    assert [s["transport_mode"] for s in segments] == ["bus", "bus", "ferry"]
+
+    # Pattern IDs depend only on the route and stops, not on the run
+    GTFSToOpenJourneyConverter()._generate_segments(
+        make_segment_feed(), journey_data
+    )
+    assert journey_data["segments"] == segments
+
+    # Segments no trip has both times for get no duration
+    feed.stop_times.loc[3, "arrival_time"] = None
+    feed.stop_times.loc[10, "arrival_time"] = None
+    GTFSToOpenJourneyConverter()._generate_segments(feed, journey_data)
+    assert [s["duration"] for s in journey_data["segments"]] == [
+        360,
+        None,
+        (15 * 3600 + 600 + 20 * 60) // 2,
+    ]
+
+    print("✓ Segment generation test passed")
+
+
+def test_concurrent_feed_processing():
+    """Test that feeds run concurrently and retries do not block others."""
+    print("Testing concurrent feed processing...")
+
+    feeds = [
+        {"name": "Flaky", "url": "http://a.example.com/feed.zip"},
+        {"name": "A2", "url": "http://a.example.com/other.zip"},
+        {"name": "B", "url": "http://b.example.com/feed.zip"},
+        {"name": "C", "url": "http://c.example.com/feed.zip"},
+    ]
+    daemon = GTFSDaemon({
+        "feeds": feeds,
+        "database": {},
+        "max_retries": 3,
+        "retry_delay": 0.2,
+        "max_concurrent_feeds": 2,
+        "max_feeds_per_host": 1,
+    })
+    daemon.metrics = MagicMock()
+
+    lock = threading.Lock()
+    in_flight = {}
+    peak = []
+    finished = {}
+    attempts = {}
+
+    def process_feed(feed_config):
+        name = feed_config["name"]
+        host = feed_config["url"].split("/")[2]
+        with lock:
+            # Never two feeds from the same server at once
+            assert host not in in_flight.values()
+            in_flight[name] = host
+            peak.append(len(in_flight))
+            attempts[name] = attempts.get(name, 0) + 1
+        time.sleep(0.05)
+        with lock:
+            del in_flight[name]
+            finished[name] = time.monotonic()
+        if name == "Flaky" and attempts[name] == 1:
+            raise RuntimeError("connection reset")
+        return True
+
+    daemon.process_feed = process_feed
+
+    start = time.monotonic()
+    assert daemon.run_once()
+
+    assert attempts == {"Flaky": 2, "A2": 1, "B": 1, "C": 1}
+    assert max(peak) == 2
+    # The other feeds are done well before the flaky one's backoff expires
+    for name in ("A2", "B", "C"):
+        assert finished[name] - start < 0.2
+    assert finished["Flaky"] - start >= 0.2
+
+    daemon.metrics.record_gtfs_retry_attempt.assert_called_once_with(
+        "Flaky", "processing_failed"
+    )
+    gauge = [
+        call.args[0]
+        for call in daemon.metrics.set_gtfs_active_feeds.call_args_list
+    ]
+    assert max(gauge) == 2
+    assert gauge[-1] == 0
+
+    print("✓ Concurrent feed processing test passed")
+
+
+class FakeFeedServer:
+    """Stands in for requests.get, serving one feed like an HTTP server."""
+
+    def __init__(self, body, etag=None, drop_after=None):
+        self.body = body
+        self.etag = etag
+        # Bytes sent before the first response is cut off
+        self.drop_after = drop_after
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        headers = headers or {}
+        self.requests.append(headers)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            return FakeResponse(304, {}, b"")
+
+        start, status, response_headers = 0, 200, {}
+        if "Range" in headers and headers.get("If-Range") == self.etag:
+            start, status = int(headers["Range"][6:-1]), 206
+            response_headers["Content-Range"] = (
+                f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+            )
+        if self.etag:
+            response_headers["ETag"] = self.etag
+        body = self.body[start:]
+        response_headers["Content-Length"] = str(len(body))
+
+        drop_after, self.drop_after = self.drop_after, None
+        return FakeResponse(status, response_headers, body, drop_after)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers, body, drop_after=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.drop_after = drop_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        if self.drop_after is not None:
+            yield self.body[: self.drop_after]
+            raise requests.exceptions.ChunkedEncodingError("connection lost")
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i : i + chunk_size]
+
+
+def test_conditional_download():
+    """Test resumed, conditional and skipped feed downloads."""
+    print("Testing conditional download...")
+
+    body = bytes(range(256)) * 40
+    sha256 = hashlib.sha256(body).hexdigest()
+    url = "http://example.com/feed.zip"
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        daemon = GTFSDaemon({
+            "feeds": [{"name": "Feed", "url": url}],
+            "database": {},
+            "download_dir": os.path.join(temp_dir, "partial"),
+        })
+        daemon.metrics = MagicMock()
+
+        # An interrupted transfer resumes where it stopped
+        server = FakeFeedServer(body, etag='"v1"', drop_after=1000)
+        with patch("gtfs_daemon.requests.get", server.get):
+            download = daemon.download_gtfs_from_url(url, temp_dir, "Feed")
+
+        assert download.path.read_bytes() == body
+        assert download.sha256 == sha256
+        assert download.etag == '"v1"'
+        assert server.requests[1] == {
+            "Range": "bytes=1000-",
+            "If-Range": '"v1"',
+        }
+        assert os.listdir(daemon.download_dir) == []
+
+        # The stored ETag turns the next download into a 304
+        with patch("gtfs_daemon.requests.get", server.get):
+            download = daemon.download_gtfs_from_url(
+                url, temp_dir, "Feed", {"etag": '"v1"', "sha256": sha256}
+            )
+        assert download.not_modified
+        assert server.requests[-1] == {"If-None-Match": '"v1"'}
+
+        # Without validators an unchanged checksum still skips the writes
+        daemon.db_writer = MagicMock()
+        daemon.db_writer.get_feed_state.return_value = {
+            "feed_url": url,
+            "sha256": sha256,
+        }
+        daemon.converter = MagicMock()
+        with patch("gtfs_daemon.requests.get", FakeFeedServer(body).get):
+            assert daemon.process_feed(daemon.feeds[0])
+
+        daemon.converter.convert_gtfs_to_openjourney.assert_not_called()
+        daemon.db_writer.write_journey_data.assert_not_called()
+        saved = daemon.db_writer.save_feed_state.call_args.args[0]
+        assert saved["sha256"] == sha256
+        assert saved["content_length"] == len(body)
+        daemon.metrics.record_gtfs_feed_processed.assert_called_once_with(
+            "unchanged", "Feed"
+        )
+
+    print("✓ Conditional download test passed")
+
+
+def test_feed_schedules():
+    """Test cron expressions and per-feed schedule configuration."""
+    print("Testing feed schedules...")
+
+    # Friday evening: weekday business hours resume on Monday
+    cron = CronSchedule("*/15 8-18 * * 1-5")
+    assert cron.next_after(datetime(2026, 10, 16, 18, 50)) == datetime(
+        2026, 10, 19, 8, 0
+    )
+    assert cron.next_after(datetime(2026, 10, 19, 8, 0)) == datetime(
+        2026, 10, 19, 8, 15
+    )
+    # Both day fields restricted: either the 1st/15th or a Sunday
+    cron = CronSchedule("0 3 1,15 * 0")
+    assert cron.next_after(datetime(2026, 10, 16, 12, 0)) == datetime(
+        2026, 10, 18, 3, 0
+    )
+    assert CronSchedule("30 2 29 2 *").next_after(
+        datetime(2026, 10, 16)
+    ) == datetime(2028, 2, 29, 2, 30)
+    for expression in ("* * *", "60 * * * *", "*/0 * * * *", "a * * * *"):
+        try:
+            CronSchedule(expression)
+        except ValueError:
+            continue
+        raise AssertionError(f"{expression!r} was accepted")
+
+    defaults = {"cron": "0 4 * * *", "jitter": 30}
+    schedule = FeedSchedule.from_config({"url": "u", "interval": 60}, defaults)
+    assert schedule.interval == 60
+    assert schedule.cron is None
+    assert schedule.jitter == 30
+    schedule = FeedSchedule.from_config({"url": "u"}, defaults)
+    assert schedule.cron.expression == "0 4 * * *"
+    assert schedule.next_delay(
+        datetime(2026, 10, 16, 3, 0), SimpleNamespace(uniform=lambda a, b: b)
+    ) == 3600 + 30
+    assert FeedSchedule.from_config({"url": "u"}, {}).interval == 6 * 3600
+
+    print("✓ Feed schedules test passed")
+
+
+def test_resident_mode():
+    """Test that resident feeds are rescheduled and connections pooled."""
+    print("Testing resident mode...")
+
+    daemon = GTFSDaemon({
+        "feeds": [
+            {"name": "Fast", "url": "http://a.example.com/feed.zip"},
+            {
+                "name": "Slow",
+                "url": "http://b.example.com/feed.zip",
+                "interval": 60,
+            },
+        ],
+        "database": {},
+        "interval": 0.05,
+        "max_concurrent_feeds": 2,
+    })
+    daemon.metrics = MagicMock()
+    daemon.db_writer = MagicMock()
+
+    stop = threading.Event()
+    runs = []
+
+    def process_feed(feed_config):
+        runs.append(feed_config["name"])
+        if runs.count("Fast") == 3:
+            stop.set()
+        return True
+
+    daemon.process_feed = process_feed
+    daemon.run_forever(stop)
+
+    assert runs.count("Fast") == 3
+    assert runs.count("Slow") == 1
+    daemon.db_writer.open_pool.assert_called_once_with(3)
+    daemon.db_writer.close_pool.assert_called_once_with()
+
+    # Pooled connections go back to the pool instead of being closed
+    writer = PostgreSQLOpenJourneyWriter({})
+    writer.pool = MagicMock()
+    conn = writer.pool.getconn.return_value
+    conn.closed = 0
+    with writer.connection() as pooled:
+        assert pooled is conn
+    writer.pool.putconn.assert_called_once_with(conn, close=False)
+    conn.close.assert_not_called()
+
+    print("✓ Resident mode test passed")
+
+
+def test_pipelined_feed_processing():
+    """Test that feeds convert while earlier feeds are being written."""
+    print("Testing pipelined feed processing...")
+
+    daemon = GTFSDaemon({
+        "feeds": [
+            {"name": "A", "url": "http://a.example.com/feed.zip"},
+            {"name": "B", "url": "http://b.example.com/feed.zip"},
+        ],
+        "database": {},
+        "max_retries": 1,
+        "convert_workers": 0,
+    })
+    daemon.metrics = MagicMock()
+    daemon.db_writer = MagicMock()
+    daemon.db_writer.get_feed_state.return_value = {}
+    daemon.download_gtfs_from_url = lambda url, *args: FeedDownload(
+        path=Path(url), sha256=url
+    )
+
+    b_converted = threading.Event()
+    written = []
+
+    def convert(gtfs_path, feed_config):
+        if feed_config["name"] == "B":
+            b_converted.set()
+        return {"feed": feed_config["name"]}
+
+    def write_journey_data(journey_data):
+        # A's write only finishes once B has converted alongside it
+        if journey_data["feed"] == "A":
+            assert b_converted.wait(5)
+        written.append((journey_data["feed"], threading.current_thread()))
+
+    daemon.converter.convert_gtfs_to_openjourney = convert
+    daemon.db_writer.write_journey_data = write_journey_data
+
+    assert daemon.run_once()
+    assert sorted(name for name, _ in written) == ["A", "B"]
+    assert {thread.name for _, thread in written} == {"gtfs-writer-0"}
+
+    # A full queue blocks the next write until the writer catches up
+    release = threading.Event()
+    pipeline = FeedPipeline(write_queue_size=1, write_workers=1)
+    with pipeline.running():
+        first = pipeline.write(release.wait, 5)
+        second = pipeline.write(lambda: "queued")
+        third = threading.Thread(target=pipeline.write, args=(dict,))
+        third.start()
+        third.join(0.2)
+        assert third.is_alive()
+        release.set()
+        third.join(5)
+        assert first.result() and second.result() == "queued"
+
+    print("✓ Pipelined feed processing test passed")
+
+
+# A minimal feed with one trip between two stops
+TINY_FEED_FILES = {
+        "agency.txt": "agency_id,agency_name,agency_url,agency_timezone\n"
+        "MT,Metro,https://example.org,Australia/Hobart\n",
+        "routes.txt": "route_id,agency_id,route_short_name,route_type\n"
+        "R1,MT,1,3\n",
+        "stops.txt": "stop_id,stop_name,stop_lat,stop_lon\n"
+        "S1,One,-42.88,147.32\nS2,Two,-42.89,147.33\n",
+        "calendar.txt": "service_id,monday,tuesday,wednesday,thursday,"
+        "friday,saturday,sunday,start_date,end_date\n"
+        "WK,1,1,1,1,1,0,0,20250101,20251231\n",
+        "trips.txt": "route_id,service_id,trip_id\nR1,WK,T1\n",
+        "stop_times.txt": "trip_id,arrival_time,departure_time,stop_id,"
+        "stop_sequence\nT1,08:00:00,08:00:00,S1,1\n"
+        "T1,08:05:00,08:05:00,S2,2\n",
+}
+
+
+def write_tiny_feed(gtfs_path):
+    """Write TINY_FEED_FILES as a GTFS zip archive."""
+    with zipfile.ZipFile(gtfs_path, "w") as archive:
+        for name, text in TINY_FEED_FILES.items():
+            archive.writestr(name, text)
+
+
+def test_process_pool_conversion():
+    """Test converting a feed on the conversion process pool."""
+    print("Testing process pool conversion...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gtfs_path = Path(temp_dir) / "feed.zip"
+        write_tiny_feed(gtfs_path)
+
+        pipeline = FeedPipeline(convert_workers=1)
+        with pipeline.running():
+            journey_data = pipeline.convert(None, gtfs_path, {"name": "Z"})
+
+    assert [route["route_id"] for route in journey_data["routes"]] == ["R1"]
+    assert len(journey_data["segments"]) == 1
+    assert journey_data["segments"][0]["duration"] == 300
+
+    print("✓ Process pool conversion test passed")
+
+
+def test_single_parse_dual_schema():
+    """Test that one parse of a feed is written to both schemas."""
+    print("Testing single-parse dual-schema ingest...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gtfs_path = Path(temp_dir) / "feed.zip"
+        write_tiny_feed(gtfs_path)
+
+        daemon = GTFSDaemon({
+            "feeds": [
+                {"name": "A", "url": "http://a.example.com/feed.zip"},
+                {
+                    "name": "B",
+                    "url": "http://b.example.com/feed.zip",
+                    "canonical": False,
+                },
+            ],
+            "database": {},
+            "max_retries": 1,
+            "convert_workers": 0,
+            "canonical": {"load_mode": "row"},
+        })
+        daemon.metrics = MagicMock()
+        daemon.db_writer = MagicMock()
+        daemon.db_writer.get_feed_state.return_value = {}
+        daemon.download_gtfs_from_url = lambda url, *args: FeedDownload(
+            path=gtfs_path, sha256=url
+        )
+
+        canonical_loads = []
+
+        def load_feed_tables(processor, tables, source_info, **options):
+            canonical_loads.append((source_info["name"], tables, options))
+            return True
+
+        with patch("gtfs_daemon.gk.read_feed", wraps=gk.read_feed) as read:
+            with patch(
+                "gtfs_processor.GTFSProcessor.load_feed_tables",
+                autospec=True,
+                side_effect=load_feed_tables,
+            ):
+                assert daemon.run_once()
+
+                # One parse per feed, whichever schemas it is written to
+                assert read.call_count == 2
+                written = [
+                    call.args[0]
+                    for call in daemon.db_writer.write_journey_data.mock_calls
+                ]
+                assert len(written) == 2
+                assert not any("canonical" in data for data in written)
+
+                [(name, tables, options)] = canonical_loads
+                assert name == "A" and options == {"load_mode": "row"}
+                assert tables["schedule"]["departure_secs"].tolist() == [
+                    8 * 3600,
+                    8 * 3600 + 300,
+                ]
+
+                # A failed canonical load fails the feed
+                daemon.feeds = daemon.feeds[:1]
+                canonical_loads.clear()
+                with patch(
+                    "gtfs_processor.GTFSProcessor.load_feed_tables",
+                    return_value=False,
+                ):
+                    assert not daemon.run_once()
+
+    print("✓ Single-parse dual-schema ingest test passed")
+
+
+def test_canonical_loader_imported_on_demand():
+    """Test that the daemon starts without the canonical loader stack."""
+    print("Testing the canonical loader is imported on demand...")
+
+    daemon_dir = os.path.dirname(os.path.abspath(__file__))
+    script = (
+        f"import sys; sys.path.insert(0, {daemon_dir!r})\n"
+        "import gtfs_daemon\n"
+        "print('gtfs_processor' in sys.modules, 'psutil' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.splitlines()[-1] == "False False"
+
+    print("✓ Canonical loader import test passed")
+
+
+def test_bulk_copy_writer():
+    """Test that tables are written through COPY and one merge each."""
+    print("Testing bulk COPY writer...")
+
+    copied = []
+    executed = []
+    cursor = MagicMock()
+    cursor.copy_expert.side_effect = lambda sql, buffer: copied.append(
+        (sql, buffer.read())
+    )
+    cursor.execute.side_effect = lambda sql, *args: executed.append(
+        " ".join(sql.split())
+    )
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    writer = PostgreSQLOpenJourneyWriter({}, copy_batch_size=2)
+    writer.metrics = MagicMock()
+    writer.get_connection = lambda: conn
+    writer.write_journey_data({
+        "stops": [
+            {
+                "stop_id": "S1",
+                "stop_name": 'Main St, "North"',
+                "stop_lat": -42.88,
+                "stop_lon": 147.32,
+                "location_type": 0,
+                "parent_station": None,
+                "wheelchair_boarding": 1,
+            },
+        ],
+        "segments": [
+            {"segment_id": f"P1_{i}", "distance": float("nan")}
+            for i in range(1, 4)
+        ],
+    })
+
+    # Segments arrive in COPY chunks of copy_batch_size rows
+    assert [sql.split()[1] for sql, _ in copied] == [
+        "staging_stops",
+        "staging_segments",
+        "staging_segments",
+    ]
+    assert copied[0][1] == (
+        'S1,"Main St, ""North""",-42.88,147.32,0,\\N,1\n'
+    )
+    assert copied[1][1].splitlines() == [
+        "P1_1" + ",\\N" * 9,
+        "P1_2" + ",\\N" * 9,
+    ]
+    merges = [sql for sql in executed if sql.startswith("INSERT")]
+    assert len(merges) == 2
+    assert "ST_SetSRID(ST_MakePoint(stop_lon, stop_lat), 4326)" in merges[0]
+    assert "ON CONFLICT (segment_id) DO UPDATE" in merges[1]
+    assert "ORDER BY segment_id, staged_row DESC" in merges[1]
+    assert "TRUNCATE staging_segments RESTART IDENTITY" in executed
+    assert writer.write_stats["segments"]["rows"] == 3
+    writer.metrics.record_gtfs_table_write.assert_any_call(
+        "segments", "copy", 3, writer.write_stats["segments"]["seconds"]
+    )
+
+    # The row-by-row path is still available
+    writer = PostgreSQLOpenJourneyWriter({}, write_mode="rows")
+    writer.metrics = MagicMock()
+    writer.write_routes = MagicMock()
+    writer.write_table(conn, "routes", [{"route_id": "R1"}])
+    writer.write_routes.assert_called_once_with(conn, [{"route_id": "R1"}])
+
+    print("✓ Bulk COPY writer test passed")
+
+
+def test_trip_segments_replaced_by_patterns():
+    """Test that per-trip segments of rewritten routes are deleted."""
+    print("Testing per-trip segment cleanup...")
+
+    executed = []
+    cursor = MagicMock()
+    cursor.rowcount = 5
+    cursor.execute.side_effect = lambda sql, *args: executed.append(
+        (" ".join(sql.split()), args)
+    )
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    writer = PostgreSQLOpenJourneyWriter({}, write_mode="rows")
+    writer.metrics = MagicMock()
+    writer.get_connection = lambda: conn
+    writer.write_segments = MagicMock()
+    writer.write_journey_data({
+        "segments": [
+            {"segment_id": "P1_1", "route_id": "R2"},
+            {"segment_id": "P1_2", "route_id": "R2"},
+            {"segment_id": "P2_1", "route_id": "R1"},
+        ],
+    })
+
+    (sql, args), = executed
+    assert sql == (
+        "DELETE FROM openjourney.segments "
+        "WHERE pattern_id IS NULL AND route_id = ANY(%s)"
+    )
+    assert args == ((["R1", "R2"],),)
+    # In the same transaction as the new segments
+    writer.write_segments.assert_called_once()
+    conn.commit.assert_called_once()
+
+    print("✓ Per-trip segment cleanup test passed")
+
+
 def test_config_file_format():
     """Test that the config.json file is valid."""
     print("Testing config.json file format...")
@@ -163,6 +893,17 @@ def run_all_tests():
         test_converter_initialization()
         test_download_function()
         test_route_type_mapping()
+        test_segment_generation()
+        test_concurrent_feed_processing()
+        test_conditional_download()
+        test_feed_schedules()
+        test_resident_mode()
+        test_pipelined_feed_processing()
+        test_process_pool_conversion()
+        test_single_parse_dual_schema()
+        test_canonical_loader_imported_on_demand()
+        test_bulk_copy_writer()
+        test_trip_segments_replaced_by_patterns()
         test_config_file_format()
         test_environment_variable_handling()
 
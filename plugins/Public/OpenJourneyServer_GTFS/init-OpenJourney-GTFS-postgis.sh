@@ -48,6 +48,7 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
     -- Essential: Segments table (maps to GTFS trips.txt and stop_times.txt)
     CREATE TABLE IF NOT EXISTS openjourney.segments (
         segment_id TEXT PRIMARY KEY,
+        pattern_id TEXT,
         route_id TEXT NOT NULL REFERENCES openjourney.routes(route_id),
         start_stop_id TEXT NOT NULL,
         end_stop_id TEXT NOT NULL,
@@ -55,6 +56,30 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
         created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
         updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
     );
+    -- Segments created before journey patterns gain their column (indexed below)
+    ALTER TABLE openjourney.segments ADD COLUMN IF NOT EXISTS pattern_id TEXT;
+
+    -- Essential: Trip Patterns table (each trip's journey pattern, keying its segments)
+    CREATE TABLE IF NOT EXISTS openjourney.trip_patterns (
+        trip_id TEXT PRIMARY KEY,
+        pattern_id TEXT NOT NULL,
+        route_id TEXT REFERENCES openjourney.routes(route_id),
+        service_id TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+
+    -- Essential: Feed Sync State table (validators and checksum of each feed's last download)
+    CREATE TABLE IF NOT EXISTS openjourney.feed_sync_state (
+        feed_name TEXT PRIMARY KEY,
+        feed_url TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        sha256 TEXT,
+        content_length BIGINT,
+        checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
 
     -- Essential: Temporal Data table (maps to GTFS calendar.txt/calendar_dates.txt)
     CREATE TABLE IF NOT EXISTS openjourney.temporal_data (
@@ -75,6 +100,8 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
     -- Create essential indexes for performance
     CREATE INDEX IF NOT EXISTS idx_segments_route_id ON openjourney.segments (route_id);
     CREATE INDEX IF NOT EXISTS idx_segments_stops ON openjourney.segments (start_stop_id, end_stop_id);
+    CREATE INDEX IF NOT EXISTS idx_segments_pattern ON openjourney.segments (pattern_id, sequence_order);
+    CREATE INDEX IF NOT EXISTS idx_trip_patterns_pattern ON openjourney.trip_patterns (pattern_id);
     CREATE INDEX IF NOT EXISTS idx_temporal_data_dates ON openjourney.temporal_data (start_date, end_date);
     CREATE INDEX IF NOT EXISTS idx_stops_location ON openjourney.stops (stop_lat, stop_lon);
 
@@ -92,6 +119,7 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
     CREATE TRIGGER update_routes_updated_at BEFORE UPDATE ON openjourney.routes FOR EACH ROW EXECUTE FUNCTION openjourney.update_updated_at_column();
     CREATE TRIGGER update_stops_updated_at BEFORE UPDATE ON openjourney.stops FOR EACH ROW EXECUTE FUNCTION openjourney.update_updated_at_column();
     CREATE TRIGGER update_segments_updated_at BEFORE UPDATE ON openjourney.segments FOR EACH ROW EXECUTE FUNCTION openjourney.update_updated_at_column();
+    CREATE TRIGGER update_trip_patterns_updated_at BEFORE UPDATE ON openjourney.trip_patterns FOR EACH ROW EXECUTE FUNCTION openjourney.update_updated_at_column();
     CREATE TRIGGER update_temporal_data_updated_at BEFORE UPDATE ON openjourney.temporal_data FOR EACH ROW EXECUTE FUNCTION openjourney.update_updated_at_column();
 
     -- Grant permissions on OpenJourney schema objects
@@ -80,7 +80,9 @@ class GTFSPlugin(InstallerPlugin):
                 "routes",
                 "stops",
                 "segments",
+                "trip_patterns",  # Links trips to their segments
                 "temporal_data",  # Essential for GTFS calendar data
+                "feed_sync_state",  # Skips unchanged feed downloads
             ],
             "optional_tables": [
                 "path_geometry",  # Only if shapes.txt present
@@ -96,6 +98,7 @@ class GTFSPlugin(InstallerPlugin):
                 "routes": 1000,
                 "stops": 5000,
                 "segments": 10000,
+                "trip_patterns": 50000,
                 "temporal_data": 100,
                 "path_geometry": 50000,  # Only if shapes present
             },
@@ -239,6 +242,8 @@ class GTFSPlugin(InstallerPlugin):
             "segments": """
                 CREATE TABLE IF NOT EXISTS openjourney.segments (
                     segment_id TEXT PRIMARY KEY,
+                    pattern_id TEXT,
+                    sequence_order INTEGER,
                     route_id TEXT REFERENCES openjourney.routes(route_id),
                     start_stop_id TEXT,
                     end_stop_id TEXT,
@@ -250,6 +255,35 @@ class GTFSPlugin(InstallerPlugin):
                     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
                 );
                 CREATE INDEX IF NOT EXISTS idx_segments_route_id ON openjourney.segments (route_id);
+                CREATE INDEX IF NOT EXISTS idx_segments_pattern ON openjourney.segments (pattern_id, sequence_order);
+            """,
+            "trip_patterns": """
+                -- Segments created before journey patterns gain their columns
+                ALTER TABLE openjourney.segments ADD COLUMN IF NOT EXISTS pattern_id TEXT;
+                ALTER TABLE openjourney.segments ADD COLUMN IF NOT EXISTS sequence_order INTEGER;
+                CREATE INDEX IF NOT EXISTS idx_segments_pattern ON openjourney.segments (pattern_id, sequence_order);
+
+                CREATE TABLE IF NOT EXISTS openjourney.trip_patterns (
+                    trip_id TEXT PRIMARY KEY,
+                    pattern_id TEXT NOT NULL,
+                    route_id TEXT REFERENCES openjourney.routes(route_id),
+                    service_id TEXT,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                );
+                CREATE INDEX IF NOT EXISTS idx_trip_patterns_pattern ON openjourney.trip_patterns (pattern_id);
+            """,
+            "feed_sync_state": """
+                CREATE TABLE IF NOT EXISTS openjourney.feed_sync_state (
+                    feed_name TEXT PRIMARY KEY,
+                    feed_url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    sha256 TEXT,
+                    content_length BIGINT,
+                    checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                    changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                );
             """,
             "path_geometry": """
                 CREATE TABLE IF NOT EXISTS openjourney.path_geometry (
@@ -380,6 +414,7 @@ class GTFSPlugin(InstallerPlugin):
                 "data_sources",
                 "routes",
                 "segments",
+                "trip_patterns",
                 "fares",
                 "stops",
                 "vehicle_profiles",
@@ -656,6 +691,8 @@ class GTFSMigration001(Migration):
         """Rollback the migration - remove GTFS schema."""
         # Drop tables in reverse dependency order
         tables_to_drop = [
+            "feed_sync_state",
+            "trip_patterns",
             "path_geometry",
             "navigation_instructions",
             "fare_rules",
@@ -6,16 +6,25 @@ This processor handles GTFS (General Transit Feed Specification) data and conver
 to the canonical database schema.
 """
 
+import hashlib
+import io
+import re
 import zipfile
 import tempfile
 import shutil
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Set
 import pandas as pd
 import gtfs_kit as gk
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 import requests
 from datetime import datetime
 
@@ -23,7 +32,12 @@ from datetime import datetime
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
-from common.processor_interface import ProcessorInterface, ProcessorError
+from common.processor_interface import (
+    ALL_TABLES,
+    ProcessorError,
+    ProcessorInterface,
+)
+from common.gtfs_utils import gtfs_time_to_seconds
 from common.logging_config import (
     setup_service_logging,
     get_logger,
@@ -31,6 +45,427 @@ from common.logging_config import (
     log_performance,
 )
 
+# Canonical tables written by the loader, keyed by the transformed data key.
+# "fields" maps each canonical column from its GTFS source column as
+# (column, source, default, dtype): the default is used when the source
+# column is missing (or fills missing values when a dtype is given) and the
+# dtype, when set, is the pandas dtype the column is cast to (GTFS_TIME
+# parses "HH:MM:SS" into integer seconds since noon minus 12h). "conflict" is
+# the unique key used for upserts and "geom" an optional expression evaluated
+# against the staged columns to populate the geometry column.
+GTFS_TIME = "gtfs_time"
+
+CANONICAL_TABLES: Dict[str, Dict[str, Any]] = {
+    "agencies": {
+        "table": "transport_agencies",
+        "fields": [
+            ("agency_id", "agency_id", "", None),
+            ("agency_name", "agency_name", "", None),
+            ("agency_url", "agency_url", "", None),
+            ("agency_timezone", "agency_timezone", "", None),
+            ("agency_lang", "agency_lang", None, None),
+            ("agency_phone", "agency_phone", None, None),
+            ("agency_fare_url", "agency_fare_url", None, None),
+            ("agency_email", "agency_email", None, None),
+        ],
+        "conflict": ["agency_id"],
+    },
+    "routes": {
+        "table": "transport_routes",
+        "fields": [
+            ("route_id", "route_id", None, None),
+            ("agency_id", "agency_id", "", None),
+            ("route_short_name", "route_short_name", None, None),
+            ("route_long_name", "route_long_name", None, None),
+            ("route_description", "route_desc", None, None),
+            ("route_type", "route_type", 0, "int64"),
+            ("route_url", "route_url", None, None),
+            ("route_color", "route_color", "FFFFFF", None),
+            ("route_text_color", "route_text_color", "000000", None),
+            ("route_sort_order", "route_sort_order", None, "Int64"),
+            ("continuous_pickup", "continuous_pickup", 1, "Int64"),
+            ("continuous_drop_off", "continuous_drop_off", 1, "Int64"),
+        ],
+        "conflict": ["route_id"],
+    },
+    "stops": {
+        "table": "transport_stops",
+        "fields": [
+            ("stop_id", "stop_id", None, None),
+            ("stop_name", "stop_name", "", None),
+            ("stop_description", "stop_desc", None, None),
+            ("stop_lat", "stop_lat", 0, "float64"),
+            ("stop_lon", "stop_lon", 0, "float64"),
+            ("zone_id", "zone_id", None, None),
+            ("stop_url", "stop_url", None, None),
+            ("location_type", "location_type", 0, "int64"),
+            ("parent_station", "parent_station", None, None),
+            ("stop_timezone", "stop_timezone", None, None),
+            ("wheelchair_boarding", "wheelchair_boarding", 0, "int64"),
+            ("level_id", "level_id", None, None),
+            ("platform_code", "platform_code", None, None),
+        ],
+        "conflict": ["stop_id"],
+        "geom": "ST_SetSRID(ST_MakePoint(stop_lon, stop_lat), 4326)",
+    },
+    "calendar": {
+        "table": "transport_calendar",
+        "fields": [
+            ("service_id", "service_id", None, None),
+            ("monday", "monday", 0, "bool"),
+            ("tuesday", "tuesday", 0, "bool"),
+            ("wednesday", "wednesday", 0, "bool"),
+            ("thursday", "thursday", 0, "bool"),
+            ("friday", "friday", 0, "bool"),
+            ("saturday", "saturday", 0, "bool"),
+            ("sunday", "sunday", 0, "bool"),
+            ("start_date", "start_date", None, None),
+            ("end_date", "end_date", None, None),
+        ],
+        "conflict": ["service_id"],
+    },
+    "calendar_dates": {
+        "table": "transport_calendar_dates",
+        "fields": [
+            ("service_id", "service_id", None, None),
+            ("date", "date", None, None),
+            ("exception_type", "exception_type", 1, "int64"),
+        ],
+        "conflict": ["service_id", "date"],
+    },
+    "shapes": {
+        "table": "transport_shapes",
+        "fields": [
+            ("shape_id", "shape_id", None, None),
+            ("shape_pt_lat", "shape_pt_lat", 0, "float64"),
+            ("shape_pt_lon", "shape_pt_lon", 0, "float64"),
+            ("shape_pt_sequence", "shape_pt_sequence", 0, "int64"),
+            ("shape_dist_traveled", "shape_dist_traveled", None, "float64"),
+        ],
+        "conflict": ["shape_id", "shape_pt_sequence"],
+    },
+    "trips": {
+        "table": "transport_trips",
+        "fields": [
+            ("trip_id", "trip_id", None, None),
+            ("route_id", "route_id", None, None),
+            ("service_id", "service_id", None, None),
+            ("trip_headsign", "trip_headsign", None, None),
+            ("trip_short_name", "trip_short_name", None, None),
+            ("direction_id", "direction_id", None, "Int64"),
+            ("block_id", "block_id", None, None),
+            ("shape_id", "shape_id", None, None),
+            ("wheelchair_accessible", "wheelchair_accessible", 0, "int64"),
+            ("bikes_allowed", "bikes_allowed", 0, "int64"),
+        ],
+        "conflict": ["trip_id"],
+    },
+    "schedule": {
+        "table": "transport_schedule",
+        "fields": [
+            ("trip_id", "trip_id", None, None),
+            ("arrival_secs", "arrival_time", None, GTFS_TIME),
+            ("departure_secs", "departure_time", None, GTFS_TIME),
+            ("stop_id", "stop_id", None, None),
+            ("stop_sequence", "stop_sequence", 0, "int64"),
+            ("stop_headsign", "stop_headsign", None, None),
+            ("pickup_type", "pickup_type", 0, "int64"),
+            ("drop_off_type", "drop_off_type", 0, "int64"),
+            ("continuous_pickup", "continuous_pickup", None, "Int64"),
+            ("continuous_drop_off", "continuous_drop_off", None, "Int64"),
+            ("shape_dist_traveled", "shape_dist_traveled", None, "float64"),
+            ("timepoint", "timepoint", 1, "int64"),
+        ],
+        "conflict": ["trip_id", "stop_sequence"],
+    },
+}
+
+for _spec in CANONICAL_TABLES.values():
+    _spec["columns"] = [field[0] for field in _spec["fields"]]
+
+# GTFS feed attribute holding the source table for each data key
+GTFS_SOURCE_TABLES = {
+    "agencies": "agency",
+    "routes": "routes",
+    "stops": "stops",
+    "trips": "trips",
+    "schedule": "stop_times",
+    "shapes": "shapes",
+    "calendar": "calendar",
+    "calendar_dates": "calendar_dates",
+}
+
+# Order in which tables are loaded so that referenced rows exist first
+LOAD_ORDER = [
+    "agencies",
+    "routes",
+    "stops",
+    "calendar",
+    "calendar_dates",
+    "shapes",
+    "trips",
+    "schedule",
+]
+
+# Canonical schema DDL, the source of truth for table dependencies
+SCHEMA_SQL = Path(__file__).parent.parent / "sql" / "gtfs_schema.sql"
+
+LOAD_MODE_BULK = "bulk"
+LOAD_MODE_ROW = "row"
+LOAD_MODE_SHADOW = "shadow"
+LOAD_MODE_DELTA = "delta"
+
+# Line geometry per shape, derived from transport_shapes during the load
+SHAPE_GEOMS_TABLE = "transport_shape_geoms"
+
+# Every table replaced as a whole by a shadow load
+SWAPPED_TABLES = [spec["table"] for spec in CANONICAL_TABLES.values()] + [
+    SHAPE_GEOMS_TABLE
+]
+
+# Schemas used by the shadow load: the new version of the canonical tables
+# is built in SHADOW_SCHEMA and the version it replaces is kept in
+# PREVIOUS_SCHEMA until the next swap, so that it can be restored.
+CANONICAL_SCHEMA = "canonical"
+SHADOW_SCHEMA = "canonical_shadow"
+PREVIOUS_SCHEMA = "canonical_previous"
+
+EXTRACT_MODE_FEED = "feed"
+EXTRACT_MODE_STREAM = "stream"
+
+
+def transform_table(key: str, frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map a raw GTFS table onto the canonical columns for ``key``.
+
+    Columns are renamed, defaulted and cast on the whole DataFrame at once;
+    no per-row Python objects are created.
+
+    Args:
+        key: Transformed data key (see CANONICAL_TABLES)
+        frame: Raw GTFS table
+
+    Returns:
+        DataFrame holding exactly the canonical columns, in order
+    """
+    columns = {}
+    for column, source, default, dtype in CANONICAL_TABLES[key]["fields"]:
+        if source in frame.columns:
+            values = frame[source]
+            if dtype == GTFS_TIME:
+                values = gtfs_time_to_seconds(values)
+            elif dtype is not None:
+                values = pd.to_numeric(values, errors="coerce")
+                if default is not None:
+                    values = values.fillna(default)
+                values = values.astype(dtype)
+        else:
+            if dtype == GTFS_TIME:
+                dtype = "Int64"
+            values = pd.Series(
+                default, index=frame.index, dtype=dtype or object
+            )
+        columns[column] = values
+    return pd.DataFrame(columns, index=frame.index).reset_index(drop=True)
+
+
+def transform_feed(feed) -> Dict[str, pd.DataFrame]:
+    """
+    Transform every table of a parsed GTFS feed to canonical format.
+
+    Args:
+        feed: gtfs_kit Feed, as read by extract or by another consumer of
+            the same archive
+
+    Returns:
+        Dictionary mapping each data key present in the feed to its
+        canonical DataFrame (see transform_table)
+    """
+    transformed = {}
+    for key, source_table in GTFS_SOURCE_TABLES.items():
+        frame = getattr(feed, source_table, None)
+        if frame is not None:
+            transformed[key] = transform_table(key, frame)
+    return transformed
+
+
+@lru_cache(maxsize=None)
+def table_dependencies(schema_sql: Path = SCHEMA_SQL) -> Dict[str, Set[str]]:
+    """
+    Derive the load dependencies between data keys from the schema's FKs.
+
+    Every ``REFERENCES canonical.<table>`` in a CREATE TABLE or ALTER TABLE
+    statement makes the referencing table depend on the referenced one.
+    Self references (e.g. parent stations) impose no ordering.
+
+    Args:
+        schema_sql: Path to the canonical schema DDL
+
+    Returns:
+        Dictionary mapping each data key to the data keys it references
+    """
+    keys_by_table = {
+        spec["table"]: key for key, spec in CANONICAL_TABLES.items()
+    }
+    dependencies = {key: set() for key in CANONICAL_TABLES}
+    statement_table = re.compile(
+        r"(?:CREATE TABLE(?: IF NOT EXISTS)?|ALTER TABLE)\s+canonical\.(\w+)",
+        re.IGNORECASE,
+    )
+    reference = re.compile(r"REFERENCES\s+canonical\.(\w+)", re.IGNORECASE)
+
+    sql = re.sub(r"--[^\n]*", "", Path(schema_sql).read_text())
+    for statement in sql.split(";"):
+        match = statement_table.search(statement)
+        if not match or match.group(1) not in keys_by_table:
+            continue
+        key = keys_by_table[match.group(1)]
+        for table in reference.findall(statement):
+            if table in keys_by_table and keys_by_table[table] != key:
+                dependencies[key].add(keys_by_table[table])
+    return dependencies
+
+
+def _member_file(key: str) -> str:
+    """Return the GTFS file name holding the source table for a data key."""
+    return f"{GTFS_SOURCE_TABLES[key]}.txt"
+
+
+def _zip_members(zip_file: zipfile.ZipFile) -> Dict[str, str]:
+    """Map member base names to archive names."""
+    # Feeds are sometimes zipped with a top-level folder
+    return {
+        Path(name).name: name
+        for name in zip_file.namelist()
+        if not name.endswith("/")
+    }
+
+
+def hash_gtfs_members(
+    source_path: Path, chunk_size: int = 1024 * 1024
+) -> Dict[str, str]:
+    """
+    Compute the SHA-256 of every loadable GTFS member file.
+
+    Members are hashed as a stream of ``chunk_size`` blocks, so neither the
+    archive nor any member is extracted or held in memory.
+
+    Args:
+        source_path: Path to a GTFS zip file or directory
+        chunk_size: Number of bytes read per block
+
+    Returns:
+        Dictionary mapping member file name (e.g. "stops.txt") to hex digest
+    """
+    source_path = Path(source_path)
+    file_names = [_member_file(key) for key in LOAD_ORDER]
+    hashes = {}
+
+    def digest(handle):
+        sha256 = hashlib.sha256()
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            sha256.update(block)
+        return sha256.hexdigest()
+
+    if source_path.is_dir():
+        for file_name in file_names:
+            path = source_path / file_name
+            if path.exists():
+                with open(path, "rb") as handle:
+                    hashes[file_name] = digest(handle)
+        return hashes
+
+    with zipfile.ZipFile(source_path, "r") as zip_file:
+        members = _zip_members(zip_file)
+        for file_name in file_names:
+            if file_name in members:
+                with zip_file.open(members[file_name]) as handle:
+                    hashes[file_name] = digest(handle)
+    return hashes
+
+
+def stream_gtfs_tables(
+    source_path: Path,
+    batch_size: int = 50000,
+    keys: Optional[Iterable[str]] = None,
+):
+    """
+    Stream GTFS tables as fixed-size raw DataFrame batches.
+
+    Each member of a zip archive (or file of a feed directory) is read as a
+    chunked CSV straight from its source; nothing is extracted to disk and
+    at most one batch per table is held in memory. Tables are yielded in
+    LOAD_ORDER so that every table is complete before the next one starts.
+
+    Args:
+        source_path: Path to a GTFS zip file or directory
+        batch_size: Number of rows per yielded batch
+        keys: Data keys to read (default: every table in LOAD_ORDER)
+
+    Yields:
+        (key, DataFrame) tuples, with all values read as strings
+    """
+    source_path = Path(source_path)
+    keys = LOAD_ORDER if keys is None else set(keys)
+    wanted = {_member_file(key): key for key in LOAD_ORDER if key in keys}
+
+    def read_batches(key, handle):
+        reader = pd.read_csv(
+            handle,
+            dtype=str,
+            encoding="utf-8-sig",
+            skipinitialspace=True,
+            chunksize=batch_size,
+        )
+        with reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.str.strip()
+                yield key, chunk
+
+    if source_path.is_dir():
+        for file_name, key in wanted.items():
+            path = source_path / file_name
+            if path.exists():
+                yield from read_batches(key, path)
+        return
+
+    with zipfile.ZipFile(source_path, "r") as zip_file:
+        members = _zip_members(zip_file)
+        for file_name, key in wanted.items():
+            if file_name in members:
+                with zip_file.open(members[file_name]) as handle:
+                    yield from read_batches(key, handle)
+
+
+_TABLE_REFERENCE = re.compile(
+    rf"\b{CANONICAL_SCHEMA}\.(" + "|".join(SWAPPED_TABLES) + r")\b"
+)
+
+
+def _retarget(definition: str, schema: str) -> str:
+    """
+    Point the canonical table references of a DDL definition at ``schema``.
+
+    Only the tables in SWAPPED_TABLES are rewritten; functions and other
+    objects in the canonical schema (e.g. trigger functions) are left alone.
+    """
+    return _TABLE_REFERENCE.sub(rf"{schema}.\1", definition)
+
+
+def _iter_records(frame: pd.DataFrame, chunk_size: int = 10000):
+    """
+    Yield the rows of a DataFrame as dicts of plain Python values.
+
+    Missing values become None. Rows are materialised one chunk at a time,
+    so the row-at-a-time writers never need the whole table as dicts.
+    """
+    columns = list(frame.columns)
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start : start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for values in chunk.itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+
 
 class GTFSDatabaseWriter:
     """
@@ -40,6 +475,8 @@ class GTFSDatabaseWriter:
     def __init__(self, db_config: Dict):
         """Initialize with database configuration."""
         self.db_config = db_config
+        # Feed being loaded; gives the feed staging tables of its own
+        self.feed_name: Optional[str] = None
         # Set up centralized logging for GTFS database writer
         setup_service_logging("gtfs-database-writer")
         self.logger = get_logger("GTFSDatabaseWriter")
@@ -54,13 +491,20 @@ class GTFSDatabaseWriter:
             password=self.db_config["password"],
         )
 
-    def write_agencies(self, conn, agencies_data: List[Dict]):
-        """Write agencies data to canonical.transport_agencies."""
-        self.logger.info(f"Writing {len(agencies_data)} agencies to database")
-        log_database_operation(
-            "INSERT", "transport_agencies", len(agencies_data)
+    def connection_pool(self, size: int) -> ThreadedConnectionPool:
+        """Create a pool of up to ``size`` connections for parallel loads."""
+        return ThreadedConnectionPool(
+            1,
+            size,
+            host=self.db_config["host"],
+            port=self.db_config["port"],
+            database=self.db_config["database"],
+            user=self.db_config["user"],
+            password=self.db_config["password"],
         )
 
+    def write_agencies(self, conn, agencies_data: Iterable[Dict]):
+        """Write agencies data to canonical.transport_agencies."""
         with conn.cursor() as cur:
             for agency in agencies_data:
                 cur.execute(
@@ -81,7 +525,7 @@ class GTFSDatabaseWriter:
                     agency,
                 )
 
-    def write_routes(self, conn, routes_data: List[Dict]):
+    def write_routes(self, conn, routes_data: Iterable[Dict]):
         """Write routes data to canonical.transport_routes."""
         with conn.cursor() as cur:
             for route in routes_data:
@@ -110,7 +554,7 @@ class GTFSDatabaseWriter:
                     route,
                 )
 
-    def write_stops(self, conn, stops_data: List[Dict]):
+    def write_stops(self, conn, stops_data: Iterable[Dict]):
         """Write stops data to canonical.transport_stops."""
         with conn.cursor() as cur:
             for stop in stops_data:
@@ -141,7 +585,7 @@ class GTFSDatabaseWriter:
                     stop,
                 )
 
-    def write_trips(self, conn, trips_data: List[Dict]):
+    def write_trips(self, conn, trips_data: Iterable[Dict]):
         """Write trips data to canonical.transport_trips."""
         with conn.cursor() as cur:
             for trip in trips_data:
@@ -167,21 +611,21 @@ class GTFSDatabaseWriter:
                     trip,
                 )
 
-    def write_schedule(self, conn, schedule_data: List[Dict]):
+    def write_schedule(self, conn, schedule_data: Iterable[Dict]):
         """Write schedule data to canonical.transport_schedule."""
         with conn.cursor() as cur:
             for schedule in schedule_data:
                 cur.execute(
                     """
                     INSERT INTO canonical.transport_schedule 
-                    (trip_id, arrival_time, departure_time, stop_id, stop_sequence, stop_headsign, 
+                    (trip_id, arrival_secs, departure_secs, stop_id, stop_sequence, stop_headsign, 
                      pickup_type, drop_off_type, continuous_pickup, continuous_drop_off, shape_dist_traveled, timepoint)
-                    VALUES (%(trip_id)s, %(arrival_time)s, %(departure_time)s, %(stop_id)s, %(stop_sequence)s, 
+                    VALUES (%(trip_id)s, %(arrival_secs)s, %(departure_secs)s, %(stop_id)s, %(stop_sequence)s, 
                             %(stop_headsign)s, %(pickup_type)s, %(drop_off_type)s, %(continuous_pickup)s, 
                             %(continuous_drop_off)s, %(shape_dist_traveled)s, %(timepoint)s)
                     ON CONFLICT (trip_id, stop_sequence) DO UPDATE SET
-                        arrival_time = EXCLUDED.arrival_time,
-                        departure_time = EXCLUDED.departure_time,
+                        arrival_secs = EXCLUDED.arrival_secs,
+                        departure_secs = EXCLUDED.departure_secs,
                         stop_id = EXCLUDED.stop_id,
                         stop_headsign = EXCLUDED.stop_headsign,
                         pickup_type = EXCLUDED.pickup_type,
@@ -195,7 +639,7 @@ class GTFSDatabaseWriter:
                     schedule,
                 )
 
-    def write_shapes(self, conn, shapes_data: List[Dict]):
+    def write_shapes(self, conn, shapes_data: Iterable[Dict]):
         """Write shapes data to canonical.transport_shapes."""
         with conn.cursor() as cur:
             for shape in shapes_data:
@@ -213,7 +657,7 @@ class GTFSDatabaseWriter:
                     shape,
                 )
 
-    def write_calendar(self, conn, calendar_data: List[Dict]):
+    def write_calendar(self, conn, calendar_data: Iterable[Dict]):
         """Write calendar data to canonical.transport_calendar."""
         with conn.cursor() as cur:
             for calendar in calendar_data:
@@ -238,7 +682,7 @@ class GTFSDatabaseWriter:
                     calendar,
                 )
 
-    def write_calendar_dates(self, conn, calendar_dates_data: List[Dict]):
+    def write_calendar_dates(self, conn, calendar_dates_data: Iterable[Dict]):
         """Write calendar dates data to canonical.transport_calendar_dates."""
         with conn.cursor() as cur:
             for calendar_date in calendar_dates_data:
@@ -254,6 +698,993 @@ class GTFSDatabaseWriter:
                     calendar_date,
                 )
 
+    def staging_table(self, key: str) -> str:
+        """
+        Return the qualified name of the staging table for a data key.
+
+        Each feed stages into tables of its own, so feeds loaded at the same
+        time from other processes never merge or truncate each other's rows.
+        """
+        table = CANONICAL_TABLES[key]["table"]
+        if not self.feed_name:
+            return f"canonical.staging_{table}"
+        # A digest keeps the name within PostgreSQL's identifier length
+        feed = hashlib.sha256(self.feed_name.encode()).hexdigest()[:12]
+        return f"canonical.staging_{feed}_{table}"
+
+    def prepare_staging(self, conn, key: str):
+        """
+        Create (if needed) and empty the UNLOGGED staging table for a data key.
+
+        The staging table mirrors the column types of the canonical table but
+        carries no constraints, indexes or triggers, so COPY into it is cheap
+        and generates no WAL. Once it exists, preparing it no longer touches
+        the canonical table, so it never waits on locks held by a load.
+
+        A staged_row identity column numbers the rows in the order they are
+        copied, so that merges keep the last row staged for a key, as the
+        row-at-a-time upserts do.
+        """
+        spec = CANONICAL_TABLES[key]
+        staging = self.staging_table(key)
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (staging,))
+            if cur.fetchone()[0] is None:
+                cur.execute(
+                    f"""
+                    CREATE UNLOGGED TABLE {staging} AS
+                    SELECT {", ".join(spec["columns"])}
+                    FROM canonical.{spec["table"]} WITH NO DATA
+                """
+                )
+            # Also added to staging tables created without it
+            cur.execute(
+                f"ALTER TABLE {staging} ADD COLUMN IF NOT EXISTS "
+                "staged_row BIGINT GENERATED ALWAYS AS IDENTITY"
+            )
+            cur.execute(f"TRUNCATE {staging} RESTART IDENTITY")
+
+    def copy_to_staging(
+        self, conn, key: str, frame: pd.DataFrame, batch_size: int = 50000
+    ) -> int:
+        """
+        Stream a canonical DataFrame into the staging table with COPY.
+
+        The frame is serialised as CSV in chunks of ``batch_size`` rows so
+        that the COPY buffer never holds more than one chunk in memory.
+
+        Returns:
+            Number of rows copied
+        """
+        columns = CANONICAL_TABLES[key]["columns"]
+        copy_sql = (
+            f"COPY {self.staging_table(key)} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+
+        with conn.cursor() as cur:
+            for start in range(0, len(frame), batch_size):
+                buffer = io.StringIO()
+                frame.iloc[start : start + batch_size].to_csv(
+                    buffer,
+                    columns=columns,
+                    header=False,
+                    index=False,
+                    na_rep="\\N",
+                )
+                buffer.seek(0)
+                cur.copy_expert(copy_sql, buffer)
+
+        return len(frame)
+
+    def merge_from_staging(self, conn, key: str) -> int:
+        """
+        Upsert the staged rows into the canonical table in one statement.
+
+        Returns:
+            Number of canonical rows inserted or updated
+        """
+        spec = CANONICAL_TABLES[key]
+        columns = list(spec["columns"])
+        select_columns = list(columns)
+        if spec.get("geom"):
+            columns.append("geom")
+            select_columns.append(spec["geom"])
+
+        conflict = ", ".join(spec["conflict"])
+        updates = [
+            f"{c} = EXCLUDED.{c}" for c in columns if c not in spec["conflict"]
+        ]
+        updates.append("updated_at = NOW()")
+
+        with conn.cursor() as cur:
+            # DISTINCT ON guards against duplicate keys inside one feed,
+            # which ON CONFLICT DO UPDATE would otherwise reject; the last
+            # row staged for a key wins, as with the row-at-a-time upserts.
+            cur.execute(
+                f"""
+                INSERT INTO canonical.{spec["table"]} ({", ".join(columns)})
+                SELECT DISTINCT ON ({conflict}) {", ".join(select_columns)}
+                FROM {self.staging_table(key)}
+                ORDER BY {conflict}, staged_row DESC
+                ON CONFLICT ({conflict}) DO UPDATE SET
+                    {", ".join(updates)}
+            """
+            )
+            merged = cur.rowcount
+            cur.execute(f"TRUNCATE {self.staging_table(key)}")
+        return merged
+
+    def vanished_table(self, key: str) -> str:
+        """
+        Return the temporary table listing the keys of a data key's rows
+        that vanished from the feed in this load (see merge_delta).
+        """
+        return f"vanished_{CANONICAL_TABLES[key]['table']}"
+
+    def merge_delta(
+        self, conn, key: str, feed_name: str, force: bool = False
+    ) -> Dict[str, int]:
+        """
+        Apply only the differences between the staged rows and the feed's
+        last load to the canonical table.
+
+        Each staged row is hashed and compared with the hash stored for its
+        key in canonical.feed_row_hashes when the feed was last loaded.
+        Only new and changed rows are written: rows whose content equals
+        the live row are left alone, so unchanged rows create no dead
+        tuples or WAL. Keys stored for the feed but no longer staged are
+        collected in vanished_table(key) for delete_vanished(), which must
+        run in the same transaction, after every table has been merged.
+
+        Args:
+            feed_name: Feed owning the stored row hashes
+            force: Compare every staged row with the live table instead of
+                only those whose hash changed
+
+        Returns:
+            Numbers of canonical rows inserted and updated
+        """
+        spec = CANONICAL_TABLES[key]
+        table = spec["table"]
+        staging = self.staging_table(key)
+        vanished = self.vanished_table(key)
+        columns = list(spec["columns"])
+        select_columns = list(columns)
+        if spec.get("geom"):
+            columns.append("geom")
+            select_columns.append(f"{spec['geom']} AS geom")
+        conflict = ", ".join(spec["conflict"])
+        row_key = "jsonb_build_object({})".format(
+            ", ".join(f"'{c}', {c}" for c in spec["conflict"])
+        )
+        matches = " AND ".join(f"l.{c} = d.{c}" for c in spec["conflict"])
+        changed_only = "" if force else (
+            "WHERE h.row_hash IS DISTINCT FROM d.row_hash"
+        )
+
+        with conn.cursor() as cur:
+            # Changed and new rows, with their key and hash
+            cur.execute(f"DROP TABLE IF EXISTS delta_{table}")
+            cur.execute(
+                f"""
+                CREATE TEMP TABLE delta_{table} ON COMMIT DROP AS
+                SELECT d.* FROM (
+                    SELECT DISTINCT ON ({conflict})
+                        {", ".join(select_columns)},
+                        {row_key} AS row_key,
+                        md5(ROW({", ".join(spec["columns"])})::TEXT)
+                            AS row_hash
+                    FROM {staging}
+                    ORDER BY {conflict}, staged_row DESC
+                ) d
+                LEFT JOIN canonical.feed_row_hashes h
+                    ON h.feed_name = %s
+                    AND h.table_name = %s
+                    AND h.row_key = d.row_key
+                {changed_only}
+            """,
+                (feed_name, table),
+            )
+
+            updates = [
+                f"{c} = d.{c}" for c in columns if c not in spec["conflict"]
+            ]
+            differs = "({}) IS DISTINCT FROM ({})".format(
+                ", ".join(f"l.{c}" for c in spec["columns"]),
+                ", ".join(f"d.{c}" for c in spec["columns"]),
+            )
+            cur.execute(
+                f"""
+                UPDATE canonical.{table} l SET
+                    {", ".join(updates)},
+                    updated_at = NOW()
+                FROM delta_{table} d
+                WHERE {matches} AND {differs}
+            """
+            )
+            updated = cur.rowcount
+
+            cur.execute(
+                f"""
+                INSERT INTO canonical.{table} ({", ".join(columns)})
+                SELECT {", ".join(f"d.{c}" for c in columns)}
+                FROM delta_{table} d
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM canonical.{table} l WHERE {matches}
+                )
+            """
+            )
+            inserted = cur.rowcount
+
+            cur.execute(
+                f"""
+                INSERT INTO canonical.feed_row_hashes (
+                    feed_name, table_name, row_key, row_hash
+                )
+                SELECT %s, %s, row_key, row_hash FROM delta_{table}
+                ON CONFLICT (feed_name, table_name, row_key) DO UPDATE SET
+                    row_hash = EXCLUDED.row_hash
+            """,
+                (feed_name, table),
+            )
+
+            # Keys the feed had last time but no longer has
+            cur.execute(f"DROP TABLE IF EXISTS {vanished}")
+            cur.execute(
+                f"""
+                CREATE TEMP TABLE {vanished} ON COMMIT DROP AS
+                SELECT h.row_key FROM canonical.feed_row_hashes h
+                WHERE h.feed_name = %s
+                AND h.table_name = %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM {staging} WHERE {row_key} = h.row_key
+                )
+            """,
+                (feed_name, table),
+            )
+            cur.execute(
+                f"""
+                DELETE FROM canonical.feed_row_hashes h
+                USING {vanished} v
+                WHERE h.feed_name = %s
+                AND h.table_name = %s
+                AND h.row_key = v.row_key
+            """,
+                (feed_name, table),
+            )
+            cur.execute(f"TRUNCATE {staging}")
+
+        return {"inserted": inserted, "updated": updated}
+
+    def delete_vanished(self, conn, key: str) -> int:
+        """
+        Delete the canonical rows listed by merge_delta() as vanished.
+
+        Rows another feed still has a hash for are kept. Run in reverse
+        LOAD_ORDER, so referencing rows are deleted before the rows they
+        reference.
+
+        Returns:
+            Number of canonical rows deleted
+        """
+        spec = CANONICAL_TABLES[key]
+        table = spec["table"]
+        keys = ", ".join(f"r.{c}" for c in spec["conflict"])
+        matches = " AND ".join(f"l.{c} = v.{c}" for c in spec["conflict"])
+        with conn.cursor() as cur:
+            # jsonb_populate_record turns the stored key back into values
+            # of the key columns' own types
+            cur.execute(
+                f"""
+                DELETE FROM canonical.{table} l
+                USING (
+                    SELECT v.row_key, {keys}
+                    FROM {self.vanished_table(key)} v,
+                        jsonb_populate_record(
+                            NULL::canonical.{table}, v.row_key
+                        ) r
+                ) v
+                WHERE {matches}
+                AND NOT EXISTS (
+                    SELECT 1 FROM canonical.feed_row_hashes o
+                    WHERE o.table_name = %s AND o.row_key = v.row_key
+                )
+            """,
+                (table,),
+            )
+            return cur.rowcount
+
+    def bulk_write(
+        self,
+        conn,
+        key: str,
+        frame: pd.DataFrame,
+        batch_size: int = 50000,
+        shadow: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Load one table through COPY into staging and a set-based merge.
+
+        Args:
+            shadow: Merge into the shadow table instead of the live one
+
+        Returns:
+            Load statistics: rows copied, rows merged, elapsed seconds and
+            throughput in rows per second
+        """
+        start_time = time.perf_counter()
+
+        self.prepare_staging(conn, key)
+        copied = self.copy_to_staging(conn, key, frame, batch_size)
+        if shadow:
+            merged = self.fill_shadow(conn, key)
+        else:
+            merged = self.merge_from_staging(conn, key)
+
+        return self.load_summary(
+            "COPY", key, copied, merged, time.perf_counter() - start_time
+        )
+
+    def load_summary(
+        self, operation: str, key: str, rows: int, merged: int, elapsed: float
+    ) -> Dict[str, Any]:
+        """
+        Log the outcome of loading one table and return its statistics.
+
+        Returns:
+            Load statistics: rows written, rows merged, elapsed seconds and
+            throughput in rows per second
+        """
+        table = CANONICAL_TABLES[key]["table"]
+        rows_per_sec = rows / elapsed if elapsed > 0 else float(rows)
+        log_database_operation(operation, table, rows)
+        self.logger.info(
+            f"Loaded {rows} rows into canonical.{table} "
+            f"in {elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)"
+        )
+        return {
+            "rows": rows,
+            "merged": merged,
+            "seconds": elapsed,
+            "rows_per_sec": rows_per_sec,
+        }
+
+    def get_file_hashes(self, conn, feed_name: str) -> Dict[str, str]:
+        """Return the content hash last loaded for each file of a feed."""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT file_name, content_hash
+                FROM canonical.feed_file_hashes
+                WHERE feed_name = %s
+            """,
+                (feed_name,),
+            )
+            return dict(cur.fetchall())
+
+    def record_file_hashes(
+        self,
+        conn,
+        feed_name: str,
+        hashes: Dict[str, str],
+        row_counts: Dict[str, int],
+    ):
+        """
+        Record the content hash and row count of each loaded feed file.
+
+        Args:
+            conn: Connection of the load transaction, so that hashes are
+                only stored if the tables they describe are committed
+            feed_name: Name of the feed the files belong to
+            hashes: Content hash by file name
+            row_counts: Rows loaded by file name
+        """
+        with conn.cursor() as cur:
+            for file_name, content_hash in hashes.items():
+                cur.execute(
+                    """
+                    INSERT INTO canonical.feed_file_hashes (
+                        feed_name, file_name, content_hash, row_count
+                    ) VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (feed_name, file_name) DO UPDATE SET
+                        content_hash = EXCLUDED.content_hash,
+                        row_count = EXCLUDED.row_count,
+                        loaded_at = NOW()
+                """,
+                    (
+                        feed_name,
+                        file_name,
+                        content_hash,
+                        row_counts.get(file_name, 0),
+                    ),
+                )
+
+    @contextmanager
+    def shadow_lock(self, conn):
+        """
+        Hold the shadow schemas for one shadow load.
+
+        Shadow loads of every feed share SHADOW_SCHEMA and PREVIOUS_SCHEMA,
+        and commit before their swap, so they are serialised with a
+        session-level advisory lock held from create_shadow() until the
+        swap has committed.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT pg_advisory_lock(hashtext(%s))", (SHADOW_SCHEMA,)
+            )
+        try:
+            yield
+        except Exception:
+            # The unlock cannot run in a failed transaction
+            conn.rollback()
+            raise
+        finally:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT pg_advisory_unlock(hashtext(%s))",
+                    (SHADOW_SCHEMA,),
+                )
+
+    def create_shadow(self, conn):
+        """
+        Recreate the shadow schema with empty copies of the canonical tables.
+
+        The copies have the columns and defaults of the live tables but no
+        indexes or constraints, which are built once the data is in place.
+        Serial columns get their own sequences so that the shadow tables do
+        not depend on sequences owned by the tables they replace.
+        """
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+            cur.execute(f"CREATE SCHEMA {SHADOW_SCHEMA}")
+            for table in SWAPPED_TABLES:
+                cur.execute(
+                    f"""
+                    CREATE TABLE {SHADOW_SCHEMA}.{table} (
+                        LIKE {CANONICAL_SCHEMA}.{table} INCLUDING DEFAULTS
+                    )
+                """
+                )
+                for column, sequence in self._serial_columns(conn, table):
+                    cur.execute(
+                        f"CREATE SEQUENCE {SHADOW_SCHEMA}.{sequence} "
+                        f"OWNED BY {SHADOW_SCHEMA}.{table}.{column}"
+                    )
+                    cur.execute(
+                        f"ALTER TABLE {SHADOW_SCHEMA}.{table} "
+                        f"ALTER COLUMN {column} SET DEFAULT "
+                        f"nextval('{SHADOW_SCHEMA}.{sequence}')"
+                    )
+
+    def fill_shadow(self, conn, key: str) -> int:
+        """
+        Build the shadow table for a data key from the live table and staging.
+
+        Live rows whose key is not in the staged data are carried over
+        unchanged; staged rows replace or add to them, keeping the original
+        created_at of replaced rows. This gives the same result as the
+        upsert merge, without touching the live table.
+
+        Returns:
+            Number of staged rows written
+        """
+        spec = CANONICAL_TABLES[key]
+        table = spec["table"]
+        staging = self.staging_table(key)
+        conflict = ", ".join(spec["conflict"])
+        columns = list(spec["columns"])
+        select_columns = list(columns)
+        if spec.get("geom"):
+            columns.append("geom")
+            select_columns.append(spec["geom"])
+        matches = " AND ".join(f"s.{c} = l.{c}" for c in spec["conflict"])
+        distinct = ", ".join(select_columns)
+
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                INSERT INTO {SHADOW_SCHEMA}.{table}
+                SELECT l.* FROM {CANONICAL_SCHEMA}.{table} l
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {staging} s WHERE {matches}
+                )
+            """
+            )
+            self._reset_sequences(conn, table)
+            cur.execute(
+                f"""
+                INSERT INTO {SHADOW_SCHEMA}.{table} (
+                    {", ".join(columns)}, created_at
+                )
+                SELECT s.*, COALESCE(l.created_at, NOW())
+                FROM (
+                    SELECT DISTINCT ON ({conflict}) {distinct}
+                    FROM {staging}
+                    ORDER BY {conflict}, staged_row DESC
+                ) s
+                LEFT JOIN {CANONICAL_SCHEMA}.{table} l USING ({conflict})
+            """
+            )
+            merged = cur.rowcount
+            cur.execute(f"TRUNCATE {staging}")
+        return merged
+
+    def carry_over_shadow(self, conn, table: str):
+        """Copy a table that is not being rebuilt into the shadow schema."""
+        with conn.cursor() as cur:
+            cur.execute(
+                f"INSERT INTO {SHADOW_SCHEMA}.{table} "
+                f"SELECT * FROM {CANONICAL_SCHEMA}.{table}"
+            )
+        self._reset_sequences(conn, table)
+
+    def build_shape_geoms(
+        self,
+        conn,
+        schema: str = CANONICAL_SCHEMA,
+        changed_only: bool = True,
+        vanished: bool = False,
+    ) -> int:
+        """
+        Aggregate shape points into one LINESTRINGM per shape_id.
+
+        Points are ordered by shape_pt_sequence and each carries as M the
+        cumulative distance in metres from the first point, so positions
+        along a route can be interpolated with ST_LocateAlong. Shapes with
+        fewer than two points are skipped.
+
+        Args:
+            schema: Schema holding transport_shapes and the geometry table
+            changed_only: Rebuild only shapes with points written in this
+                transaction (upserting them); otherwise build every shape
+                into an empty table, as for a shadow load
+            vanished: Also rebuild shapes with points deleted by a delta
+                load, dropping those left with fewer than two points
+
+        Returns:
+            Number of shape geometries written
+        """
+        where = ""
+        on_conflict = ""
+        if changed_only:
+            # Merged and inserted points get updated_at = NOW(), which is
+            # the transaction start time
+            changed = f"""
+                SELECT shape_id FROM {schema}.transport_shapes
+                WHERE updated_at = NOW()
+            """
+            if vanished:
+                changed += f"""
+                    UNION
+                    SELECT row_key->>'shape_id'
+                    FROM {self.vanished_table("shapes")}
+                """
+            where = f"WHERE shape_id IN ({changed})"
+            on_conflict = """
+                ON CONFLICT (shape_id) DO UPDATE SET
+                    geom = EXCLUDED.geom,
+                    length_m = EXCLUDED.length_m,
+                    point_count = EXCLUDED.point_count,
+                    updated_at = NOW()
+            """
+
+        start_time = time.perf_counter()
+        with conn.cursor() as cur:
+            if vanished:
+                cur.execute(
+                    f"""
+                    DELETE FROM {schema}.{SHAPE_GEOMS_TABLE}
+                    WHERE shape_id IN (
+                        SELECT row_key->>'shape_id'
+                        FROM {self.vanished_table("shapes")}
+                    )
+                """
+                )
+            cur.execute(
+                f"""
+                INSERT INTO {schema}.{SHAPE_GEOMS_TABLE} (
+                    shape_id, geom, length_m, point_count
+                )
+                SELECT
+                    shape_id,
+                    ST_SetSRID(
+                        ST_MakeLine(
+                            ST_MakePointM(lon, lat, measure)
+                            ORDER BY shape_pt_sequence
+                        ),
+                        4326
+                    ),
+                    MAX(measure),
+                    COUNT(*)
+                FROM (
+                    SELECT
+                        shape_id,
+                        shape_pt_sequence,
+                        lon,
+                        lat,
+                        SUM(step) OVER (
+                            PARTITION BY shape_id ORDER BY shape_pt_sequence
+                        ) AS measure
+                    FROM (
+                        SELECT
+                            shape_id,
+                            shape_pt_sequence,
+                            shape_pt_lon::DOUBLE PRECISION AS lon,
+                            shape_pt_lat::DOUBLE PRECISION AS lat,
+                            COALESCE(
+                                ST_DistanceSphere(
+                                    ST_MakePoint(shape_pt_lon, shape_pt_lat),
+                                    LAG(
+                                        ST_MakePoint(
+                                            shape_pt_lon, shape_pt_lat
+                                        )
+                                    ) OVER (
+                                        PARTITION BY shape_id
+                                        ORDER BY shape_pt_sequence
+                                    )
+                                ),
+                                0
+                            ) AS step
+                        FROM {schema}.transport_shapes
+                        {where}
+                    ) steps
+                ) points
+                GROUP BY shape_id
+                HAVING COUNT(*) >= 2
+                {on_conflict}
+            """
+            )
+            built = cur.rowcount
+
+        self.logger.info(
+            f"Built {built} shape geometries in {schema}.{SHAPE_GEOMS_TABLE} "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+        return built
+
+    def table_definitions(
+        self, conn, tables: List[str]
+    ) -> Dict[str, List[tuple]]:
+        """
+        Read the constraint, index and trigger definitions of live tables.
+
+        Definitions are fully qualified, whatever the caller's search_path.
+
+        Returns:
+            Dictionary with "constraints" as (table, name, definition,
+            contype) with keys before foreign keys, "indexes" as (table,
+            name, definition) for indexes not backing a constraint, and
+            "triggers" as (table, name, definition) for user triggers
+        """
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL search_path TO pg_catalog")
+            cur.execute(
+                """
+                SELECT c.relname, con.conname, pg_get_constraintdef(con.oid),
+                       con.contype
+                FROM pg_constraint con
+                JOIN pg_class c ON c.oid = con.conrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = ANY(%s)
+                  AND con.contype IN ('p', 'u', 'c', 'x', 'f')
+                ORDER BY con.contype = 'f', c.relname, con.conname
+            """,
+                (CANONICAL_SCHEMA, tables),
+            )
+            constraints = cur.fetchall()
+            cur.execute(
+                """
+                SELECT c.relname, ic.relname, pg_get_indexdef(i.indexrelid)
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indrelid
+                JOIN pg_class ic ON ic.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = ANY(%s)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_constraint con
+                      WHERE con.conindid = i.indexrelid
+                  )
+            """,
+                (CANONICAL_SCHEMA, tables),
+            )
+            indexes = cur.fetchall()
+            cur.execute(
+                """
+                SELECT c.relname, t.tgname, pg_get_triggerdef(t.oid)
+                FROM pg_trigger t
+                JOIN pg_class c ON c.oid = t.tgrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = ANY(%s)
+                  AND NOT t.tgisinternal
+            """,
+                (CANONICAL_SCHEMA, tables),
+            )
+            triggers = cur.fetchall()
+            cur.execute("RESET search_path")
+        return {
+            "constraints": constraints,
+            "indexes": indexes,
+            "triggers": triggers,
+        }
+
+    def build_shadow(self, conn, maintenance_workers: int = 0):
+        """
+        Recreate the constraints, indexes and triggers of the live tables on
+        the filled shadow tables, then ANALYZE them.
+
+        Definitions are read from the catalog of the live tables, so the
+        shadow copy always matches the deployed schema.
+
+        Args:
+            maintenance_workers: Parallel workers PostgreSQL may use for
+                each index build (0 leaves the server setting alone)
+        """
+        tables = SWAPPED_TABLES
+        definitions = self.table_definitions(conn, tables)
+        with conn.cursor() as cur:
+            self._set_maintenance_workers(cur, maintenance_workers)
+            # Unique and primary keys first so that foreign keys can use them
+            for table, name, definition, _ in definitions["constraints"]:
+                cur.execute(
+                    f"ALTER TABLE {SHADOW_SCHEMA}.{table} "
+                    f"ADD CONSTRAINT {name} "
+                    f"{_retarget(definition, SHADOW_SCHEMA)}"
+                )
+            for _, _, definition in (
+                definitions["indexes"] + definitions["triggers"]
+            ):
+                cur.execute(_retarget(definition, SHADOW_SCHEMA))
+        self.analyze_tables(conn, SHADOW_SCHEMA, tables)
+
+        self.logger.info(
+            f"Built {len(definitions['constraints'])} constraints, "
+            f"{len(definitions['indexes'])} indexes and "
+            f"{len(definitions['triggers'])} triggers on {SHADOW_SCHEMA}"
+        )
+
+    def suspend_maintenance(
+        self, conn, keys: Iterable[str]
+    ) -> Dict[str, List]:
+        """
+        Suspend per-row index, trigger and FK work on tables about to load.
+
+        Secondary indexes and outgoing foreign keys are dropped and user
+        triggers disabled. Primary and unique keys stay, as the merge upserts
+        on them. The updated_at trigger is not needed during the load since
+        the merge sets updated_at itself.
+
+        Returns:
+            The suspended definitions, to pass to restore_maintenance()
+        """
+        tables = [CANONICAL_TABLES[key]["table"] for key in keys]
+        definitions = self.table_definitions(conn, tables)
+        suspended = {
+            "tables": tables,
+            "indexes": definitions["indexes"],
+            "foreign_keys": [
+                (table, name, definition)
+                for table, name, definition, contype in (
+                    definitions["constraints"]
+                )
+                if contype == "f"
+            ],
+        }
+        with conn.cursor() as cur:
+            for table, name, _ in suspended["foreign_keys"]:
+                cur.execute(
+                    f"ALTER TABLE {CANONICAL_SCHEMA}.{table} "
+                    f"DROP CONSTRAINT {name}"
+                )
+            for _, name, _ in suspended["indexes"]:
+                cur.execute(f"DROP INDEX {CANONICAL_SCHEMA}.{name}")
+            for table in tables:
+                cur.execute(
+                    f"ALTER TABLE {CANONICAL_SCHEMA}.{table} "
+                    "DISABLE TRIGGER USER"
+                )
+
+        self.logger.info(
+            f"Suspended {len(suspended['indexes'])} indexes, "
+            f"{len(suspended['foreign_keys'])} foreign keys and triggers "
+            f"on {len(tables)} tables"
+        )
+        return suspended
+
+    def restore_maintenance(
+        self,
+        conn,
+        suspended: Dict[str, List],
+        maintenance_workers: int = 0,
+    ):
+        """
+        Rebuild what suspend_maintenance() removed, then ANALYZE once.
+
+        Indexes are rebuilt in bulk, using parallel index builds where the
+        server allows them. Foreign keys are added NOT VALID and validated
+        afterwards, so each is checked by one set-based scan instead of per
+        row.
+
+        Args:
+            maintenance_workers: Parallel workers PostgreSQL may use for
+                each index build (0 leaves the server setting alone)
+        """
+        tables = suspended["tables"]
+        start_time = time.perf_counter()
+        with conn.cursor() as cur:
+            self._set_maintenance_workers(cur, maintenance_workers)
+            for _, _, definition in suspended["indexes"]:
+                cur.execute(definition)
+            for table, name, definition in suspended["foreign_keys"]:
+                cur.execute(
+                    f"ALTER TABLE {CANONICAL_SCHEMA}.{table} "
+                    f"ADD CONSTRAINT {name} {definition} NOT VALID"
+                )
+            for table, name, _ in suspended["foreign_keys"]:
+                cur.execute(
+                    f"ALTER TABLE {CANONICAL_SCHEMA}.{table} "
+                    f"VALIDATE CONSTRAINT {name}"
+                )
+            for table in tables:
+                cur.execute(
+                    f"ALTER TABLE {CANONICAL_SCHEMA}.{table} "
+                    "ENABLE TRIGGER USER"
+                )
+        self.analyze_tables(conn, CANONICAL_SCHEMA, tables)
+
+        self.logger.info(
+            f"Rebuilt {len(suspended['indexes'])} indexes and "
+            f"{len(suspended['foreign_keys'])} foreign keys in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
+
+    def analyze_tables(self, conn, schema: str, tables: List[str]):
+        """Refresh planner statistics for all tables in one ANALYZE."""
+        if not tables:
+            return
+        with conn.cursor() as cur:
+            qualified = [f"{schema}.{table}" for table in tables]
+            cur.execute(f"ANALYZE {', '.join(qualified)}")
+
+    def _set_maintenance_workers(self, cur, workers: int):
+        """Allow parallel index builds for the rest of the transaction."""
+        if workers > 0:
+            cur.execute(
+                f"SET LOCAL max_parallel_maintenance_workers = {int(workers)}"
+            )
+
+    def swap_shadow(self, conn, lock_timeout: str = "5s"):
+        """
+        Swap the shadow tables in for the live canonical tables.
+
+        Only catalog changes happen here, so the exclusive locks are held for
+        milliseconds. The replaced tables are moved to the previous schema
+        for rollback, and views over the canonical tables are recreated so
+        that they read the new tables.
+        """
+        with conn.cursor() as cur:
+            cur.execute(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+            views = self._canonical_views(conn)
+            cur.execute(f"DROP SCHEMA IF EXISTS {PREVIOUS_SCHEMA} CASCADE")
+            cur.execute(f"CREATE SCHEMA {PREVIOUS_SCHEMA}")
+            self._move_tables(cur, CANONICAL_SCHEMA, PREVIOUS_SCHEMA)
+            self._move_tables(cur, SHADOW_SCHEMA, CANONICAL_SCHEMA)
+            self._replace_views(cur, views)
+            cur.execute(f"DROP SCHEMA {SHADOW_SCHEMA}")
+
+        self.logger.info(
+            f"Swapped {SHADOW_SCHEMA} into {CANONICAL_SCHEMA}; "
+            f"previous tables kept in {PREVIOUS_SCHEMA}"
+        )
+
+    def restore_previous(self, conn, lock_timeout: str = "5s"):
+        """
+        Roll back the last swap by exchanging the live and previous tables.
+
+        The recorded file and row hashes describe the data being rolled
+        back, so they are cleared and the next run reloads every file.
+        Waits for a shadow load in progress (see shadow_lock()).
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))", (SHADOW_SCHEMA,)
+            )
+            cur.execute(
+                "SELECT 1 FROM pg_namespace WHERE nspname = %s",
+                (PREVIOUS_SCHEMA,),
+            )
+            if not cur.fetchall():
+                raise ProcessorError(
+                    f"No previous version in {PREVIOUS_SCHEMA} to restore",
+                    "GTFS",
+                )
+
+            cur.execute(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+            views = self._canonical_views(conn)
+            cur.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+            cur.execute(f"CREATE SCHEMA {SHADOW_SCHEMA}")
+            self._move_tables(cur, CANONICAL_SCHEMA, SHADOW_SCHEMA)
+            self._move_tables(cur, PREVIOUS_SCHEMA, CANONICAL_SCHEMA)
+            self._move_tables(cur, SHADOW_SCHEMA, PREVIOUS_SCHEMA)
+            self._replace_views(cur, views)
+            cur.execute(f"DROP SCHEMA {SHADOW_SCHEMA}")
+            cur.execute("DELETE FROM canonical.feed_file_hashes")
+            cur.execute("DELETE FROM canonical.feed_row_hashes")
+
+        self.logger.info(
+            f"Restored {CANONICAL_SCHEMA} from {PREVIOUS_SCHEMA}"
+        )
+
+    def _move_tables(self, cur, source: str, target: str):
+        """Move every swapped table (and its sequences) between schemas."""
+        for table in SWAPPED_TABLES:
+            cur.execute(f"ALTER TABLE {source}.{table} SET SCHEMA {target}")
+
+    def _canonical_views(self, conn) -> List[tuple]:
+        """Return (name, fully qualified definition) of canonical views."""
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL search_path TO pg_catalog")
+            cur.execute(
+                """
+                SELECT viewname, definition FROM pg_views
+                WHERE schemaname = %s
+            """,
+                (CANONICAL_SCHEMA,),
+            )
+            views = cur.fetchall()
+            cur.execute("RESET search_path")
+        return views
+
+    def _replace_views(self, cur, views: List[tuple]):
+        """Recreate views so that they bind to the tables now live."""
+        for name, definition in views:
+            cur.execute(
+                f"CREATE OR REPLACE VIEW {CANONICAL_SCHEMA}.{name} AS "
+                f"{definition}"
+            )
+
+    def _serial_columns(self, conn, table: str) -> List[tuple]:
+        """Return (column, sequence name) for serial columns of a table."""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT a.attname, s.relname
+                FROM pg_depend d
+                JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+                JOIN pg_attribute a
+                  ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+                WHERE d.refobjid = %s::regclass AND d.deptype = 'a'
+            """,
+                (f"{CANONICAL_SCHEMA}.{table}",),
+            )
+            return cur.fetchall()
+
+    def _reset_sequences(self, conn, table: str):
+        """Advance shadow sequences past the rows already in the table."""
+        with conn.cursor() as cur:
+            for column, sequence in self._serial_columns(conn, table):
+                cur.execute(
+                    f"""
+                    SELECT setval(
+                        '{SHADOW_SCHEMA}.{sequence}',
+                        COALESCE(MAX({column}), 0) + 1,
+                        false
+                    ) FROM {SHADOW_SCHEMA}.{table}
+                """
+                )
+
+
+def _feed_frames(data: Any) -> Any:
+    """Replace a raw extract result by the DataFrames of its feed."""
+    if isinstance(data, dict) and isinstance(data.get("feed"), gk.Feed):
+        return {
+            name: frame
+            for name, frame in vars(data["feed"]).items()
+            if isinstance(frame, pd.DataFrame)
+        }
+    return data
+
 
 class GTFSProcessor(ProcessorInterface):
     """
@@ -262,10 +1693,53 @@ class GTFSProcessor(ProcessorInterface):
     Processes GTFS data and loads it into the canonical database schema.
     """
 
+    # Per-feed options accepted by process(), with their defaults.
+    # load_mode: "bulk" streams each table through COPY into an UNLOGGED
+    #            staging table and merges it with one upsert per table;
+    #            "row" uses the row-at-a-time INSERT ... ON CONFLICT writers;
+    #            "shadow" builds a complete copy of the canonical tables in
+    #            the canonical_shadow schema (COPY, then indexes and
+    #            constraints) and swaps it in with one short transaction,
+    #            keeping the replaced tables in canonical_previous;
+    #            "delta" COPYs like bulk but compares each row's hash with
+    #            the one stored when the feed was last loaded, inserting
+    #            new rows, updating changed ones and deleting rows that
+    #            vanished from the feed, so unchanged rows are not written.
+    # extract_mode: "feed" reads the whole feed with gtfs_kit; "stream"
+    #               reads each member of the archive as chunked CSV and
+    #               passes fixed-size batches through transform and load,
+    #               so peak memory is bounded by the batch size.
+    # copy_batch_size: rows per COPY chunk, and per batch in stream mode.
+    # force: reload every file even if its content hash is unchanged since
+    #        the last successful load of the feed; in delta mode, also
+    #        compare rows whose hash is unchanged with the live table.
+    # load_workers: in bulk, delta and shadow mode, number of pooled
+    #               connections COPYing independent tables at the same time;
+    #               merges still run in FK order in the single load
+    #               transaction.
+    #               Also used as the parallel workers per index build.
+    # suspend_maintenance: in bulk mode, drop secondary indexes and FKs and
+    #                      disable triggers on the loaded tables for the
+    #                      load, then rebuild them and ANALYZE once. Takes
+    #                      exclusive locks on those tables until commit.
+    DEFAULT_OPTIONS: Dict[str, Any] = {
+        "load_mode": LOAD_MODE_BULK,
+        "extract_mode": EXTRACT_MODE_FEED,
+        "copy_batch_size": 50000,
+        "force": False,
+        "load_workers": 1,
+        "suspend_maintenance": False,
+    }
+
     def __init__(self, db_config: Dict[str, Any]):
         super().__init__(db_config)
         self.writer = GTFSDatabaseWriter(db_config)
         self.temp_files: List[Path] = []
+        self.options: Dict[str, Any] = dict(self.DEFAULT_OPTIONS)
+        self.load_stats: Dict[str, Dict[str, Any]] = {}
+        self.feed_name: Optional[str] = None
+        self.file_hashes: Dict[str, str] = {}
+        self.load_keys: List[str] = list(LOAD_ORDER)
 
     @property
     def processor_name(self) -> str:
@@ -275,6 +1749,68 @@ class GTFSProcessor(ProcessorInterface):
     def supported_formats(self) -> List[str]:
         return [".zip", ".txt"]
 
+    def process(
+        self, source_path: Path, source_info: Dict[str, Any], **kwargs
+    ) -> bool:
+        """
+        Execute the ETL pipeline, applying per-feed GTFS options for this run.
+
+        Keyword arguments named in DEFAULT_OPTIONS configure this processor;
+        any others are passed through to the extract phase. The feed name in
+        source_info keys the per-file content hashes used to skip unchanged
+        files. Unless checkpointed, feeds extracted in stream mode run
+        through process_stream(), so that each phase counts its batches as
+        they pass instead of seeing one lazy iterator.
+        """
+        self._apply_options(source_info, kwargs)
+        if (
+            self.options["extract_mode"] == EXTRACT_MODE_STREAM
+            and kwargs.get("checkpoints") is None
+        ):
+            kwargs.pop("checkpoints", None)
+            return self.process_stream(source_path, source_info, **kwargs)
+        return super().process(source_path, source_info, **kwargs)
+
+    def load_feed_tables(
+        self,
+        transformed_data: Dict[str, Any],
+        source_info: Dict[str, Any],
+        **kwargs,
+    ) -> bool:
+        """
+        Load canonical tables transformed from a feed parsed elsewhere.
+
+        Lets a consumer that has already read the archive, such as the GTFS
+        daemon writing the OpenJourney schema, fan the same in-memory tables
+        out to the canonical schema without a second extract. Options are
+        applied as in process(). Per-file content hashes are not recorded:
+        the caller has already decided that the feed changed.
+
+        Args:
+            transformed_data: Data keys mapped to canonical DataFrames, as
+                returned by transform_feed()
+            source_info: Information about the data source
+            **kwargs: Options named in DEFAULT_OPTIONS
+
+        Returns:
+            True if load was successful, False otherwise
+        """
+        self._apply_options(source_info, kwargs)
+        self.file_hashes = {}
+        self.load_keys = [key for key in LOAD_ORDER if key in transformed_data]
+        return self.load(transformed_data)
+
+    def _apply_options(
+        self, source_info: Dict[str, Any], kwargs: Dict[str, Any]
+    ):
+        """Take this run's options out of kwargs, defaulting the rest."""
+        self.feed_name = source_info.get("name")
+        self.writer.feed_name = self.feed_name
+        self.options = dict(self.DEFAULT_OPTIONS)
+        for option in self.DEFAULT_OPTIONS:
+            if option in kwargs:
+                self.options[option] = kwargs.pop(option)
+
     def validate_source(self, source_path: Path) -> bool:
         """
         Validate that the source is a valid GTFS feed.
@@ -324,7 +1860,10 @@ class GTFSProcessor(ProcessorInterface):
             **kwargs: Additional parameters (e.g., url for downloading)
 
         Returns:
-            Dictionary containing extracted GTFS feed data
+            Dictionary containing extracted GTFS feed data, or in stream
+            mode a lazy iterator of raw table batches under "batches".
+            Files whose content is unchanged since the last load of the
+            feed are not extracted at all.
         """
         try:
             # Handle URL download if provided
@@ -332,19 +1871,39 @@ class GTFSProcessor(ProcessorInterface):
                 source_path = self._download_from_url(kwargs["url"])
                 self.temp_files.append(source_path)
 
-            # Extract GTFS feed using gtfs_kit
-            if source_path.suffix.lower() == ".zip":
-                # Extract zip to temporary directory
-                temp_dir = Path(tempfile.mkdtemp())
-                self.temp_files.append(temp_dir)
+            source_path = Path(source_path)
+            keys = self._changed_tables(source_path)
+            self.load_keys = keys
+            if not keys:
+                return {"feed": None, "source_path": source_path}
 
-                with zipfile.ZipFile(source_path, "r") as zip_file:
-                    zip_file.extractall(temp_dir)
+            if self.options["extract_mode"] == EXTRACT_MODE_STREAM:
+                batches = stream_gtfs_tables(
+                    source_path, self.options["copy_batch_size"], keys
+                )
+                return {"batches": batches, "source_path": source_path}
+
+            # Gather only the files being loaded into a temporary
+            # directory and read them with gtfs_kit
+            temp_dir = Path(tempfile.mkdtemp())
+            self.temp_files.append(temp_dir)
 
-                feed = gk.read_feed(temp_dir, dist_units="km")
+            if source_path.is_dir():
+                for key in keys:
+                    file_name = _member_file(key)
+                    (temp_dir / file_name).symlink_to(
+                        source_path.resolve() / file_name
+                    )
             else:
-                feed = gk.read_feed(source_path, dist_units="km")
+                with zipfile.ZipFile(source_path, "r") as zip_file:
+                    members = _zip_members(zip_file)
+                    for key in keys:
+                        file_name = _member_file(key)
+                        with zip_file.open(members[file_name]) as src:
+                            with open(temp_dir / file_name, "wb") as dst:
+                                shutil.copyfileobj(src, dst)
 
+            feed = gk.read_feed(temp_dir, dist_units="km")
             return {"feed": feed, "source_path": source_path}
 
         except Exception as e:
@@ -354,6 +1913,50 @@ class GTFSProcessor(ProcessorInterface):
                 e,
             )
 
+    def _changed_tables(self, source_path: Path) -> List[str]:
+        """
+        Select the tables whose source file changed since the last load.
+
+        Every loadable member is hashed; when the run has a feed name and is
+        not forced, members whose hash matches the one recorded for the feed
+        are skipped. The hashes of the selected members are kept in
+        ``file_hashes`` and recorded by load() in the load transaction.
+
+        Returns:
+            Data keys to extract, transform and load, in LOAD_ORDER
+        """
+        hashes = hash_gtfs_members(source_path)
+        keys = [key for key in LOAD_ORDER if _member_file(key) in hashes]
+        self.file_hashes = {}
+        if not self.feed_name:
+            return keys
+
+        stored = {}
+        if not self.options["force"]:
+            try:
+                with self.writer.get_connection() as conn:
+                    stored = self.writer.get_file_hashes(conn, self.feed_name)
+            except psycopg2.Error as e:
+                self.logger.warning(
+                    f"Could not read file hashes for {self.feed_name}, "
+                    f"loading all files: {str(e)}"
+                )
+
+        changed = []
+        for key in keys:
+            file_name = _member_file(key)
+            if stored.get(file_name) == hashes[file_name]:
+                self.logger.info(
+                    f"Skipping unchanged {file_name} for {self.feed_name}"
+                )
+                continue
+            changed.append(key)
+            self.file_hashes[file_name] = hashes[file_name]
+
+        if not changed:
+            self.logger.info(f"No files changed for {self.feed_name}")
+        return changed
+
     def transform(
         self, raw_data: Dict[str, Any], source_info: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -365,179 +1968,23 @@ class GTFSProcessor(ProcessorInterface):
             source_info: Information about the data source
 
         Returns:
-            Dictionary containing transformed data for canonical schema
+            Dictionary mapping each data key (see CANONICAL_TABLES) to a
+            DataFrame of typed canonical columns, or in stream mode a lazy
+            iterator of (key, DataFrame) batches under "batches"
         """
         try:
-            feed = raw_data["feed"]
-            transformed_data = {}
-
-            # Transform agencies
-            if hasattr(feed, "agency") and feed.agency is not None:
-                agencies = []
-                for _, agency in feed.agency.iterrows():
-                    agencies.append({
-                        "agency_id": agency.get("agency_id", ""),
-                        "agency_name": agency.get("agency_name", ""),
-                        "agency_url": agency.get("agency_url", ""),
-                        "agency_timezone": agency.get("agency_timezone", ""),
-                        "agency_lang": agency.get("agency_lang"),
-                        "agency_phone": agency.get("agency_phone"),
-                        "agency_fare_url": agency.get("agency_fare_url"),
-                        "agency_email": agency.get("agency_email"),
-                    })
-                transformed_data["agencies"] = agencies
-
-            # Transform routes
-            if hasattr(feed, "routes") and feed.routes is not None:
-                routes = []
-                for _, route in feed.routes.iterrows():
-                    routes.append({
-                        "route_id": route.get("route_id"),
-                        "agency_id": route.get("agency_id", ""),
-                        "route_short_name": route.get("route_short_name"),
-                        "route_long_name": route.get("route_long_name"),
-                        "route_description": route.get("route_desc"),
-                        "route_type": int(route.get("route_type", 0)),
-                        "route_url": route.get("route_url"),
-                        "route_color": route.get("route_color", "FFFFFF"),
-                        "route_text_color": route.get(
-                            "route_text_color", "000000"
-                        ),
-                        "route_sort_order": route.get("route_sort_order"),
-                        "continuous_pickup": route.get(
-                            "continuous_pickup", 1
-                        ),
-                        "continuous_drop_off": route.get(
-                            "continuous_drop_off", 1
-                        ),
-                    })
-                transformed_data["routes"] = routes
-
-            # Transform stops
-            if hasattr(feed, "stops") and feed.stops is not None:
-                stops = []
-                for _, stop in feed.stops.iterrows():
-                    stops.append({
-                        "stop_id": stop.get("stop_id"),
-                        "stop_name": stop.get("stop_name", ""),
-                        "stop_description": stop.get("stop_desc"),
-                        "stop_lat": float(stop.get("stop_lat", 0)),
-                        "stop_lon": float(stop.get("stop_lon", 0)),
-                        "zone_id": stop.get("zone_id"),
-                        "stop_url": stop.get("stop_url"),
-                        "location_type": int(stop.get("location_type", 0)),
-                        "parent_station": stop.get("parent_station"),
-                        "stop_timezone": stop.get("stop_timezone"),
-                        "wheelchair_boarding": int(
-                            stop.get("wheelchair_boarding", 0)
-                        ),
-                        "level_id": stop.get("level_id"),
-                        "platform_code": stop.get("platform_code"),
-                    })
-                transformed_data["stops"] = stops
-
-            # Transform trips
-            if hasattr(feed, "trips") and feed.trips is not None:
-                trips = []
-                for _, trip in feed.trips.iterrows():
-                    trips.append({
-                        "trip_id": trip.get("trip_id"),
-                        "route_id": trip.get("route_id"),
-                        "service_id": trip.get("service_id"),
-                        "trip_headsign": trip.get("trip_headsign"),
-                        "trip_short_name": trip.get("trip_short_name"),
-                        "direction_id": trip.get("direction_id"),
-                        "block_id": trip.get("block_id"),
-                        "shape_id": trip.get("shape_id"),
-                        "wheelchair_accessible": int(
-                            trip.get("wheelchair_accessible", 0)
-                        ),
-                        "bikes_allowed": int(trip.get("bikes_allowed", 0)),
-                    })
-                transformed_data["trips"] = trips
-
-            # Transform stop_times to schedule
-            if hasattr(feed, "stop_times") and feed.stop_times is not None:
-                schedule = []
-                for _, stop_time in feed.stop_times.iterrows():
-                    schedule.append({
-                        "trip_id": stop_time.get("trip_id"),
-                        "arrival_time": stop_time.get("arrival_time"),
-                        "departure_time": stop_time.get("departure_time"),
-                        "stop_id": stop_time.get("stop_id"),
-                        "stop_sequence": int(
-                            stop_time.get("stop_sequence", 0)
-                        ),
-                        "stop_headsign": stop_time.get("stop_headsign"),
-                        "pickup_type": int(stop_time.get("pickup_type", 0)),
-                        "drop_off_type": int(
-                            stop_time.get("drop_off_type", 0)
-                        ),
-                        "continuous_pickup": stop_time.get(
-                            "continuous_pickup"
-                        ),
-                        "continuous_drop_off": stop_time.get(
-                            "continuous_drop_off"
-                        ),
-                        "shape_dist_traveled": stop_time.get(
-                            "shape_dist_traveled"
-                        ),
-                        "timepoint": int(stop_time.get("timepoint", 1)),
-                    })
-                transformed_data["schedule"] = schedule
-
-            # Transform shapes
-            if hasattr(feed, "shapes") and feed.shapes is not None:
-                shapes = []
-                for _, shape in feed.shapes.iterrows():
-                    shapes.append({
-                        "shape_id": shape.get("shape_id"),
-                        "shape_pt_lat": float(shape.get("shape_pt_lat", 0)),
-                        "shape_pt_lon": float(shape.get("shape_pt_lon", 0)),
-                        "shape_pt_sequence": int(
-                            shape.get("shape_pt_sequence", 0)
-                        ),
-                        "shape_dist_traveled": shape.get(
-                            "shape_dist_traveled"
-                        ),
-                    })
-                transformed_data["shapes"] = shapes
-
-            # Transform calendar
-            if hasattr(feed, "calendar") and feed.calendar is not None:
-                calendar = []
-                for _, cal in feed.calendar.iterrows():
-                    calendar.append({
-                        "service_id": cal.get("service_id"),
-                        "monday": bool(cal.get("monday", 0)),
-                        "tuesday": bool(cal.get("tuesday", 0)),
-                        "wednesday": bool(cal.get("wednesday", 0)),
-                        "thursday": bool(cal.get("thursday", 0)),
-                        "friday": bool(cal.get("friday", 0)),
-                        "saturday": bool(cal.get("saturday", 0)),
-                        "sunday": bool(cal.get("sunday", 0)),
-                        "start_date": cal.get("start_date"),
-                        "end_date": cal.get("end_date"),
-                    })
-                transformed_data["calendar"] = calendar
-
-            # Transform calendar_dates
-            if (
-                hasattr(feed, "calendar_dates")
-                and feed.calendar_dates is not None
-            ):
-                calendar_dates = []
-                for _, cal_date in feed.calendar_dates.iterrows():
-                    calendar_dates.append({
-                        "service_id": cal_date.get("service_id"),
-                        "date": cal_date.get("date"),
-                        "exception_type": int(
-                            cal_date.get("exception_type", 1)
-                        ),
-                    })
-                transformed_data["calendar_dates"] = calendar_dates
+            if "batches" in raw_data:
+                return {
+                    "batches": (
+                        (key, transform_table(key, batch))
+                        for key, batch in raw_data["batches"]
+                    )
+                }
 
-            return transformed_data
+            feed = raw_data["feed"]
+            if feed is None:
+                return {}
+            return transform_feed(feed)
 
         except Exception as e:
             raise ProcessorError(
@@ -557,65 +2004,79 @@ class GTFSProcessor(ProcessorInterface):
             True if load was successful, False otherwise
         """
         try:
+            self.load_stats = {}
+            if not transformed_data:
+                self.logger.info("Nothing to load")
+                return True
+
+            shadow = self.options["load_mode"] == LOAD_MODE_SHADOW
+            delta = self.options["load_mode"] == LOAD_MODE_DELTA
+            suspend = self.options["suspend_maintenance"] and (
+                self.options["load_mode"] == LOAD_MODE_BULK
+            )
+            if delta and not self.feed_name:
+                raise ProcessorError(
+                    "Delta loads need a feed name to own the row hashes",
+                    self.processor_name,
+                )
             with self.writer.get_connection() as conn:
-                # Load data in dependency order
-                if "agencies" in transformed_data:
-                    self.writer.write_agencies(
-                        conn, transformed_data["agencies"]
-                    )
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['agencies'])} agencies"
-                    )
+                lock = (
+                    self.writer.shadow_lock(conn) if shadow else nullcontext()
+                )
+                with lock:
+                    if shadow:
+                        self.writer.create_shadow(conn)
+                    if suspend:
+                        keys = self._tables_to_load(transformed_data)
+                        # Staging tables must exist before the canonical
+                        # tables are locked, or parallel workers would wait
+                        # on the lock
+                        for key in keys:
+                            self.writer.prepare_staging(conn, key)
+                        conn.commit()
+                        suspended = self.writer.suspend_maintenance(
+                            conn, keys
+                        )
 
-                if "routes" in transformed_data:
-                    self.writer.write_routes(conn, transformed_data["routes"])
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['routes'])} routes"
-                    )
+                    if "batches" in transformed_data:
+                        self._load_stream(conn, transformed_data["batches"])
+                    elif self.options["load_mode"] == LOAD_MODE_ROW:
+                        self._load_rows(conn, transformed_data)
+                    elif self.options["load_workers"] > 1:
+                        self._load_parallel(conn, transformed_data)
+                    else:
+                        self._load_bulk(conn, transformed_data)
 
-                if "stops" in transformed_data:
-                    self.writer.write_stops(conn, transformed_data["stops"])
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['stops'])} stops"
-                    )
+                    if delta:
+                        self._delete_vanished(conn)
 
-                if "calendar" in transformed_data:
-                    self.writer.write_calendar(
-                        conn, transformed_data["calendar"]
-                    )
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['calendar'])} calendar entries"
-                    )
+                    if "shapes" in self.load_stats:
+                        self.writer.build_shape_geoms(
+                            conn,
+                            SHADOW_SCHEMA if shadow else CANONICAL_SCHEMA,
+                            changed_only=not shadow,
+                            vanished=delta,
+                        )
 
-                if "calendar_dates" in transformed_data:
-                    self.writer.write_calendar_dates(
-                        conn, transformed_data["calendar_dates"]
-                    )
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['calendar_dates'])} calendar date exceptions"
-                    )
-
-                if "shapes" in transformed_data:
-                    self.writer.write_shapes(conn, transformed_data["shapes"])
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['shapes'])} shape points"
-                    )
-
-                if "trips" in transformed_data:
-                    self.writer.write_trips(conn, transformed_data["trips"])
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['trips'])} trips"
-                    )
+                    if shadow:
+                        self._swap_shadow(conn)
+                    if suspend:
+                        self.writer.restore_maintenance(
+                            conn, suspended, self._maintenance_workers()
+                        )
 
-                if "schedule" in transformed_data:
-                    self.writer.write_schedule(
-                        conn, transformed_data["schedule"]
-                    )
-                    self.logger.info(
-                        f"Loaded {len(transformed_data['schedule'])} schedule entries"
-                    )
+                    if self.feed_name and self.file_hashes:
+                        self.writer.record_file_hashes(
+                            conn,
+                            self.feed_name,
+                            self.file_hashes,
+                            {
+                                _member_file(key): stats["rows"]
+                                for key, stats in self.load_stats.items()
+                            },
+                        )
 
-                conn.commit()
+                    conn.commit()
                 return True
 
         except Exception as e:
@@ -626,6 +2087,316 @@ class GTFSProcessor(ProcessorInterface):
             self.cleanup(self.temp_files)
             self.temp_files.clear()
 
+    def extract_batches(self, source_path: Path, **kwargs) -> Iterable:
+        """
+        Extract the feed as batches for the streaming contract.
+
+        In stream mode these are the raw (key, DataFrame) batches of each
+        table; otherwise the whole extract() result is one ALL_TABLES batch.
+        """
+        raw_data = self.extract(source_path, **kwargs)
+        if "batches" in raw_data:
+            yield from raw_data["batches"]
+        else:
+            yield ALL_TABLES, raw_data
+
+    def transform_batch(
+        self, table: str, records: Any, source_info: Dict[str, Any]
+    ) -> Iterable:
+        """Transform one batch from extract_batches()."""
+        if table == ALL_TABLES:
+            yield table, self.transform(records, source_info)
+        else:
+            yield table, transform_table(table, records)
+
+    def load_batches(self, batches: Iterable) -> bool:
+        """
+        Load the batches from transform_batch() in one load transaction.
+        """
+        batches = iter(batches)
+        first = next(batches, None)
+        if first is None:
+            return self.load({})
+        if first[0] == ALL_TABLES:
+            return self.load(first[1])
+        return self.load({"batches": chain([first], batches)})
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """Keep the tables and file hashes selected by extract."""
+        return {
+            "load_keys": list(self.load_keys),
+            "file_hashes": dict(self.file_hashes),
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.load_keys = list(state.get("load_keys", LOAD_ORDER))
+        self.file_hashes = dict(state.get("file_hashes", {}))
+
+    def count_records(self, data: Any) -> int:
+        """Count a raw feed by the rows of its tables."""
+        return super().count_records(_feed_frames(data))
+
+    def count_bytes(self, data: Any) -> int:
+        """Estimate a raw feed by the memory of its tables."""
+        return super().count_bytes(_feed_frames(data))
+
+    def _load_bulk(self, conn, transformed_data: Dict[str, Any]):
+        """Load every table through COPY into staging plus one merge."""
+        for key in LOAD_ORDER:
+            if key not in transformed_data:
+                continue
+            start_time = time.perf_counter()
+            self.writer.prepare_staging(conn, key)
+            rows = self.writer.copy_to_staging(
+                conn,
+                key,
+                transformed_data[key],
+                self.options["copy_batch_size"],
+            )
+            self._merge_staged(conn, key, rows, start_time)
+
+    def _merge_staged(self, conn, key: str, rows: int, start_time: float):
+        """
+        Merge a staged table as the load mode requires and record its
+        load statistics, timed from ``start_time``.
+        """
+        counts = {}
+        if self.options["load_mode"] == LOAD_MODE_SHADOW:
+            merged = self.writer.fill_shadow(conn, key)
+        elif self.options["load_mode"] == LOAD_MODE_DELTA:
+            counts = self.writer.merge_delta(
+                conn, key, self.feed_name, self.options["force"]
+            )
+            merged = counts["inserted"] + counts["updated"]
+        else:
+            merged = self.writer.merge_from_staging(conn, key)
+        self.load_stats[key] = self.writer.load_summary(
+            "COPY", key, rows, merged, time.perf_counter() - start_time
+        )
+        self.load_stats[key].update(counts)
+
+    def _delete_vanished(self, conn):
+        """
+        Delete the rows that vanished from the feed in a delta load, in
+        reverse LOAD_ORDER, and log what each table's delta was.
+        """
+        for key in reversed(LOAD_ORDER):
+            if key not in self.load_stats:
+                continue
+            stats = self.load_stats[key]
+            stats["deleted"] = self.writer.delete_vanished(conn, key)
+            self.logger.info(
+                f"Delta for canonical.{CANONICAL_TABLES[key]['table']}: "
+                f"{stats['inserted']} inserted, {stats['updated']} updated, "
+                f"{stats['deleted']} deleted"
+            )
+
+    def _load_parallel(self, conn, transformed_data: Dict[str, Any]):
+        """
+        COPY tables concurrently, then merge them in dependency order.
+
+        Each table is COPYed into its staging table by a worker on its own
+        pooled connection, which commits the (UNLOGGED, never read by other
+        sessions) staging data. Tables are merged on ``conn`` as soon as
+        they are staged and every table they reference has been merged, so
+        the canonical tables change only in the caller's one transaction
+        and FK checks always find the referenced rows.
+        """
+        keys = [key for key in LOAD_ORDER if key in transformed_data]
+        dependencies = table_dependencies()
+        workers = min(self.options["load_workers"], len(keys))
+        staged: Dict[str, tuple] = {}
+        merged: Set[str] = set()
+
+        def merge_ready():
+            # Merging a table may unblock others, so repeat until stable
+            progress = True
+            while progress:
+                progress = False
+                for key in keys:
+                    if key in merged or key not in staged:
+                        continue
+                    if not dependencies[key] & set(keys) <= merged:
+                        continue
+                    rows, copy_seconds = staged[key]
+                    self._merge_staged(
+                        conn, key, rows, time.perf_counter() - copy_seconds
+                    )
+                    merged.add(key)
+                    progress = True
+
+        pool = self.writer.connection_pool(workers)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Largest tables first, so they are not left until last
+                futures = {
+                    executor.submit(
+                        self._stage_table, pool, key, transformed_data[key]
+                    ): key
+                    for key in sorted(
+                        keys,
+                        key=lambda k: len(transformed_data[k]),
+                        reverse=True,
+                    )
+                }
+                for future in as_completed(futures):
+                    staged[futures[future]] = future.result()
+                    merge_ready()
+        finally:
+            pool.closeall()
+
+        if len(merged) != len(keys):
+            raise ProcessorError(
+                "Circular table dependencies: "
+                f"{', '.join(k for k in keys if k not in merged)}",
+                self.processor_name,
+            )
+
+    def _stage_table(
+        self, pool: ThreadedConnectionPool, key: str, frame: pd.DataFrame
+    ) -> tuple:
+        """
+        COPY one table into its staging table on a pooled connection.
+
+        Returns:
+            (rows copied, elapsed seconds)
+        """
+        start_time = time.perf_counter()
+        conn = pool.getconn()
+        try:
+            self.writer.prepare_staging(conn, key)
+            rows = self.writer.copy_to_staging(
+                conn, key, frame, self.options["copy_batch_size"]
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+        return rows, time.perf_counter() - start_time
+
+    def _load_rows(self, conn, transformed_data: Dict[str, Any]):
+        """Load every table with the row-at-a-time upsert writers."""
+        writers = self._row_writers()
+        for key in LOAD_ORDER:
+            if key not in transformed_data:
+                continue
+            start_time = time.perf_counter()
+            writers[key](conn, _iter_records(transformed_data[key]))
+            rows = len(transformed_data[key])
+            self.load_stats[key] = self.writer.load_summary(
+                "INSERT", key, rows, rows, time.perf_counter() - start_time
+            )
+
+    def _load_stream(self, conn, batches: Iterable):
+        """
+        Load (key, DataFrame) batches as they arrive.
+
+        In bulk mode each batch is COPYed into the table's staging table and
+        the table is merged once its last batch has been staged; in row mode
+        each batch goes straight to the upsert writers. Only the current
+        batch is ever held in memory.
+        """
+        bulk = self.options["load_mode"] != LOAD_MODE_ROW
+        writers = self._row_writers()
+        current, rows, start_time = None, 0, 0.0
+
+        def finish(key):
+            if bulk:
+                self._merge_staged(conn, key, rows, start_time)
+                return
+            self.load_stats[key] = self.writer.load_summary(
+                "INSERT", key, rows, rows, time.perf_counter() - start_time
+            )
+
+        for key, frame in batches:
+            if key != current:
+                if current is not None:
+                    finish(current)
+                current, rows, start_time = key, 0, time.perf_counter()
+                if bulk:
+                    self.writer.prepare_staging(conn, key)
+            if bulk:
+                rows += self.writer.copy_to_staging(
+                    conn, key, frame, self.options["copy_batch_size"]
+                )
+            else:
+                writers[key](conn, _iter_records(frame))
+                rows += len(frame)
+
+        if current is not None:
+            finish(current)
+
+    def _swap_shadow(self, conn):
+        """
+        Complete the shadow tables and swap them in.
+
+        Tables that were not loaded are carried over from the live schema,
+        and the shadow tables are indexed and committed before the swap, so
+        the swap transaction itself only moves tables between schemas.
+        """
+        for key in LOAD_ORDER:
+            if key not in self.load_stats:
+                self.writer.carry_over_shadow(
+                    conn, CANONICAL_TABLES[key]["table"]
+                )
+        if "shapes" not in self.load_stats:
+            self.writer.carry_over_shadow(conn, SHAPE_GEOMS_TABLE)
+
+        start_time = time.perf_counter()
+        self.writer.build_shadow(conn, self._maintenance_workers())
+        conn.commit()
+        self.logger.info(
+            f"Built shadow tables in {time.perf_counter() - start_time:.2f}s"
+        )
+
+        start_time = time.perf_counter()
+        self.writer.swap_shadow(conn)
+        self.logger.info(
+            f"Swap took {time.perf_counter() - start_time:.3f}s"
+        )
+
+    def _tables_to_load(self, transformed_data: Dict[str, Any]) -> List[str]:
+        """Return the data keys this load will write, in LOAD_ORDER."""
+        if "batches" in transformed_data:
+            return list(self.load_keys)
+        return [key for key in LOAD_ORDER if key in transformed_data]
+
+    def _maintenance_workers(self) -> int:
+        """Parallel workers per index build, following load_workers."""
+        workers = self.options["load_workers"]
+        return workers if workers > 1 else 0
+
+    def rollback(self) -> bool:
+        """
+        Restore the canonical tables replaced by the last shadow load.
+
+        Returns:
+            True if the previous version was restored, False otherwise
+        """
+        try:
+            with self.writer.get_connection() as conn:
+                self.writer.restore_previous(conn)
+                conn.commit()
+                return True
+        except Exception as e:
+            self.logger.error(f"Failed to restore previous tables: {str(e)}")
+            return False
+
+    def _row_writers(self) -> Dict[str, Any]:
+        """Map each data key to its row-at-a-time writer."""
+        return {
+            "agencies": self.writer.write_agencies,
+            "routes": self.writer.write_routes,
+            "stops": self.writer.write_stops,
+            "calendar": self.writer.write_calendar,
+            "calendar_dates": self.writer.write_calendar_dates,
+            "shapes": self.writer.write_shapes,
+            "trips": self.writer.write_trips,
+            "schedule": self.writer.write_schedule,
+        }
+
     def _download_from_url(self, url: str) -> Path:
         """Download GTFS feed from URL."""
         temp_dir = Path(tempfile.mkdtemp())
@@ -75,8 +75,10 @@ CREATE TABLE IF NOT EXISTS canonical.transport_trips (
 CREATE TABLE IF NOT EXISTS canonical.transport_schedule (
     schedule_id SERIAL PRIMARY KEY,
     trip_id TEXT NOT NULL,
-    arrival_time TIME,
-    departure_time TIME,
+    -- Seconds since noon minus 12h of the service day; may exceed 86400
+    -- for trips running past midnight. TIME values: v_transport_schedule
+    arrival_secs INTEGER,
+    departure_secs INTEGER,
     stop_id TEXT NOT NULL,
     stop_sequence INTEGER NOT NULL,
     stop_headsign TEXT,
@@ -97,6 +99,29 @@ CREATE TABLE IF NOT EXISTS canonical.transport_schedule (
     CONSTRAINT uk_trip_stop_sequence UNIQUE (trip_id, stop_sequence)
 );
 
+-- Migrate schedules created with TIME columns, which reject GTFS times
+-- past 24:00:00, to integer seconds
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'canonical'
+          AND table_name = 'transport_schedule'
+          AND column_name = 'arrival_time'
+    ) THEN
+        ALTER TABLE canonical.transport_schedule
+            ADD COLUMN IF NOT EXISTS arrival_secs INTEGER,
+            ADD COLUMN IF NOT EXISTS departure_secs INTEGER;
+        UPDATE canonical.transport_schedule SET
+            arrival_secs = EXTRACT(EPOCH FROM arrival_time)::INTEGER,
+            departure_secs = EXTRACT(EPOCH FROM departure_time)::INTEGER;
+        DROP INDEX IF EXISTS canonical.idx_transport_schedule_times;
+        ALTER TABLE canonical.transport_schedule
+            DROP COLUMN arrival_time,
+            DROP COLUMN departure_time;
+    END IF;
+END $$;
+
 -- Transport Shapes: Canonical representation of route geometries
 CREATE TABLE IF NOT EXISTS canonical.transport_shapes (
     shape_id TEXT NOT NULL,
@@ -111,6 +136,17 @@ CREATE TABLE IF NOT EXISTS canonical.transport_shapes (
     PRIMARY KEY (shape_id, shape_pt_sequence)
 );
 
+-- Transport Shape Geometries: One line per shape, built from transport_shapes
+-- during the load. M holds the distance in metres from the first point.
+CREATE TABLE IF NOT EXISTS canonical.transport_shape_geoms (
+    shape_id TEXT PRIMARY KEY,
+    geom GEOMETRY(LINESTRINGM, 4326) NOT NULL,
+    length_m DOUBLE PRECISION NOT NULL,
+    point_count INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Transport Calendar: Service calendar information
 CREATE TABLE IF NOT EXISTS canonical.transport_calendar (
     service_id TEXT PRIMARY KEY,
@@ -153,6 +189,28 @@ CREATE TABLE IF NOT EXISTS canonical.transport_agencies (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Feed File Hashes: Content hash of each GTFS file as last loaded per feed,
+-- used to skip files that have not changed between runs
+CREATE TABLE IF NOT EXISTS canonical.feed_file_hashes (
+    feed_name TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    loaded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (feed_name, file_name)
+);
+
+-- Feed Row Hashes: Key and content hash of each row a feed last loaded into
+-- a canonical table, used by delta loads to write only changed rows and to
+-- delete rows that vanished from the feed
+CREATE TABLE IF NOT EXISTS canonical.feed_row_hashes (
+    feed_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    row_key JSONB NOT NULL,
+    row_hash TEXT NOT NULL,
+    PRIMARY KEY (feed_name, table_name, row_key)
+);
+
 -- Add foreign key constraint for routes to agencies
 ALTER TABLE canonical.transport_routes 
 ADD CONSTRAINT fk_route_agency 
@@ -178,15 +236,18 @@ CREATE INDEX IF NOT EXISTS idx_transport_trips_shape ON canonical.transport_trip
 CREATE INDEX IF NOT EXISTS idx_transport_schedule_trip ON canonical.transport_schedule (trip_id);
 CREATE INDEX IF NOT EXISTS idx_transport_schedule_stop ON canonical.transport_schedule (stop_id);
 CREATE INDEX IF NOT EXISTS idx_transport_schedule_sequence ON canonical.transport_schedule (trip_id, stop_sequence);
-CREATE INDEX IF NOT EXISTS idx_transport_schedule_times ON canonical.transport_schedule (arrival_time, departure_time);
+CREATE INDEX IF NOT EXISTS idx_transport_schedule_stop_departure ON canonical.transport_schedule (stop_id, departure_secs);
 
 CREATE INDEX IF NOT EXISTS idx_transport_shapes_id ON canonical.transport_shapes (shape_id);
 CREATE INDEX IF NOT EXISTS idx_transport_shapes_sequence ON canonical.transport_shapes (shape_id, shape_pt_sequence);
+CREATE INDEX IF NOT EXISTS idx_transport_shape_geoms_geom ON canonical.transport_shape_geoms USING GIST (geom);
 
 CREATE INDEX IF NOT EXISTS idx_transport_calendar_dates ON canonical.transport_calendar (start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_transport_calendar_service ON canonical.transport_calendar_dates (service_id);
 CREATE INDEX IF NOT EXISTS idx_transport_calendar_date ON canonical.transport_calendar_dates (date);
 
+CREATE INDEX IF NOT EXISTS idx_feed_row_hashes_key ON canonical.feed_row_hashes (table_name, row_key);
+
 -- Create triggers to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION canonical.update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -202,6 +263,7 @@ CREATE TRIGGER update_transport_routes_updated_at BEFORE UPDATE ON canonical.tra
 CREATE TRIGGER update_transport_trips_updated_at BEFORE UPDATE ON canonical.transport_trips FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
 CREATE TRIGGER update_transport_schedule_updated_at BEFORE UPDATE ON canonical.transport_schedule FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
 CREATE TRIGGER update_transport_shapes_updated_at BEFORE UPDATE ON canonical.transport_shapes FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
+CREATE TRIGGER update_transport_shape_geoms_updated_at BEFORE UPDATE ON canonical.transport_shape_geoms FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
 CREATE TRIGGER update_transport_calendar_updated_at BEFORE UPDATE ON canonical.transport_calendar FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
 CREATE TRIGGER update_transport_calendar_dates_updated_at BEFORE UPDATE ON canonical.transport_calendar_dates FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
 CREATE TRIGGER update_transport_agencies_updated_at BEFORE UPDATE ON canonical.transport_agencies FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column();
@@ -238,6 +300,48 @@ LEFT JOIN canonical.transport_trips t ON r.route_id = t.route_id
 LEFT JOIN canonical.transport_schedule s ON t.trip_id = s.trip_id
 GROUP BY r.route_id, r.route_short_name, r.route_long_name, r.route_type, a.agency_name;
 
+-- Line geometry of every shape used by each route, for route maps and tiles
+CREATE OR REPLACE VIEW canonical.v_route_shapes AS
+SELECT
+    rs.route_id,
+    r.route_short_name,
+    r.route_long_name,
+    r.route_type,
+    r.route_color,
+    g.shape_id,
+    g.length_m,
+    g.geom
+FROM (
+    SELECT DISTINCT route_id, shape_id
+    FROM canonical.transport_trips
+    WHERE shape_id IS NOT NULL
+) rs
+JOIN canonical.transport_routes r ON r.route_id = rs.route_id
+JOIN canonical.transport_shape_geoms g ON g.shape_id = rs.shape_id;
+
+-- Stop times with TIME values derived from the integer seconds. Times past
+-- midnight wrap around; departure_day_offset gives the number of days after
+-- the service day on which the departure falls.
+CREATE OR REPLACE VIEW canonical.v_transport_schedule AS
+SELECT
+    s.schedule_id,
+    s.trip_id,
+    s.stop_id,
+    s.stop_sequence,
+    s.arrival_secs,
+    s.departure_secs,
+    ((s.arrival_secs % 86400) * INTERVAL '1 second')::TIME AS arrival_time,
+    ((s.departure_secs % 86400) * INTERVAL '1 second')::TIME AS departure_time,
+    s.departure_secs / 86400 AS departure_day_offset,
+    s.stop_headsign,
+    s.pickup_type,
+    s.drop_off_type,
+    s.continuous_pickup,
+    s.continuous_drop_off,
+    s.shape_dist_traveled,
+    s.timepoint
+FROM canonical.transport_schedule s;
+
 -- Add comments for documentation
 COMMENT ON SCHEMA canonical IS 'Canonical database schema for OpenJourney transport data';
 COMMENT ON TABLE canonical.transport_stops IS 'Canonical representation of all transit stops and stations';
@@ -245,6 +349,11 @@ COMMENT ON TABLE canonical.transport_routes IS 'Canonical representation of tran
 COMMENT ON TABLE canonical.transport_trips IS 'Canonical representation of individual transit trips/journeys';
 COMMENT ON TABLE canonical.transport_schedule IS 'Canonical representation of stop times and scheduling information';
 COMMENT ON TABLE canonical.transport_shapes IS 'Canonical representation of route geometries and shapes';
+COMMENT ON TABLE canonical.transport_shape_geoms IS 'One LINESTRINGM per shape, with the distance in metres as measure';
 COMMENT ON TABLE canonical.transport_calendar IS 'Service calendar information defining when services operate';
 COMMENT ON TABLE canonical.transport_calendar_dates IS 'Service exceptions (added or removed service dates)';
-COMMENT ON TABLE canonical.transport_agencies IS 'Transit agency information';
\ No newline at end of file
+COMMENT ON TABLE canonical.transport_agencies IS 'Transit agency information';
+COMMENT ON COLUMN canonical.transport_schedule.arrival_secs IS 'Arrival in seconds since noon minus 12h of the service day';
+COMMENT ON COLUMN canonical.transport_schedule.departure_secs IS 'Departure in seconds since noon minus 12h of the service day';
+COMMENT ON TABLE canonical.feed_file_hashes IS 'Content hash and row count of each GTFS file as last loaded per feed';
+COMMENT ON TABLE canonical.feed_row_hashes IS 'Key and content hash of each canonical row as last loaded per feed, for delta loads';
\ No newline at end of file
@@ -0,0 +1,925 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the GTFS processor and its canonical database writer.
+"""
+
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import gtfs_kit as gk
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "processors"))
+
+from gtfs_processor import (  # noqa: E402
+    CANONICAL_TABLES,
+    GTFSDatabaseWriter,
+    GTFSProcessor,
+    EXTRACT_MODE_STREAM,
+    LOAD_MODE_DELTA,
+    LOAD_MODE_ROW,
+    LOAD_MODE_SHADOW,
+    LOAD_ORDER,
+    _iter_records,
+    _retarget,
+    hash_gtfs_members,
+    stream_gtfs_tables,
+    table_dependencies,
+    transform_feed,
+)
+
+FEED_FILES = {
+    "agency.txt": (
+        "agency_id,agency_name,agency_url,agency_timezone,agency_phone\n"
+        "A1,Metro,http://metro.example,Australia/Hobart,\n"
+        "A2,Ferries,http://ferry.example,Australia/Hobart,6200 0000\n"
+    ),
+    "routes.txt": (
+        "route_id,agency_id,route_short_name,route_long_name,route_desc,"
+        "route_type,route_color,route_sort_order\n"
+        "R1,A1,1,City Loop,Loop service,3,FF0000,1\n"
+        "R2,A2,F,,,4,,\n"
+    ),
+    "stops.txt": (
+        "stop_id,stop_name,stop_desc,stop_lat,stop_lon,location_type,"
+        "parent_station,wheelchair_boarding\n"
+        "P1,Central,,-42.8826,147.3257,1,,1\n"
+        "S1,Central Platform 1,Platform,-42.8827,147.3258,0,P1,1\n"
+        "S2,Wharf,,-42.8850,147.3350,0,,0\n"
+    ),
+    "trips.txt": (
+        "route_id,service_id,trip_id,trip_headsign,direction_id,shape_id\n"
+        "R1,WK,T1,Loop,0,SH1\n"
+        "R2,WE,T2,,,\n"
+    ),
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence,"
+        "pickup_type,shape_dist_traveled\n"
+        "T1,08:00:00,08:00:00,S1,1,0,0\n"
+        "T1,08:05:00,08:06:00,S2,2,0,1.2\n"
+        "T2,23:50:00,23:50:00,S2,1,1,\n"
+        "T2,24:10:00,24:10:00,S1,2,0,\n"
+    ),
+    "shapes.txt": (
+        "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence,"
+        "shape_dist_traveled\n"
+        "SH1,-42.8827,147.3258,1,0\n"
+        "SH1,-42.8850,147.3350,2,\n"
+    ),
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,"
+        "sunday,start_date,end_date\n"
+        "WK,1,1,1,1,1,0,0,20240101,20241231\n"
+        "WE,0,0,0,0,0,1,1,20240101,20241231\n"
+    ),
+    "calendar_dates.txt": (
+        "service_id,date,exception_type\nWK,20241225,2\nWE,20241225,1\n"
+    ),
+}
+
+
+class FakeCursor:
+    """Cursor stub recording executed SQL and COPY payloads."""
+
+    def __init__(self):
+        self.statements = []
+        self.params = []
+        self.copies = []
+        self.rowcount = 0
+        self.results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        self.params.append(params)
+
+    def copy_expert(self, sql, buffer):
+        self.copies.append((sql, buffer.read()))
+
+    def fetchall(self):
+        return self.results
+
+    def fetchone(self):
+        return self.results[0] if self.results else (None,)
+
+
+def make_connection():
+    cursor = FakeCursor()
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    conn.__enter__.return_value = conn
+    return conn, cursor
+
+
+@pytest.fixture
+def gtfs_feed(tmp_path):
+    """A small GTFS feed read with gtfs_kit, as the extract phase does."""
+    for name, content in FEED_FILES.items():
+        (tmp_path / name).write_text(content)
+    return gk.read_feed(tmp_path, dist_units="km")
+
+
+def seconds(value):
+    """Per-value reference for GTFS time parsing."""
+    hours, minutes, secs = (int(part) for part in value.split(":"))
+    return hours * 3600 + minutes * 60 + secs
+
+
+def legacy_transform(feed):
+    """The original per-row transform, kept as the parity reference."""
+    data = {}
+    data["agencies"] = [
+        {
+            "agency_id": a.get("agency_id", ""),
+            "agency_name": a.get("agency_name", ""),
+            "agency_url": a.get("agency_url", ""),
+            "agency_timezone": a.get("agency_timezone", ""),
+            "agency_lang": a.get("agency_lang"),
+            "agency_phone": a.get("agency_phone"),
+            "agency_fare_url": a.get("agency_fare_url"),
+            "agency_email": a.get("agency_email"),
+        }
+        for _, a in feed.agency.iterrows()
+    ]
+    data["routes"] = [
+        {
+            "route_id": r.get("route_id"),
+            "agency_id": r.get("agency_id", ""),
+            "route_short_name": r.get("route_short_name"),
+            "route_long_name": r.get("route_long_name"),
+            "route_description": r.get("route_desc"),
+            "route_type": int(r.get("route_type", 0)),
+            "route_url": r.get("route_url"),
+            "route_color": r.get("route_color", "FFFFFF"),
+            "route_text_color": r.get("route_text_color", "000000"),
+            "route_sort_order": r.get("route_sort_order"),
+            "continuous_pickup": r.get("continuous_pickup", 1),
+            "continuous_drop_off": r.get("continuous_drop_off", 1),
+        }
+        for _, r in feed.routes.iterrows()
+    ]
+    data["stops"] = [
+        {
+            "stop_id": s.get("stop_id"),
+            "stop_name": s.get("stop_name", ""),
+            "stop_description": s.get("stop_desc"),
+            "stop_lat": float(s.get("stop_lat", 0)),
+            "stop_lon": float(s.get("stop_lon", 0)),
+            "zone_id": s.get("zone_id"),
+            "stop_url": s.get("stop_url"),
+            "location_type": int(s.get("location_type", 0)),
+            "parent_station": s.get("parent_station"),
+            "stop_timezone": s.get("stop_timezone"),
+            "wheelchair_boarding": int(s.get("wheelchair_boarding", 0)),
+            "level_id": s.get("level_id"),
+            "platform_code": s.get("platform_code"),
+        }
+        for _, s in feed.stops.iterrows()
+    ]
+    data["trips"] = [
+        {
+            "trip_id": t.get("trip_id"),
+            "route_id": t.get("route_id"),
+            "service_id": t.get("service_id"),
+            "trip_headsign": t.get("trip_headsign"),
+            "trip_short_name": t.get("trip_short_name"),
+            "direction_id": t.get("direction_id"),
+            "block_id": t.get("block_id"),
+            "shape_id": t.get("shape_id"),
+            "wheelchair_accessible": int(t.get("wheelchair_accessible", 0)),
+            "bikes_allowed": int(t.get("bikes_allowed", 0)),
+        }
+        for _, t in feed.trips.iterrows()
+    ]
+    data["schedule"] = [
+        {
+            "trip_id": st.get("trip_id"),
+            "arrival_secs": seconds(st.get("arrival_time")),
+            "departure_secs": seconds(st.get("departure_time")),
+            "stop_id": st.get("stop_id"),
+            "stop_sequence": int(st.get("stop_sequence", 0)),
+            "stop_headsign": st.get("stop_headsign"),
+            "pickup_type": int(st.get("pickup_type", 0)),
+            "drop_off_type": int(st.get("drop_off_type", 0)),
+            "continuous_pickup": st.get("continuous_pickup"),
+            "continuous_drop_off": st.get("continuous_drop_off"),
+            "shape_dist_traveled": st.get("shape_dist_traveled"),
+            "timepoint": int(st.get("timepoint", 1)),
+        }
+        for _, st in feed.stop_times.iterrows()
+    ]
+    data["shapes"] = [
+        {
+            "shape_id": sh.get("shape_id"),
+            "shape_pt_lat": float(sh.get("shape_pt_lat", 0)),
+            "shape_pt_lon": float(sh.get("shape_pt_lon", 0)),
+            "shape_pt_sequence": int(sh.get("shape_pt_sequence", 0)),
+            "shape_dist_traveled": sh.get("shape_dist_traveled"),
+        }
+        for _, sh in feed.shapes.iterrows()
+    ]
+    data["calendar"] = [
+        {
+            "service_id": c.get("service_id"),
+            "monday": bool(c.get("monday", 0)),
+            "tuesday": bool(c.get("tuesday", 0)),
+            "wednesday": bool(c.get("wednesday", 0)),
+            "thursday": bool(c.get("thursday", 0)),
+            "friday": bool(c.get("friday", 0)),
+            "saturday": bool(c.get("saturday", 0)),
+            "sunday": bool(c.get("sunday", 0)),
+            "start_date": c.get("start_date"),
+            "end_date": c.get("end_date"),
+        }
+        for _, c in feed.calendar.iterrows()
+    ]
+    data["calendar_dates"] = [
+        {
+            "service_id": cd.get("service_id"),
+            "date": cd.get("date"),
+            "exception_type": int(cd.get("exception_type", 1)),
+        }
+        for _, cd in feed.calendar_dates.iterrows()
+    ]
+    return data
+
+
+def normalise(value):
+    """Treat every flavour of missing value as None for comparison."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+def test_transform_matches_legacy_dicts(gtfs_feed):
+    """The columnar transform yields the legacy dicts field for field."""
+    processor = GTFSProcessor({})
+    transformed = processor.transform({"feed": gtfs_feed}, {})
+    expected = legacy_transform(gtfs_feed)
+
+    assert set(transformed) == set(expected)
+    for key, expected_rows in expected.items():
+        frame = transformed[key]
+        assert isinstance(frame, pd.DataFrame)
+        actual_rows = list(_iter_records(frame))
+        assert len(actual_rows) == len(expected_rows), key
+        for actual, wanted in zip(actual_rows, expected_rows):
+            assert list(actual) == list(wanted), key
+            assert {k: normalise(v) for k, v in actual.items()} == {
+                k: normalise(v) for k, v in wanted.items()
+            }, key
+
+
+def test_transform_casts_columns(gtfs_feed):
+    """Typed columns are cast on the whole frame, with defaults applied."""
+    transformed = GTFSProcessor({}).transform({"feed": gtfs_feed}, {})
+
+    routes = transformed["routes"]
+    assert routes["route_type"].dtype == "int64"
+    assert routes["route_text_color"].tolist() == ["000000", "000000"]
+    assert transformed["calendar"]["monday"].dtype == bool
+    assert transformed["trips"]["wheelchair_accessible"].tolist() == [0, 0]
+    schedule = transformed["schedule"]
+    assert schedule["departure_secs"].dtype == "Int64"
+    assert schedule["departure_secs"].tolist()[-1] == 24 * 3600 + 600
+
+
+@pytest.fixture
+def gtfs_zip(tmp_path):
+    """The same feed zipped under a top-level folder."""
+    path = tmp_path / "feed.zip"
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name, content in FEED_FILES.items():
+            zip_file.writestr(f"feed/{name}", content)
+    return path
+
+
+def test_stream_yields_bounded_batches_in_load_order(gtfs_zip):
+    """Members are read straight from the archive in fixed-size batches."""
+    batches = list(stream_gtfs_tables(gtfs_zip, batch_size=2))
+
+    assert all(len(batch) <= 2 for _, batch in batches)
+    keys = [key for key, _ in batches]
+    assert keys == sorted(keys, key=LOAD_ORDER.index)
+    schedule = [batch for key, batch in batches if key == "schedule"]
+    assert [len(batch) for batch in schedule] == [2, 2]
+
+
+def test_stream_transform_matches_feed_transform(gtfs_feed, gtfs_zip):
+    """Streamed batches transform to the same rows as the whole feed."""
+    processor = GTFSProcessor({})
+    expected = processor.transform({"feed": gtfs_feed}, {})
+
+    processor.options["extract_mode"] = EXTRACT_MODE_STREAM
+    processor.options["copy_batch_size"] = 1
+    raw = processor.extract(gtfs_zip)
+    streamed = {}
+    for key, batch in processor.transform(raw, {})["batches"]:
+        streamed.setdefault(key, []).extend(_iter_records(batch))
+
+    assert set(streamed) == set(expected)
+    for key, frame in expected.items():
+        assert [
+            {k: normalise(v) for k, v in row.items()} for row in streamed[key]
+        ] == [
+            {k: normalise(v) for k, v in row.items()}
+            for row in _iter_records(frame)
+        ], key
+
+
+def test_load_stream_merges_each_table_once(gtfs_zip):
+    """Every batch is COPYed, but each table is staged and merged once."""
+    processor = GTFSProcessor({})
+    processor.options["extract_mode"] = EXTRACT_MODE_STREAM
+    processor.options["copy_batch_size"] = 1
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+
+    raw = processor.extract(gtfs_zip)
+    assert processor.load(processor.transform(raw, {}))
+
+    assert len(cursor.copies) == sum(
+        content.count("\n") - 1 for content in FEED_FILES.values()
+    )
+    merges = [
+        sql for sql in cursor.statements if "FROM canonical.staging_" in sql
+    ]
+    assert len(merges) == len(LOAD_ORDER)
+    assert processor.load_stats["schedule"]["rows"] == 4
+    conn.commit.assert_called_once()
+
+
+def test_batch_api_loads_stream_batches_in_one_load(gtfs_zip):
+    """Streamed batches saved by a checkpointed run load like a stream."""
+    processor = GTFSProcessor({})
+    processor.options["extract_mode"] = EXTRACT_MODE_STREAM
+    processor.options["copy_batch_size"] = 2
+    extracted = list(processor.extract_batches(gtfs_zip))
+    transformed = [
+        batch
+        for table, records in extracted
+        for batch in processor.transform_batch(table, records, {})
+    ]
+    state = processor.checkpoint_state()
+
+    resumed = GTFSProcessor({})
+    resumed.options = dict(processor.options)
+    resumed.restore_state(state)
+    conn, cursor = make_connection()
+    resumed.writer.get_connection = MagicMock(return_value=conn)
+
+    assert [key for key, _ in extracted] == [key for key, _ in transformed]
+    assert resumed.load_batches(iter(transformed))
+    assert resumed.load_keys == processor.load_keys
+    assert resumed.load_stats["schedule"]["rows"] == 4
+    conn.commit.assert_called_once()
+
+
+def test_stream_mode_phases_count_their_batches(gtfs_zip):
+    """Stream extracts run as a stream, so each phase counts its rows."""
+    processor = GTFSProcessor({})
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+    spans = {}
+    phase_span = processor.phase_span
+
+    def record_span(phase, *args):
+        spans[phase] = phase_span(phase, *args)
+        return spans[phase]
+
+    processor.phase_span = record_span
+
+    assert processor.process(
+        gtfs_zip, {}, extract_mode=EXTRACT_MODE_STREAM, copy_batch_size=2
+    )
+
+    rows = sum(content.count("\n") - 1 for content in FEED_FILES.values())
+    assert {phase: span.records for phase, span in spans.items()} == {
+        "extract": rows,
+        "transform": rows,
+        "load": rows,
+    }
+    assert all(span.bytes > 0 for span in spans.values())
+    assert processor.load_stats["schedule"]["rows"] == 4
+    conn.commit.assert_called_once()
+
+
+def test_unchanged_files_are_skipped(gtfs_zip):
+    """Only files whose hash differs from the recorded one are extracted."""
+    hashes = hash_gtfs_members(gtfs_zip)
+    processor = GTFSProcessor({})
+    processor.feed_name = "Metro"
+    conn, cursor = make_connection()
+    cursor.results = [
+        (name, digest)
+        for name, digest in hashes.items()
+        if name != "calendar_dates.txt"
+    ]
+    processor.writer.get_connection = MagicMock(return_value=conn)
+
+    transformed = processor.transform(processor.extract(gtfs_zip), {})
+
+    assert list(transformed) == ["calendar_dates"]
+    assert processor.file_hashes == {
+        "calendar_dates.txt": hashes["calendar_dates.txt"]
+    }
+
+    cursor.results = list(hashes.items())
+    assert processor.transform(processor.extract(gtfs_zip), {}) == {}
+
+    processor.options["force"] = True
+    transformed = processor.transform(processor.extract(gtfs_zip), {})
+    assert set(transformed) == set(LOAD_ORDER)
+
+
+def test_load_records_file_hashes(gtfs_zip):
+    """Hashes and row counts are written in the load transaction."""
+    processor = GTFSProcessor({})
+    processor.feed_name = "Metro"
+    processor.options["force"] = True
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+
+    assert processor.load(
+        processor.transform(processor.extract(gtfs_zip), {})
+    )
+
+    recorded = {
+        params[1]: params[3]
+        for sql, params in zip(cursor.statements, cursor.params)
+        if "feed_file_hashes" in sql
+    }
+    assert len(recorded) == len(LOAD_ORDER)
+    assert recorded["stop_times.txt"] == 4
+    assert "feed_file_hashes" in cursor.statements[-1]
+    conn.commit.assert_called_once()
+
+
+def test_retarget_rewrites_only_canonical_tables():
+    """Table references move to the shadow schema; functions stay put."""
+    trigger = (
+        "CREATE TRIGGER t BEFORE UPDATE ON canonical.transport_calendar "
+        "FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column()"
+    )
+    assert _retarget(trigger, "canonical_shadow") == (
+        "CREATE TRIGGER t BEFORE UPDATE ON "
+        "canonical_shadow.transport_calendar "
+        "FOR EACH ROW EXECUTE FUNCTION canonical.update_updated_at_column()"
+    )
+    assert _retarget(
+        "REFERENCES canonical.transport_calendar_dates(service_id)",
+        "canonical_shadow",
+    ) == "REFERENCES canonical_shadow.transport_calendar_dates(service_id)"
+
+
+def test_fill_shadow_keeps_rows_missing_from_feed():
+    """Live rows not in the feed are carried over; staged rows replace."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+
+    writer.fill_shadow(conn, "stops")
+
+    carried, _, replaced, truncate = cursor.statements
+    assert "INSERT INTO canonical_shadow.transport_stops" in carried
+    assert "WHERE NOT EXISTS" in carried
+    assert "s.stop_id = l.stop_id" in carried
+    assert "ORDER BY stop_id, staged_row DESC" in replaced
+    assert "COALESCE(l.created_at, NOW())" in replaced
+    assert "LEFT JOIN canonical.transport_stops l USING (stop_id)" in replaced
+    assert truncate == "TRUNCATE canonical.staging_transport_stops"
+
+
+def test_shadow_load_builds_then_swaps(gtfs_feed):
+    """The shadow is committed before a swap that only moves tables."""
+    processor = GTFSProcessor({})
+    processor.options["load_mode"] = LOAD_MODE_SHADOW
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+    transformed = processor.transform({"feed": gtfs_feed}, {})
+    del transformed["shapes"]
+
+    assert processor.load(transformed)
+
+    statements = [" ".join(sql.split()) for sql in cursor.statements]
+    # Shadow loads of other feeds wait until this one has swapped
+    assert statements[0] == "SELECT pg_advisory_lock(hashtext(%s))"
+    assert statements[1] == "DROP SCHEMA IF EXISTS canonical_shadow CASCADE"
+    assert statements[-1] == "SELECT pg_advisory_unlock(hashtext(%s))"
+    assert cursor.params[0] == cursor.params[-1] == ("canonical_shadow",)
+    assert not any(
+        "INSERT INTO canonical.transport" in sql for sql in statements
+    )
+    assert (
+        "INSERT INTO canonical_shadow.transport_shapes "
+        "SELECT * FROM canonical.transport_shapes"
+    ) in statements
+    moved_out = statements.index(
+        "ALTER TABLE canonical.transport_stops SET SCHEMA canonical_previous"
+    )
+    moved_in = statements.index(
+        "ALTER TABLE canonical_shadow.transport_stops SET SCHEMA canonical"
+    )
+    dropped = statements.index(
+        "DROP SCHEMA IF EXISTS canonical_previous CASCADE"
+    )
+    assert dropped < moved_out < moved_in
+    assert conn.commit.call_count == 2
+
+
+def test_failed_shadow_load_releases_the_lock(gtfs_feed):
+    """The lock is released after the failed transaction is rolled back."""
+    processor = GTFSProcessor({})
+    processor.options["load_mode"] = LOAD_MODE_SHADOW
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+    processor.writer.build_shadow = MagicMock(side_effect=RuntimeError)
+
+    assert not processor.load(processor.transform({"feed": gtfs_feed}, {}))
+
+    conn.rollback.assert_called_once()
+    assert cursor.statements[-1] == "SELECT pg_advisory_unlock(hashtext(%s))"
+
+
+def test_table_dependencies_follow_schema_foreign_keys():
+    """The load graph is read from the FKs in sql/gtfs_schema.sql."""
+    dependencies = table_dependencies()
+
+    assert dependencies["schedule"] == {"trips", "stops"}
+    assert dependencies["trips"] == {"routes", "shapes", "calendar"}
+    assert dependencies["routes"] == {"agencies"}
+    assert dependencies["stops"] == set()
+    assert dependencies["calendar_dates"] == set()
+
+
+class FakePool:
+    """Connection pool stub handing out recording connections."""
+
+    def __init__(self):
+        self.connections = []
+        self.closed = False
+
+    def getconn(self):
+        conn, cursor = make_connection()
+        self.connections.append((conn, cursor))
+        return conn
+
+    def putconn(self, conn):
+        pass
+
+    def closeall(self):
+        self.closed = True
+
+
+def test_parallel_load_merges_in_dependency_order(gtfs_feed):
+    """Tables are staged on pooled connections and merged in FK order."""
+    processor = GTFSProcessor({})
+    processor.options["load_workers"] = 4
+    conn, cursor = make_connection()
+    pool = FakePool()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+    processor.writer.connection_pool = MagicMock(return_value=pool)
+
+    assert processor.load(processor.transform({"feed": gtfs_feed}, {}))
+
+    assert len(pool.connections) == len(LOAD_ORDER)
+    assert pool.closed
+    for worker_conn, worker_cursor in pool.connections:
+        assert len(worker_cursor.copies) == 1
+        worker_conn.commit.assert_called_once()
+    merges = [
+        sql.split("INSERT INTO canonical.")[1].split()[0]
+        for sql in cursor.statements
+        if "FROM canonical.staging_" in sql
+    ]
+    assert len(merges) == len(LOAD_ORDER)
+    position = {
+        key: merges.index(spec["table"])
+        for key, spec in CANONICAL_TABLES.items()
+    }
+    for key, dependencies in table_dependencies().items():
+        for dependency in dependencies:
+            assert position[dependency] < position[key]
+    conn.commit.assert_called_once()
+
+
+def test_parallel_feeds_stage_the_same_table_separately(gtfs_feed):
+    """Feeds loading at once never stage into each other's tables."""
+    loads = {}
+
+    stops = transform_feed(gtfs_feed)["stops"]
+
+    def load(feed_name):
+        processor = GTFSProcessor({})
+        conn, cursor = make_connection()
+        pool = FakePool()
+        processor.writer.get_connection = MagicMock(return_value=conn)
+        processor.writer.connection_pool = MagicMock(return_value=pool)
+        loads[feed_name] = (processor, cursor, pool)
+        return processor.load_feed_tables(
+            {"stops": stops}, {"name": feed_name}, load_workers=2
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert all(executor.map(load, ["Metro", "Ferries"]))
+
+    staging = {}
+    for feed_name, (processor, cursor, pool) in loads.items():
+        table = processor.writer.staging_table("stops")
+        staging[feed_name] = table
+        assert table.startswith("canonical.staging_")
+        assert table.endswith("_transport_stops")
+        # The pooled COPY and the merge use the feed's own staging table
+        ((_, worker_cursor),) = pool.connections
+        (copy_sql, _), = worker_cursor.copies
+        assert copy_sql.startswith(f"COPY {table} (")
+        merge_sql = next(
+            sql for sql in cursor.statements
+            if sql.strip().startswith("INSERT INTO canonical.transport_stops")
+        )
+        assert f"FROM {table}" in merge_sql
+    assert staging["Metro"] != staging["Ferries"]
+    assert GTFSDatabaseWriter({}).staging_table("stops") == (
+        "canonical.staging_transport_stops"
+    )
+
+
+def test_suspended_maintenance_is_rebuilt_after_merge(gtfs_feed):
+    """Indexes, FKs and triggers are off for the merge and rebuilt after."""
+    processor = GTFSProcessor({})
+    processor.options["suspend_maintenance"] = True
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+    processor.writer.table_definitions = MagicMock(
+        return_value={
+            "constraints": [
+                (
+                    "transport_trips",
+                    "fk_trip_route",
+                    "FOREIGN KEY (route_id) REFERENCES "
+                    "canonical.transport_routes(route_id)",
+                    "f",
+                ),
+            ],
+            "indexes": [
+                (
+                    "transport_stops",
+                    "idx_transport_stops_parent",
+                    "CREATE INDEX idx_transport_stops_parent "
+                    "ON canonical.transport_stops USING btree "
+                    "(parent_station)",
+                ),
+            ],
+            "triggers": [],
+        }
+    )
+
+    assert processor.load(processor.transform({"feed": gtfs_feed}, {}))
+
+    statements = [" ".join(sql.split()) for sql in cursor.statements]
+    merges = [
+        i for i, sql in enumerate(statements)
+        if sql.startswith("INSERT INTO canonical.transport")
+    ]
+    dropped = statements.index(
+        "ALTER TABLE canonical.transport_trips DROP CONSTRAINT fk_trip_route"
+    )
+    disabled = statements.index(
+        "ALTER TABLE canonical.transport_schedule DISABLE TRIGGER USER"
+    )
+    rebuilt = statements.index(
+        "CREATE INDEX idx_transport_stops_parent "
+        "ON canonical.transport_stops USING btree (parent_station)"
+    )
+    validated = statements.index(
+        "ALTER TABLE canonical.transport_trips VALIDATE CONSTRAINT "
+        "fk_trip_route"
+    )
+    assert "DROP INDEX canonical.idx_transport_stops_parent" in statements
+    assert max(dropped, disabled) < merges[0]
+    assert merges[-1] < rebuilt < validated
+    assert statements[validated - 1].endswith("NOT VALID")
+    analyzes = [sql for sql in statements if sql.startswith("ANALYZE")]
+    assert len(analyzes) == 1
+    assert analyzes[0].count("canonical.transport_") == len(LOAD_ORDER)
+    assert conn.commit.call_count == 2
+
+
+def test_copy_to_staging_streams_in_batches():
+    """Frames are sent in COPY chunks no larger than the batch size."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+    frame = pd.DataFrame({
+        "service_id": [f"S{i}" for i in range(4)] + [None],
+        "date": ["20240101"] * 5,
+        "exception_type": [1] * 5,
+    })
+
+    copied = writer.copy_to_staging(conn, "calendar_dates", frame, 2)
+
+    assert copied == 5
+    assert len(cursor.copies) == 3
+    sql, payload = cursor.copies[0]
+    assert sql.startswith(
+        "COPY canonical.staging_transport_calendar_dates "
+        "(service_id, date, exception_type)"
+    )
+    assert "FORMAT csv" in sql
+    assert payload == "S0,20240101,1\nS1,20240101,1\n"
+    assert cursor.copies[2][1] == "\\N,20240101,1\n"
+
+
+def test_merge_from_staging_is_one_upsert():
+    """The merge is a single set-based upsert from the staging table."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+
+    writer.merge_from_staging(conn, "stops")
+
+    merge_sql = cursor.statements[0]
+    assert "INSERT INTO canonical.transport_stops" in merge_sql
+    assert "FROM canonical.staging_transport_stops" in merge_sql
+    assert "ON CONFLICT (stop_id) DO UPDATE" in merge_sql
+    assert "ST_MakePoint(stop_lon, stop_lat)" in merge_sql
+    assert "ORDER BY stop_id, staged_row DESC" in merge_sql
+    assert cursor.statements[1] == "TRUNCATE canonical.staging_transport_stops"
+
+
+def test_prepare_staging_numbers_rows_in_copy_order():
+    """Staged rows are numbered so merges keep the last duplicate."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+
+    writer.prepare_staging(conn, "stops")
+
+    assert "CREATE UNLOGGED TABLE canonical.staging_transport_stops" in (
+        cursor.statements[1]
+    )
+    assert cursor.statements[2] == (
+        "ALTER TABLE canonical.staging_transport_stops ADD COLUMN IF NOT "
+        "EXISTS staged_row BIGINT GENERATED ALWAYS AS IDENTITY"
+    )
+    assert cursor.statements[3] == (
+        "TRUNCATE canonical.staging_transport_stops RESTART IDENTITY"
+    )
+
+
+def test_merge_delta_writes_only_changed_rows():
+    """Rows are hashed against the feed's stored hashes before writing."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+
+    counts = writer.merge_delta(conn, "schedule", "Metro")
+
+    delta_sql, update_sql, insert_sql, hashes_sql = cursor.statements[1:5]
+    assert "md5(ROW(trip_id, arrival_secs" in delta_sql
+    assert "jsonb_build_object('trip_id', trip_id, 'stop_sequence'" in (
+        delta_sql
+    )
+    assert "h.row_hash IS DISTINCT FROM d.row_hash" in delta_sql
+    assert cursor.params[1] == ("Metro", "transport_schedule")
+    # Rows whose content is unchanged in the live table are not rewritten
+    assert "UPDATE canonical.transport_schedule l" in update_sql
+    assert ") IS DISTINCT FROM (d.trip_id" in update_sql
+    assert "WHERE NOT EXISTS" in insert_sql
+    assert "ON CONFLICT (feed_name, table_name, row_key)" in hashes_sql
+    assert "CREATE TEMP TABLE vanished_transport_schedule" in (
+        cursor.statements[6]
+    )
+    assert "DELETE FROM canonical.feed_row_hashes" in cursor.statements[7]
+    assert counts == {"inserted": 0, "updated": 0}
+
+    cursor.statements.clear()
+    writer.merge_delta(conn, "schedule", "Metro", force=True)
+    assert "IS DISTINCT FROM d.row_hash" not in cursor.statements[1]
+
+
+def test_delta_load_deletes_vanished_rows_in_reverse_order(gtfs_feed):
+    """Vanished rows are deleted after every merge, children first."""
+    processor = GTFSProcessor({})
+    processor.feed_name = "Metro"
+    processor.options["load_mode"] = LOAD_MODE_DELTA
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+
+    assert processor.load(processor.transform({"feed": gtfs_feed}, {}))
+
+    deletes = [
+        sql.split("DELETE FROM canonical.")[1].split()[0]
+        for sql in cursor.statements
+        if "jsonb_populate_record" in sql
+    ]
+    assert deletes == [
+        CANONICAL_TABLES[key]["table"] for key in reversed(LOAD_ORDER)
+    ]
+    last_merge = max(
+        i for i, sql in enumerate(cursor.statements) if "UPDATE canonical" in sql
+    )
+    first_delete = min(
+        i
+        for i, sql in enumerate(cursor.statements)
+        if "jsonb_populate_record" in sql
+    )
+    assert last_merge < first_delete
+    # Shapes that lost points are rebuilt too
+    assert any(
+        "FROM vanished_transport_shapes" in sql
+        and "transport_shape_geoms" in sql
+        for sql in cursor.statements
+    )
+    assert processor.load_stats["stops"].keys() >= {
+        "inserted",
+        "updated",
+        "deleted",
+    }
+    conn.commit.assert_called_once()
+
+
+def test_delta_load_needs_feed_name(gtfs_feed):
+    """Row hashes are kept per feed, so a delta load needs a feed name."""
+    processor = GTFSProcessor({})
+    processor.options["load_mode"] = LOAD_MODE_DELTA
+    processor.writer.get_connection = MagicMock()
+
+    assert not processor.load(processor.transform({"feed": gtfs_feed}, {}))
+    processor.writer.get_connection.assert_not_called()
+
+
+def test_process_applies_feed_options():
+    """Per-feed options configure the run and are not passed to extract."""
+    processor = GTFSProcessor({})
+    processor.extract = MagicMock(return_value={})
+    processor.transform = MagicMock(return_value={})
+    processor.load = MagicMock(return_value=True)
+
+    assert processor.process(
+        Path("feed.zip"), {}, load_mode=LOAD_MODE_ROW, url="http://x"
+    )
+    assert processor.options["load_mode"] == LOAD_MODE_ROW
+    processor.extract.assert_called_once_with(
+        Path("feed.zip"), url="http://x"
+    )
+
+
+def test_load_feed_tables_loads_a_feed_parsed_elsewhere(gtfs_feed):
+    """Tables transformed from a parsed feed load without an extract."""
+    processor = GTFSProcessor({})
+    processor.file_hashes = {"stops.txt": "stale"}
+    processor.load = MagicMock(return_value=True)
+    tables = transform_feed(gtfs_feed)
+
+    assert processor.load_feed_tables(
+        tables, {"name": "Metro"}, load_mode=LOAD_MODE_ROW
+    )
+    processor.load.assert_called_once_with(tables)
+    assert processor.feed_name == "Metro"
+    assert processor.options["load_mode"] == LOAD_MODE_ROW
+    assert processor.file_hashes == {}
+    assert processor.load_keys == [k for k in LOAD_ORDER if k in tables]
+
+
+def test_build_shape_geoms_upserts_changed_shapes():
+    """Only shapes written in this load are rebuilt into the live table."""
+    writer = GTFSDatabaseWriter({})
+    conn, cursor = make_connection()
+
+    writer.build_shape_geoms(conn)
+
+    sql = " ".join(cursor.statements[0].split())
+    assert sql.startswith("INSERT INTO canonical.transport_shape_geoms")
+    assert "ST_MakePointM(lon, lat, measure) ORDER BY shape_pt_sequence" in sql
+    assert "WHERE updated_at = NOW()" in sql
+    assert "ON CONFLICT (shape_id) DO UPDATE" in sql
+    assert "HAVING COUNT(*) >= 2" in sql
+
+
+def test_shadow_load_builds_every_shape_geometry(gtfs_feed):
+    """A shadow load fills the empty shadow geometry table in full."""
+    processor = GTFSProcessor({})
+    processor.options["load_mode"] = LOAD_MODE_SHADOW
+    conn, cursor = make_connection()
+    processor.writer.get_connection = MagicMock(return_value=conn)
+
+    assert processor.load(processor.transform({"feed": gtfs_feed}, {}))
+
+    statements = [" ".join(sql.split()) for sql in cursor.statements]
+    built = [
+        sql
+        for sql in statements
+        if sql.startswith("INSERT INTO canonical_shadow.transport_shape_geoms")
+    ]
+    assert len(built) == 1
+    assert "FROM canonical_shadow.transport_shapes" in built[0]
+    assert "ON CONFLICT" not in built[0]
+    assert not any(
+        "SELECT * FROM canonical.transport_shape_geoms" in sql
+        for sql in statements
+    )
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the synthetic GTFS generator and the benchmark runner.
+"""
+
+import sys
+from pathlib import Path
+
+import gtfs_kit as gk
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from run_benchmarks import run_benchmarks  # noqa: E402
+from synthetic_gtfs import FeedSize, write_gtfs_zip  # noqa: E402
+
+SIZE = FeedSize(
+    stops=30, routes=3, trips_per_route=4, stops_per_trip=6, shape_points=12
+)
+
+
+def test_generator_is_deterministic(tmp_path):
+    """The same size and seed give a byte-identical archive."""
+    first = tmp_path / "first.zip"
+    second = tmp_path / "second.zip"
+    other = tmp_path / "other.zip"
+
+    write_gtfs_zip(first, SIZE, seed=7)
+    write_gtfs_zip(second, SIZE, seed=7)
+    write_gtfs_zip(other, SIZE, seed=8)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+
+
+def test_generated_feed_is_consistent(tmp_path):
+    """Row counts match the size and trips run in order past midnight."""
+    path = tmp_path / "feed.zip"
+    counts = write_gtfs_zip(path, SIZE)
+
+    feed = gk.read_feed(path, dist_units="km")
+
+    assert len(feed.stops) == counts["stops.txt"] == 30
+    assert len(feed.trips) == counts["trips.txt"] == 12
+    assert len(feed.stop_times) == counts["stop_times.txt"] == 72
+    assert len(feed.shapes) == counts["shapes.txt"] == 36
+    assert set(feed.stop_times["stop_id"]) <= set(feed.stops["stop_id"])
+    assert feed.stop_times["departure_time"].max() >= "24:00:00"
+
+    for _, trip in feed.stop_times.groupby("trip_id"):
+        trip = trip.sort_values("stop_sequence")
+        assert trip["arrival_time"].is_monotonic_increasing
+        assert trip["shape_dist_traveled"].is_monotonic_increasing
+
+
+def test_benchmark_reports_every_phase_without_database():
+    """Without a database the load is reported as skipped."""
+    report = run_benchmarks(SIZE)
+
+    phases = report["phases"]
+    assert phases["processor_load"] == {"skipped": "no database configured"}
+    assert phases["processor_transform"]["rows"] == sum(
+        report["feed"]["rows"].values()
+    )
+    # One pattern per route, as every trip of a route calls at its stops
+    assert phases["converter_segments"]["rows"] == 3 * 5
+    for name in ("generate", "processor_extract", "converter_segments"):
+        assert phases[name]["rows_per_sec"] > 0
+        assert phases[name]["peak_rss_bytes"] > 0
@@ -0,0 +1,49 @@
+"""
+Tests for the shared GTFS helpers.
+"""
+
+import numpy as np
+import pandas as pd
+
+from common.gtfs_utils import (
+    SECONDS_PER_DAY,
+    gtfs_time_to_seconds,
+    haversine_m,
+)
+
+
+def test_gtfs_time_to_seconds_parses_overnight_times():
+    """Times past 24:00:00 stay on the same service day."""
+    times = pd.Series(["08:05:30", "7:00:00", "24:10:00", "47:59:59"])
+
+    assert gtfs_time_to_seconds(times).tolist() == [
+        8 * 3600 + 5 * 60 + 30,
+        7 * 3600,
+        SECONDS_PER_DAY + 600,
+        2 * SECONDS_PER_DAY - 1,
+    ]
+
+
+def test_gtfs_time_to_seconds_marks_invalid_as_missing():
+    """Missing and malformed values become NA rather than raising."""
+    times = pd.Series([None, "", "8:60:00", "noon", " 06:00:00 "])
+
+    seconds = gtfs_time_to_seconds(times)
+
+    assert seconds.dtype == "Int64"
+    assert seconds.isna().tolist() == [True, True, True, True, False]
+    assert seconds.iloc[4] == 6 * 3600
+
+
+def test_haversine_m_measures_arrays():
+    """Distances are computed element-wise; missing points give NaN."""
+    distances = haversine_m(
+        pd.Series([0.0, -42.8821, None]),
+        np.array([0.0, 147.3272, 147.0]),
+        [0.0, -42.8821, -42.0],
+        [1.0, 147.3272, 147.0],
+    )
+
+    assert abs(distances[0] - 111195) < 1
+    assert distances[1] == 0
+    assert np.isnan(distances[2])
@@ -62,6 +62,12 @@ def test_etl_metrics():
         metrics.record_etl_records_processed("test_feed", "stops", 500)
         print("✓ Records processed metrics recorded")
 
+        # Test per-phase metrics
+        metrics.record_etl_phase(
+            "GTFS", "transform", 12.5, 11.8, 256 * 2**20, 500000, 2**30
+        )
+        print("✓ Phase metrics recorded")
+
         # Test error metrics
         metrics.record_etl_error("processor_error", "test_feed")
         print("✓ Error metrics recorded")
@@ -104,6 +110,10 @@ def test_gtfs_daemon_metrics():
         metrics.set_gtfs_active_feeds(3)
         print("✓ Active feeds gauge set")
 
+        # Test per-table write throughput metrics
+        metrics.record_gtfs_table_write("segments", "copy", 50000, 2.5)
+        print("✓ Table write metrics recorded")
+
         return True
     except Exception as e:
         print(f"✗ Failed to record GTFS daemon metrics: {e}")
@@ -129,6 +139,7 @@ def test_metrics_export():
             "openjourney_etl_processing_duration_seconds",
             "openjourney_gtfs_feeds_processed_total",
             "openjourney_gtfs_download_duration_seconds",
+            "openjourney_gtfs_table_rows_written_total",
             "openjourney_system_info",
         ]
 
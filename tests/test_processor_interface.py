@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from common.processor_interface import ProcessorInterface
+from common.processor_interface import (
+    EXTRACT_PHASE,
+    LOAD_PHASE,
+    TRANSFORM_PHASE,
+    PhaseCheckpoints,
+    ProcessorInterface,
+    StreamingProcessor,
+)
 
 
 class MockProcessor(ProcessorInterface):
@@ -100,6 +107,224 @@ def test_process_method():
     mock_processor.load.assert_called_once_with({"transformed_data": "data"})
 
 
+class CountingStreamProcessor(StreamingProcessor):
+    """
+    Streaming processor that tracks how far extract runs ahead of load.
+    """
+
+    def __init__(self, batches: int, fail_at: int = -1):
+        super().__init__({})
+        self.batches = batches
+        self.fail_at = fail_at
+        self.extracted = 0
+        self.loaded = []
+        self.max_in_flight = 0
+
+    @property
+    def processor_name(self) -> str:
+        return "CountingStream"
+
+    @property
+    def supported_formats(self) -> list:
+        return [".stream"]
+
+    def validate_source(self, source_path: Path) -> bool:
+        return True
+
+    def extract_batches(self, source_path: Path, **kwargs):
+        for i in range(self.batches):
+            if i == self.fail_at:
+                raise ValueError("broken batch")
+            self.extracted += 1
+            yield "stops", [i]
+
+    def transform_batch(self, table, records, source_info):
+        yield table, [value * 10 for value in records]
+
+    def load_batches(self, batches) -> bool:
+        for table, records in batches:
+            self.max_in_flight = max(
+                self.max_in_flight, self.extracted - len(self.loaded)
+            )
+            self.loaded.append((table, records))
+        return True
+
+
+def test_process_stream_adapts_dict_api():
+    """Dict-API processors run through process_stream unchanged."""
+    mock_processor = MockProcessor({})
+    source_path = Path("source.mock")
+    source_info = {"info": "test"}
+    mock_processor.extract = MagicMock(return_value={"mock_data": "data"})
+    mock_processor.transform = MagicMock(
+        return_value={"transformed_data": "data"}
+    )
+    mock_processor.load = MagicMock(return_value=True)
+
+    assert mock_processor.process_stream(source_path, source_info) is True
+    mock_processor.extract.assert_called_once_with(source_path)
+    mock_processor.transform.assert_called_once_with(
+        {"mock_data": "data"}, source_info
+    )
+    mock_processor.load.assert_called_once_with({"transformed_data": "data"})
+
+
+def test_streaming_processor_applies_backpressure():
+    """Extract never runs more than the queued batches ahead of load."""
+    processor = CountingStreamProcessor(batches=50)
+
+    assert processor.process(Path("feed.stream"), {}, queue_size=1) is True
+    assert processor.loaded == [("stops", [i * 10]) for i in range(50)]
+    # One batch in each queue plus one held by each stage
+    assert processor.max_in_flight <= 5
+
+
+def test_streaming_processor_reports_stage_failure():
+    """An exception in a stage thread fails the run instead of hanging."""
+    processor = CountingStreamProcessor(batches=50, fail_at=3)
+
+    assert processor.process(Path("feed.stream"), {}, queue_size=1) is False
+    assert len(processor.loaded) == 3
+
+
+class InMemoryCheckpoints(PhaseCheckpoints):
+    """Keeps the checkpoints of one job in dictionaries."""
+
+    def __init__(self):
+        self.groups = {}
+        self.completed = {}
+
+    def is_complete(self, phase):
+        return phase in self.completed
+
+    def state(self, phase):
+        return self.completed.get(phase) or {}
+
+    def saved_batches(self, phase):
+        return len(self.groups.get(phase, []))
+
+    def restart(self, phase):
+        self.groups[phase] = []
+
+    def save_batches(self, phase, index, batches):
+        self.groups.setdefault(phase, []).append(batches)
+
+    def read_batches(self, phase, start=0):
+        for batches in self.groups.get(phase, [])[start:]:
+            yield from batches
+
+    def complete(self, phase, state=None):
+        self.completed[phase] = state
+
+
+class FlakyStreamProcessor(CountingStreamProcessor):
+    """Fails to transform one batch until told otherwise."""
+
+    def __init__(self, batches, broken):
+        super().__init__(batches)
+        self.broken = broken
+        self.transformed = []
+
+    def checkpoint_state(self):
+        return {"extracted": self.extracted}
+
+    def restore_state(self, state):
+        self.extracted = state["extracted"]
+
+    def transform_batch(self, table, records, source_info):
+        if records[0] == self.broken:
+            raise ValueError("broken batch")
+        self.transformed.append(records[0])
+        yield from super().transform_batch(table, records, source_info)
+
+
+def test_checkpointed_run_resumes_after_failed_transform():
+    """A rerun skips extract and transforms only the missing batches."""
+    checkpoints = InMemoryCheckpoints()
+    processor = FlakyStreamProcessor(batches=5, broken=3)
+
+    assert not processor.process(Path("feed.stream"), {}, checkpoints)
+    assert checkpoints.is_complete(EXTRACT_PHASE)
+    assert checkpoints.saved_batches(TRANSFORM_PHASE) == 3
+    assert processor.loaded == []
+
+    rerun = FlakyStreamProcessor(batches=5, broken=None)
+    rerun.extract_batches = MagicMock(side_effect=AssertionError)
+
+    assert rerun.process(Path("feed.stream"), {}, checkpoints)
+    assert rerun.extracted == 5
+    assert rerun.transformed == [3, 4]
+    assert rerun.loaded == [("stops", [i * 10]) for i in range(5)]
+    assert checkpoints.is_complete(LOAD_PHASE)
+
+
+def phase_log_lines(logger):
+    """Structured phase lines logged through a mocked logger."""
+    return [
+        call.kwargs["extra"]
+        for call in logger.info.call_args_list
+        if "etl_phase" in call.kwargs.get("extra", {})
+    ]
+
+
+def test_process_measures_every_phase():
+    """Each phase is observed in the metrics and logged with its counts."""
+    mock_processor = MockProcessor({})
+    mock_processor.logger = MagicMock()
+    mock_processor.extract = MagicMock(return_value={"raw": [1, 2, 3]})
+    mock_processor.transform = MagicMock(
+        return_value={"stops": ["a", "b"], "routes": ["r"]}
+    )
+
+    with patch("common.etl_instrumentation.get_metrics") as get_metrics:
+        assert mock_processor.process(Path("source.mock"), {})
+
+    calls = get_metrics.return_value.record_etl_phase.call_args_list
+    assert [call.args[:2] for call in calls] == [
+        ("MockProcessor", "extract"),
+        ("MockProcessor", "transform"),
+        ("MockProcessor", "load"),
+    ]
+    assert [call.args[5] for call in calls] == [3, 3, 3]
+    assert all(call.args[2] >= 0 and call.args[3] >= 0 for call in calls)
+
+    lines = phase_log_lines(mock_processor.logger)
+    assert [line["etl_phase"] for line in lines] == [
+        "extract",
+        "transform",
+        "load",
+    ]
+    assert lines[1]["record_count"] == 3
+    assert lines[1]["status"] == "success"
+
+
+def test_failed_phase_is_logged_but_not_observed():
+    """A load returning False is logged as an error, not as a timing."""
+    mock_processor = MockProcessor({})
+    mock_processor.logger = MagicMock()
+    mock_processor.load = MagicMock(return_value=False)
+
+    with patch("common.etl_instrumentation.get_metrics") as get_metrics:
+        assert not mock_processor.process(Path("source.mock"), {})
+
+    calls = get_metrics.return_value.record_etl_phase.call_args_list
+    assert [call.args[1] for call in calls] == ["extract", "transform"]
+    load = phase_log_lines(mock_processor.logger)[-1]
+    assert (load["etl_phase"], load["status"]) == ("load", "error")
+
+
+def test_streaming_stages_are_measured():
+    """Every streaming stage counts the batches that pass through it."""
+    processor = CountingStreamProcessor(batches=4)
+
+    with patch("common.etl_instrumentation.get_metrics") as get_metrics:
+        assert processor.process(Path("feed.stream"), {})
+
+    calls = get_metrics.return_value.record_etl_phase.call_args_list
+    records = {call.args[1]: call.args[5] for call in calls}
+    assert records == {"extract": 4, "transform": 4, "load": 4}
+
+
 def test_get_source_info():
     """Test the get_source_info method."""
     mock_processor = MockProcessor({})